@@ -4,18 +4,34 @@ Gemini AI integration for resume data extraction and job matching.
 import json
 import os
 from typing import Dict, Any, Optional
-import google.generativeai as genai
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini AI
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY not found in environment variables")
+_genai = None
 
-genai.configure(api_key=GEMINI_API_KEY)
+
+def _get_genai():
+    """
+    Import and configure the Gemini SDK on first use.
+
+    The SDK takes most of a second to import, which every cold start of
+    the serverless function would otherwise pay before serving "/".
+
+    Raises:
+        ValueError: If GEMINI_API_KEY is not set
+    """
+    global _genai
+    if _genai is None:
+        api_key = os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found in environment variables")
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        _genai = genai
+    return _genai
 
 
 def extract_resume_data(resume_text: str) -> Dict[str, Any]:
@@ -32,7 +48,7 @@ def extract_resume_data(resume_text: str) -> Dict[str, Any]:
         Exception: If AI extraction fails
     """
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
+        model = _get_genai().GenerativeModel("gemini-2.0-flash")
         
         prompt = f"""
         Extract structured information from the following resume text and return ONLY a valid JSON object with no additional text.
@@ -114,7 +130,7 @@ def compare_resume_to_jd(resume_data: Dict[str, Any], jd_text: str) -> Dict[str,
         Exception: If AI comparison fails
     """
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
+        model = _get_genai().GenerativeModel("gemini-2.0-flash")
         
         prompt = f"""
         Compare the following resume data against the job description and provide a detailed match analysis. Return ONLY a valid JSON object with no additional text.
@@ -191,7 +207,7 @@ def test_gemini_connection() -> bool:
         bool: True if connection successful, False otherwise
     """
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
+        model = _get_genai().GenerativeModel("gemini-2.0-flash")
         response = model.generate_content("Hello, respond with 'OK' if you can hear me.")
         return "OK" in response.text.upper()
     except:
@@ -2,7 +2,6 @@
 PDF text extraction module for resume parsing.
 """
 import io
-from pypdf import PdfReader
 from typing import Optional
 
 
@@ -24,7 +23,9 @@ def parse_pdf_to_text(file_bytes: bytes) -> str:
         # Create a BytesIO object from the file bytes
         pdf_file = io.BytesIO(file_bytes)
         
-        # Create PDF reader object
+        # Create PDF reader object; pypdf is imported on first use
+        from pypdf import PdfReader
+
         pdf_reader = PdfReader(pdf_file)
         
         # Check if PDF has pages
@@ -69,6 +70,8 @@ def validate_pdf_file(file_bytes: bytes) -> bool:
     """
     try:
         pdf_file = io.BytesIO(file_bytes)
+        from pypdf import PdfReader
+
         pdf_reader = PdfReader(pdf_file)
         return len(pdf_reader.pages) > 0
     except:
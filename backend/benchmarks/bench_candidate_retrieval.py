@@ -0,0 +1,82 @@
+"""
+Benchmark for embedding retrieval of candidates for a job description.
+
+Fills a candidate store with the synthetic resumes of
+bench_candidate_search.py, embeds them all, then times top-K retrieval
+for a few job descriptions. With --mmap the matrix is memory-mapped and
+reopened, showing the restart cost without re-embedding.
+
+Usage (from the backend directory):
+    python benchmarks/bench_candidate_retrieval.py --candidates 100000 --top-k 50 --mmap
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The benchmark builds its own store; keep the default one off the disk
+os.environ.setdefault("CANDIDATES_DB", ":memory:")
+
+from benchmarks.bench_candidate_search import synthetic_resume  # noqa: E402
+from core.candidates import CandidateStore  # noqa: E402
+from core.embeddings import CandidateVectorIndex, get_embedder  # noqa: E402
+from core.skills import get_taxonomy  # noqa: E402
+
+JOB_DESCRIPTIONS = [
+    "Senior Backend Engineer\nRequirements:\n- 5+ years of Python\n- PostgreSQL and Redis\n- Docker, AWS",
+    "Frontend Developer\nRequirements:\n- React and TypeScript\n- CSS, accessibility\n- Jest",
+    "Cloud Platform Engineer\nRequirements:\n- GCP or Azure\n- Terraform, Kubernetes\n- Linux administration",
+    "Data Scientist\nRequirements:\n- Machine learning with scikit-learn or PyTorch\n- SQL and Pandas",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--candidates", type=int, default=100000)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--mmap", action="store_true", help="Memory-map the embedding matrix")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    skill_names = [skill["name"] for skill in get_taxonomy().skills.values()]
+    rng.shuffle(skill_names)
+    embedder = get_embedder()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CandidateStore(os.path.join(tmp, "candidates.db"))
+        for index in range(args.candidates):
+            store.save(f"c{index:08d}", synthetic_resume(rng, skill_names))
+        path = os.path.join(tmp, "embeddings.f32") if args.mmap else None
+
+        vectors = CandidateVectorIndex(store, path, embedder)
+        started = time.perf_counter()
+        vectors.search(JOB_DESCRIPTIONS[0], args.top_k)
+        seconds = time.perf_counter() - started
+        print(f"Embedded {args.candidates} candidates with {embedder.name} in {seconds:.1f}s "
+              f"({args.candidates / seconds:.0f}/s)")
+        if args.mmap:
+            vectors = CandidateVectorIndex(store, path, embedder)
+            started = time.perf_counter()
+            vectors.search(JOB_DESCRIPTIONS[0], args.top_k)
+            print(f"Reopened the memory-mapped matrix in {time.perf_counter() - started:.2f}s")
+
+        print(f"{'job description':<40} {'p50 ms':>8} {'max ms':>8}  top skills")
+        for jd_text in JOB_DESCRIPTIONS:
+            timings = []
+            for _ in range(args.repeat):
+                result = vectors.search(jd_text, args.top_k)
+                timings.append(result["took_ms"])
+            seqs = [seq for seq, _ in result["matches"][:3]]
+            top = store.get_many(seqs)
+            skills = ["/".join(top[seq]["skill_ids"][:4]) for seq in seqs if seq in top]
+            print(f"{jd_text.splitlines()[0]:<40} {statistics.median(timings):>8.2f} {max(timings):>8.2f}  {skills}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark for candidate search over the inverted index.
+
+Fills a candidate store with synthetic extracted resumes, drawing skills
+from the taxonomy with a skewed distribution so common skills have long
+posting lists, then times typical recruiter queries.
+
+Usage (from the backend directory):
+    python benchmarks/bench_candidate_search.py --candidates 100000 --repeat 20
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The benchmark builds its own store; keep the default one off the disk
+os.environ.setdefault("CANDIDATES_DB", ":memory:")
+
+from core.candidates import CandidateStore, query_terms  # noqa: E402
+from core.skills import annotate_skills, get_taxonomy  # noqa: E402
+
+ROLES = [
+    "Software Engineer", "Senior Backend Engineer", "Frontend Developer", "Data Scientist",
+    "DevOps Engineer", "Product Manager", "Teacher", "Registered Nurse", "Accountant", "Graphic Designer",
+]
+EDUCATION = [
+    "BSc Computer Science", "MSc Data Science", "BA Education", "BSN Nursing",
+    "BBA Finance", "BA Graphic Design", "PhD Physics",
+]
+QUERIES = [
+    {"skills": ["Python"]},
+    {"skills": ["Kubernetes"], "min_years": 5},
+    {"skills": ["Python", "AWS", "Docker"], "min_years": 3},
+    {"skills": ["ReactJS", "TypeScript"], "roles": ["frontend"]},
+    {"categories": ["cloud"], "education": ["computer science"], "min_years": 8},
+    {"roles": ["engineer"], "min_years": 2, "max_years": 4},
+    {"skills": ["Rust", "Kafka", "Terraform"]},
+]
+
+
+def synthetic_resume(rng, skill_names):
+    count = rng.randint(4, 14)
+    # Zipf-like: low indexes (common skills) are picked far more often
+    skills = {skill_names[min(int(rng.paretovariate(1.2)) - 1, len(skill_names) - 1)] for _ in range(count)}
+    return annotate_skills({
+        "skills": sorted(skills),
+        "experience_years": rng.randint(0, 25),
+        "education": [rng.choice(EDUCATION)],
+        "previous_roles": rng.sample(ROLES, 2),
+        "key_achievements": [],
+        "contact_info": {"name": f"Candidate {rng.random():.6f}", "email": None, "phone": None},
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--candidates", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    taxonomy = get_taxonomy()
+    skill_names = [skill["name"] for skill in taxonomy.skills.values()]
+    rng.shuffle(skill_names)
+    for common in ("Python", "AWS", "Docker", "JavaScript", "SQL"):
+        skill_names.remove(common)
+        skill_names.insert(0, common)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = CandidateStore(os.path.join(tmp, "candidates.db"))
+        started = time.perf_counter()
+        for index in range(args.candidates):
+            store.save(f"c{index:08d}", synthetic_resume(rng, skill_names))
+        load_seconds = time.perf_counter() - started
+        print(f"Loaded {args.candidates} candidates in {load_seconds:.1f}s "
+              f"({args.candidates / load_seconds:.0f}/s), {store.get_stats()['postings']} postings")
+
+        started = time.perf_counter()
+        store.search(query_terms(["Python"]))
+        print(f"Loaded the in-memory index in {time.perf_counter() - started:.2f}s")
+
+        print(f"{'query':<90} {'total':>7} {'p50 ms':>8} {'max ms':>8}")
+        for query in QUERIES:
+            required = query_terms(
+                query.get("skills", ()), query.get("categories", ()), query.get("roles", ()), query.get("education", ())
+            )
+            timings = []
+            for _ in range(args.repeat):
+                result = store.search(required, query.get("min_years"), query.get("max_years"), limit=50)
+                timings.append(result["took_ms"])
+            print(f"{str(query):<90} {result['total']:>7} {statistics.median(timings):>8.2f} {max(timings):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark for import time and serverless cold start.
+
+Each run starts a fresh interpreter, as a serverless cold start does,
+imports the app and serves GET / and GET /health through the ASGI
+interface with lifespan events off, the way the Mangum handler in
+api/index.py does. GEMINI_API_KEY is removed from the environment, so
+the run also shows the app can be imported without it.
+
+Then `python -X importtime` lists the slowest imports, and the check
+fails (exit status 1) if importing the app takes longer than --budget-ms
+or loads one of the modules that must stay lazy.
+
+Usage (from the backend directory):
+    python benchmarks/bench_cold_start.py --runs 5 --budget-ms 1000
+    python benchmarks/bench_cold_start.py --app-dir ../api --budget-ms 0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy modules that must not be imported before their first use
+LAZY_MODULES = ("google.generativeai", "numpy", "pypdf")
+
+COLD_START = r"""
+import asyncio, json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+eager = sorted(name for name in sys.modules if name in %r)
+
+async def get(path):
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"localhost")], "client": ("127.0.0.1", 1), "server": ("localhost", 80),
+    }
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    status = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await main.app(scope, receive, send)
+    return status[0]
+
+async def serve():
+    timings = {}
+    for path in ("/", "/health"):
+        begin = time.perf_counter()
+        timings[path] = (await get(path), (time.perf_counter() - begin) * 1000)
+    return timings
+
+timings = asyncio.run(serve())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "root": timings["/"],
+    "health": timings["/health"],
+    "total_ms": (time.perf_counter() - started) * 1000,
+    "lazy_loaded": eager,
+}))
+"""
+
+
+def child_env(app_dir):
+    env = {key: value for key, value in os.environ.items() if key != "GEMINI_API_KEY"}
+    env["PYTHONPATH"] = app_dir
+    # Keep the candidate store off the disk
+    env["CANDIDATES_DB"] = ":memory:"
+    return env
+
+
+def cold_start(app_dir):
+    output = subprocess.run(
+        [sys.executable, "-c", COLD_START % (LAZY_MODULES,)],
+        cwd=app_dir, env=child_env(app_dir), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def import_times(app_dir):
+    # -X importtime writes "import time: self | cumulative | module" lines to stderr
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=app_dir, env=child_env(app_dir), capture_output=True, text=True, check=True
+    ).stderr
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            # Drop the separator space, keeping two spaces of indent per nesting level
+            modules[name[1:].rstrip()] = int(cumulative) / 1000
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--app-dir", default=BACKEND_DIR, help="Directory containing main.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12, help="Slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="Import time budget, 0 to skip the check")
+    args = parser.parse_args()
+    app_dir = os.path.abspath(args.app_dir)
+
+    runs = [cold_start(app_dir) for _ in range(args.runs)]
+    print(f"Cold start of {app_dir} over {args.runs} runs (median ms):")
+    print(f"  import main   {statistics.median(run['import_ms'] for run in runs):8.1f}")
+    for key, path in (("root", "/"), ("health", "/health")):
+        status = runs[-1][key][0]
+        print(f"  first {path:<8}{statistics.median(run[key][1] for run in runs):8.1f}  (status {status})")
+    print(f"  total         {statistics.median(run['total_ms'] for run in runs):8.1f}")
+
+    modules = import_times(app_dir)
+    print("\nSlowest imports by main (cumulative ms):")
+    direct = {name: ms for name, ms in modules.items() if len(name) - len(name.lstrip()) == 2}
+    for name, ms in sorted(direct.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {ms:8.1f}  {name.strip()}")
+
+    failures = []
+    eager = sorted({name for run in runs for name in run["lazy_loaded"]})
+    if eager:
+        failures.append(f"imported at startup but should be lazy: {', '.join(eager)}")
+    total = modules.get("main", 0.0)
+    if args.budget_ms and total > args.budget_ms:
+        failures.append(f"importing main took {total:.0f} ms, budget {args.budget_ms:.0f} ms")
+    if failures:
+        print("\nFAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print(f"\nOK: main imports in {total:.0f} ms" + (f" (budget {args.budget_ms:.0f} ms)" if args.budget_ms else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Load benchmark for the async LLM client layer.
+
+Replaces the Gemini model with a local stub that sleeps for a fixed
+latency, then runs the same number of concurrent screenings through the
+blocking functions and through core.llm_client.
+
+Usage (from the backend directory):
+    python benchmarks/bench_llm_concurrency.py --requests 64 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-stub-key")
+
+import google.generativeai as genai  # noqa: E402
+
+STUB_RESUME = {
+    "skills": ["Python", "React"],
+    "experience_years": 5,
+    "education": ["BSc Computer Science"],
+    "previous_roles": ["Software Engineer"],
+    "key_achievements": [],
+}
+STUB_MATCH = {"match_score": 72, "match_summary": "Stub match"}
+
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """Stand-in for genai.GenerativeModel with a fixed response latency."""
+
+    latency = 0.2
+
+    def __init__(self, model_name, **kwargs):
+        self.model_name = model_name
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self.latency)
+        payload = STUB_MATCH if "match analysis" in prompt else STUB_RESUME
+        return _StubResponse(json.dumps(payload))
+
+
+genai.GenerativeModel = StubModel
+
+from core import llm_client  # noqa: E402
+from core.llm_extractor import extract_resume_data, compare_resume_to_jd  # noqa: E402
+
+JD_TEXT = "Senior Python engineer with React experience."
+
+
+async def screen_blocking(resume_text):
+    resume_data = extract_resume_data(resume_text)
+    return compare_resume_to_jd(resume_data, JD_TEXT)
+
+
+async def screen_async(resume_text):
+    resume_data = await llm_client.extract_resume_data_async(resume_text)
+    return await llm_client.compare_resume_to_jd_async(resume_data, JD_TEXT)
+
+
+async def run(screen, n_requests):
+    start = time.perf_counter()
+    await asyncio.gather(*(screen(f"Resume {i}") for i in range(n_requests)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    StubModel.latency = args.latency
+    print(f"{args.requests} screenings, stub latency {args.latency:.3f}s, "
+          f"LLM_MAX_CONCURRENCY={llm_client.LLM_MAX_CONCURRENCY}")
+
+    for name, screen in (("blocking", screen_blocking), ("async", screen_async)):
+        elapsed = asyncio.run(run(screen, args.requests))
+        print(f"{name:>9}: {elapsed:7.2f}s  {args.requests / elapsed:8.1f} screenings/s")
+
+    llm_client.shutdown_executor()
+
+
+if __name__ == "__main__":
+    main()
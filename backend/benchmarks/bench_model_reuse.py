@@ -0,0 +1,125 @@
+"""
+Benchmark for the shared Gemini model registry and pooled transport.
+
+Starts a local HTTP server that answers generateContent requests with a
+canned reply after a fixed latency, points the SDK's REST transport at
+it, and sends the same number of concurrent calls two ways: a fresh
+GenerativeModel per call on the SDK's default connection pool (the old
+code path), and core.llm_registry with its shared model and pool. The
+server counts TCP connections and delays the first request on each one
+by --handshake seconds to stand in for the TLS handshake a real endpoint
+charges for.
+
+Usage (from the backend directory):
+    python benchmarks/bench_model_reuse.py --calls 512 --concurrency 32 --latency 0.02 --handshake 0.05
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+warnings.filterwarnings("ignore")
+
+STUB_REPLY = json.dumps({
+    "candidates": [{
+        "content": {"parts": [{"text": "OK"}], "role": "model"},
+        "finishReason": "STOP",
+    }],
+    "usageMetadata": {"promptTokenCount": 12, "candidatesTokenCount": 1},
+}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every POST with STUB_REPLY over keep-alive HTTP/1.1."""
+
+    protocol_version = "HTTP/1.1"
+    latency = 0.02
+    handshake = 0.05
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubHandler.lock:
+            StubHandler.connections += 1
+        self.new_connection = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("content-length", 0)))
+        time.sleep(self.latency + (self.handshake if self.new_connection else 0))
+        self.new_connection = False
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(STUB_REPLY)))
+        self.end_headers()
+        self.wfile.write(STUB_REPLY)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def start_stub_server():
+    server = StubServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(call, n_calls, concurrency):
+    StubHandler.connections = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for response in pool.map(lambda i: call(f"Prompt {i}"), range(n_calls)):
+            assert response.text == "OK"
+    return time.perf_counter() - start, StubHandler.connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=512)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--handshake", type=float, default=0.05)
+    args = parser.parse_args()
+
+    StubHandler.latency = args.latency
+    StubHandler.handshake = args.handshake
+    server = start_stub_server()
+    endpoint = f"http://127.0.0.1:{server.server_port}"
+    os.environ["GEMINI_API_ENDPOINT"] = endpoint
+    os.environ["GEMINI_TRANSPORT"] = "rest"
+    os.environ["GEMINI_HTTP_POOL_SIZE"] = str(args.concurrency)
+
+    import google.generativeai as genai
+    from core import llm_registry
+
+    def per_call(prompt):
+        return genai.GenerativeModel(llm_registry.MODEL_NAME).generate_content(prompt)
+
+    print(f"{args.calls} calls, {args.concurrency} threads, stub latency {args.latency:.3f}s, "
+          f"handshake {args.handshake:.3f}s")
+
+    genai.configure(api_key="benchmark-stub-key", transport="rest", client_options={"api_endpoint": endpoint})
+    elapsed, connections = run(per_call, args.calls, args.concurrency)
+    print(f" per-call: {elapsed:7.2f}s  {args.calls / elapsed:8.1f} calls/s  {connections:5d} connections")
+
+    llm_registry.configure("benchmark-stub-key")
+    elapsed, connections = run(llm_registry.generate_content, args.calls, args.concurrency)
+    print(f" registry: {elapsed:7.2f}s  {args.calls / elapsed:8.1f} calls/s  {connections:5d} connections")
+    print(json.dumps(llm_registry.get_stats(), indent=2))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark for PDF validation and text extraction.
+
+Compares the old two-pass flow (validate_pdf_file, then
+parse_pdf_to_text, each with its own PdfReader) with the single-pass
+parse_pdf on the multi-page resumes in the dataset.
+
+Usage (from the backend directory):
+    python benchmarks/bench_pdf_parse.py --files 40 --repeat 3
+"""
+import argparse
+import glob
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pypdf import PdfReader  # noqa: E402
+
+from core.parser import parse_pdf, pdf_result_to_text, validate_pdf_file  # noqa: E402
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset", "data")
+
+
+def two_pass_text(file_bytes):
+    """Text extraction as the endpoints did it before parse_pdf existed."""
+    if not validate_pdf_file(file_bytes):
+        raise ValueError("invalid")
+    reader = PdfReader(io.BytesIO(file_bytes))
+    extracted_text = ""
+    for page in reader.pages:
+        page_text = page.extract_text()
+        if page_text:
+            extracted_text += page_text + "\n"
+    return extracted_text.strip()
+
+
+def single_pass_text(file_bytes):
+    result = parse_pdf(file_bytes)
+    if not result.is_valid:
+        raise ValueError("invalid")
+    return pdf_result_to_text(result)
+
+
+def load_multipage_pdfs(limit):
+    pdfs = []
+    for path in sorted(glob.glob(os.path.join(DATASET_DIR, "*", "*.pdf"))):
+        with open(path, "rb") as f:
+            file_bytes = f.read()
+        if len(PdfReader(io.BytesIO(file_bytes)).pages) > 1:
+            pdfs.append(file_bytes)
+        if len(pdfs) >= limit:
+            break
+    return pdfs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pdfs = load_multipage_pdfs(args.files)
+    print(f"{len(pdfs)} multi-page PDFs, {args.repeat} repeats")
+
+    timings = {}
+    for name, func in (("two-pass", two_pass_text), ("single-pass", single_pass_text)):
+        best = None
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for file_bytes in pdfs:
+                func(file_bytes)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+        print(f"{name:>12}: {best * 1000 / len(pdfs):7.2f} ms/PDF")
+
+    saving = 1 - timings["single-pass"] / timings["two-pass"]
+    print(f"{'saving':>12}: {saving:7.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,483 @@
+"""
+End-to-end benchmark for POST /screen-resume.
+
+Generates a corpus of synthetic PDF resumes with varying page counts and
+job descriptions of varying length, starts the server with the stub LLM
+backend (LLM_BACKEND=stub, no key or network needed) and screens the
+corpus at a fixed concurrency. The cold phase sends every resume once,
+the warm phase replays the same requests, so it shows the cache effect.
+
+Reports requests/sec, end-to-end and per-stage latency (validate,
+parse, extract, compare and the other stages in the response timings)
+as p50/p95/p99, errors and peak RSS of the server and its PDF workers.
+With --output the results are written as JSON; with --baseline they are
+compared against an earlier results file and the run fails (exit status
+1) if p95 latency or throughput regressed by more than --tolerance.
+
+Needs httpx and uvicorn.
+
+Usage (from the backend directory):
+    python benchmarks/bench_pipeline.py --requests 200 --concurrency 16 --output bench.json
+    python benchmarks/bench_pipeline.py --llm-latency fixed:0.5 --baseline bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+from benchmarks.bench_candidate_search import EDUCATION, ROLES  # noqa: E402
+from core.skills import get_taxonomy  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Lines of text per synthetic PDF page
+LINES_PER_PAGE = 48
+
+PERCENTILES = (50, 95, 99)
+
+# Latency changes smaller than this are noise, whatever the tolerance
+REGRESSION_MIN_MS = 5
+
+# Stages of the response timings in pipeline order; others are listed after them
+STAGE_ORDER = ["validate", "parse", "extract", "jd_prepare", "prescore", "compare"]
+
+JD_BOILERPLATE = [
+    "About us: we are a fast-growing company building tools that teams love to use every day.",
+    "Our culture values ownership, curiosity and clear written communication across time zones.",
+    "Benefits include flexible hours, a learning budget, private health insurance and paid leave.",
+    "We are an equal opportunity employer and welcome applicants from every background.",
+    "How to apply: send your resume and a short note about a project you are proud of.",
+]
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def synthetic_pdf(pages):
+    """
+    Write a minimal PDF with one Helvetica text block per page.
+
+    Args:
+        pages: Lines of text for each page
+
+    Returns:
+        bytes: PDF file
+    """
+    page_ids = [4 + 2 * index for index in range(len(pages))]
+    objects = {
+        1: "<< /Type /Catalog /Pages 2 0 R >>",
+        2: f"<< /Type /Pages /Kids [{' '.join(f'{page_id} 0 R' for page_id in page_ids)}] /Count {len(pages)} >>",
+        3: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for page_id, lines in zip(page_ids, pages):
+        text = " T* ".join(f"({_pdf_escape(line)}) Tj" for line in lines)
+        stream = f"BT /F1 10 Tf 14 TL 50 790 Td {text} ET"
+        objects[page_id] = (
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        )
+        objects[page_id + 1] = f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(out)
+        out += f"{object_id} 0 obj\n{objects[object_id]}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    for object_id in sorted(objects):
+        out += f"{offsets[object_id]:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return bytes(out)
+
+
+def synthetic_resume_pdf(rng, skill_names, page_count, index):
+    """
+    Write a resume PDF with page_count pages of roles and achievements.
+
+    Args:
+        rng: Random generator
+        skill_names: Skill names to draw from
+        page_count: Number of pages
+        index: Candidate number, making every resume unique
+
+    Returns:
+        bytes: PDF file
+    """
+    lines = [
+        f"Candidate {index:05d}",
+        f"candidate{index}@example.com | +1 555 {index:07d}",
+        "",
+        "SUMMARY",
+        f"{rng.choice(ROLES)} with {rng.randint(1, 20)} years of experience.",
+        "",
+        "SKILLS",
+        ", ".join(rng.sample(skill_names, rng.randint(5, 15))),
+        "",
+        "EDUCATION",
+        rng.choice(EDUCATION),
+        "",
+        "EXPERIENCE",
+    ]
+    while len(lines) < page_count * LINES_PER_PAGE:
+        start = rng.randint(2000, 2022)
+        lines += [
+            f"{rng.choice(ROLES)}, Company {rng.randint(1, 999)} ({start} - {start + rng.randint(1, 4)})",
+            f"- Built and ran services using {', '.join(rng.sample(skill_names, 3))}.",
+            f"- Improved delivery time by {rng.randint(5, 60)}% for a team of {rng.randint(3, 40)}.",
+            f"- Mentored {rng.randint(1, 8)} colleagues and led reviews of {rng.choice(skill_names)} work.",
+            "",
+        ]
+    lines = lines[:page_count * LINES_PER_PAGE]
+    return synthetic_pdf([lines[start:start + LINES_PER_PAGE] for start in range(0, len(lines), LINES_PER_PAGE)])
+
+
+def synthetic_jd(rng, skill_names, size):
+    """
+    Write a job description.
+
+    Args:
+        rng: Random generator
+        skill_names: Skill names to draw from
+        size: "short" (requirements only), "medium" (with responsibilities
+            and company text) or "long" (padded with boilerplate past
+            the JD token budget)
+
+    Returns:
+        str: Job description text
+    """
+    lines = [rng.choice(ROLES), "", "Requirements:"]
+    lines += [f"- {skill}" for skill in rng.sample(skill_names, rng.randint(3, 8))]
+    lines.append(f"- {rng.randint(1, 8)}+ years of experience")
+    if size in ("medium", "long"):
+        lines += ["", "Responsibilities:"]
+        lines += [f"- Own the {rng.choice(skill_names)} roadmap and ship improvements" for _ in range(6)]
+        lines += ["", "Nice to have:"] + [f"- {skill}" for skill in rng.sample(skill_names, 3)]
+        lines += [""] + JD_BOILERPLATE[:2]
+    if size == "long":
+        lines += [""] + JD_BOILERPLATE * 30
+    return "\n".join(lines)
+
+
+def percentile(values, q):
+    """Linearly interpolated percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def summarize(values):
+    summary = {"count": len(values)}
+    if values:
+        summary["mean_ms"] = round(sum(values) / len(values), 2)
+        summary["max_ms"] = round(max(values), 2)
+        for q in PERCENTILES:
+            summary[f"p{q}_ms"] = round(percentile(values, q), 2)
+    return summary
+
+
+def _rss_kb(pid, field="VmRSS"):
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def _descendants(pid):
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat", "r") as f:
+                    # The command name may contain spaces, the ppid follows its closing parenthesis
+                    parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+    found, frontier = [], [pid]
+    while frontier:
+        children = [child for child, parent in parents.items() if parent in frontier]
+        found += children
+        frontier = children
+    return found
+
+
+class RSSSampler:
+    """
+    Samples the RSS of a process and its descendants (Linux only).
+
+    Args:
+        pid: Server process id
+        interval: Seconds between samples
+    """
+
+    def __init__(self, pid, interval=0.2):
+        self.pid = pid
+        self.interval = interval
+        self.peak_total_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            total = _rss_kb(self.pid) + sum(_rss_kb(child) for child in _descendants(self.pid))
+            self.peak_total_kb = max(self.peak_total_kb, total)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if os.path.isdir("/proc"):
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def result(self):
+        return {
+            "server_peak_rss_mb": round(_rss_kb(self.pid, "VmHWM") / 1024, 1),
+            "total_peak_rss_mb": round(self.peak_total_kb / 1024, 1),
+        }
+
+
+def start_server(args, log):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = {key: value for key, value in os.environ.items() if key != "GEMINI_API_KEY"}
+    env.update({
+        "LLM_BACKEND": "stub",
+        "LLM_STUB_LATENCY": args.llm_latency,
+        "LLM_STUB_ERROR_RATE": str(args.llm_error_rate),
+        "LLM_STUB_SEED": str(args.seed),
+        # Keep every store in memory so runs do not leak into each other
+        "CANDIDATES_DB": ":memory:",
+        "EMBEDDING_INDEX_PATH": "",
+        "RESUME_CACHE_DB": "",
+        "MATCH_CACHE_DB": "",
+        "JOBS_DB": "",
+        "JD_REGISTRY_DB": "",
+        "LOG_LEVEL": "WARNING",
+    })
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health/live", timeout=1).status_code == 200:
+                return server, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("Server did not start within 60s")
+
+
+async def run_phase(base_url, corpus, concurrency):
+    """
+    Screen every (PDF, JD) pair in the corpus with concurrency requests in flight.
+
+    Returns:
+        dict: Duration, request and error counts, end-to-end latencies and
+            per-stage latencies from the response timings
+    """
+    queue = list(reversed(corpus))
+    latencies, stages, errors = [], {}, {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        async def worker():
+            while queue:
+                name, pdf_bytes, jd_text = queue.pop()
+                started = time.perf_counter()
+                try:
+                    response = await client.post(
+                        "/screen-resume",
+                        files={"resume_file": (name, pdf_bytes, "application/pdf")},
+                        data={"jd_text": jd_text},
+                    )
+                except httpx.HTTPError as e:
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                    continue
+                elapsed = (time.perf_counter() - started) * 1000
+                if response.status_code != 200:
+                    errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+                    continue
+                latencies.append(elapsed)
+                for stage, timing in response.json().get("timings", {}).get("stages", {}).items():
+                    stages.setdefault(stage, []).append(timing["ms"])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        duration = time.perf_counter() - started
+
+    return {
+        "requests": len(corpus),
+        "succeeded": len(latencies),
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "requests_per_s": round(len(latencies) / duration, 2) if duration else None,
+        "latency": summarize(latencies),
+        "stages": {
+            stage: summarize(stages[stage])
+            for stage in sorted(stages, key=lambda name: (STAGE_ORDER + [name]).index(name))
+        },
+    }
+
+
+def build_corpus(args):
+    rng = random.Random(args.seed)
+    skill_names = sorted(skill["name"] for skill in get_taxonomy().skills.values())
+    page_counts = [int(pages) for pages in args.pages.split(",")]
+    jd_sizes = args.jd_sizes.split(",")
+    jds = {size: [synthetic_jd(rng, skill_names, size) for _ in range(args.jds)] for size in jd_sizes}
+    corpus = []
+    for index in range(args.requests):
+        pages = page_counts[index % len(page_counts)]
+        jd_text = rng.choice(jds[jd_sizes[index % len(jd_sizes)]])
+        corpus.append((f"resume-{index:05d}.pdf", synthetic_resume_pdf(rng, skill_names, pages, index), jd_text))
+    return corpus
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    List regressions of p95 latency and throughput against a baseline run.
+
+    Returns:
+        list: Descriptions of the metrics that got worse by more than tolerance
+    """
+    regressions = []
+    for phase, current in results["phases"].items():
+        previous = baseline.get("phases", {}).get(phase)
+        if not previous:
+            continue
+        old, new = previous["latency"].get("p95_ms"), current["latency"].get("p95_ms")
+        if old and new and new > old * (1 + tolerance) and new - old > REGRESSION_MIN_MS:
+            regressions.append(f"{phase} p95 {old:.0f} -> {new:.0f} ms")
+        for stage, summary in current["stages"].items():
+            old = previous["stages"].get(stage, {}).get("p95_ms")
+            new = summary.get("p95_ms")
+            if old and new and new > old * (1 + tolerance) and new - old > REGRESSION_MIN_MS:
+                regressions.append(f"{phase} {stage} p95 {old:.1f} -> {new:.1f} ms")
+        old, new = previous.get("requests_per_s"), current.get("requests_per_s")
+        if old and new and new < old * (1 - tolerance):
+            regressions.append(f"{phase} throughput {old:.1f} -> {new:.1f} req/s")
+    return regressions
+
+
+def print_phase(phase, result):
+    latency = result["latency"]
+    print(f"\n{phase}: {result['succeeded']}/{result['requests']} ok in {result['duration_s']:.1f}s, "
+          f"{result['requests_per_s']} req/s, errors {result['errors'] or 'none'}")
+    print(f"  {'stage':<12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'count':>6}")
+    for stage, summary in [("request", latency)] + list(result["stages"].items()):
+        if summary["count"]:
+            print(f"  {stage:<12} {summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} "
+                  f"{summary['p99_ms']:>9.1f} {summary['count']:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200, help="Distinct resumes screened per phase")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pages", default="1,2,4,8", help="Page counts of the resumes, used in turn")
+    parser.add_argument("--jd-sizes", default="short,medium,long", help="JD lengths, used in turn")
+    parser.add_argument("--jds", type=int, default=4, help="Distinct JDs per length")
+    parser.add_argument("--llm-latency", default="lognormal:0.3,0.3", help="Stub LLM latency distribution")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--no-warm", action="store_true", help="Skip replaying the corpus against warm caches")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--server-log", default=os.devnull, help="File for the server's log output")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Results file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    corpus = build_corpus(args)
+    corpus_mb = sum(len(pdf_bytes) for _, pdf_bytes, _ in corpus) / 1e6
+    print(f"Generated {len(corpus)} resumes ({corpus_mb:.1f} MB) in {time.perf_counter() - started:.1f}s")
+
+    log = open(args.server_log, "w")
+    server, base_url = start_server(args, log)
+    sampler = RSSSampler(server.pid)
+    sampler.start()
+    try:
+        phases = {"cold": asyncio.run(run_phase(base_url, corpus, args.concurrency))}
+        if not args.no_warm:
+            phases["warm"] = asyncio.run(run_phase(base_url, corpus, args.concurrency))
+        memory = sampler.result()
+    finally:
+        sampler.stop()
+        server.terminate()
+        server.wait(timeout=30)
+        log.close()
+
+    results = {
+        "benchmark": "pipeline",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "server_log")},
+        "phases": phases,
+        "memory": memory,
+    }
+    for phase, result in phases.items():
+        print_phase(phase, result)
+    print(f"\nPeak RSS: server {memory['server_peak_rss_mb']} MB, "
+          f"server and PDF workers {memory['total_peak_rss_mb']} MB")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+
+    failed = any(result["succeeded"] < result["requests"] for result in phases.values()) and not args.llm_error_rate
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nREGRESSION: " + "; ".join(regressions))
+            failed = True
+        else:
+            print(f"\nOK: within {args.tolerance:.0%} of {args.baseline}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,6 @@
 # Core modules for resume screening application
+from dotenv import load_dotenv
+
+# Modules read their settings from the environment when imported, so the
+# .env file is loaded before any of them
+load_dotenv()
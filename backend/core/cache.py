@@ -0,0 +1,450 @@
+"""
+Caching for expensive resume screening results.
+
+Provides an in-memory LRU tier, an optional SQLite tier on disk and a
+tiered cache that combines them. Values must be JSON serializable.
+"""
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from core.llm_extractor import (
+    MODEL_NAME,
+    EXTRACTION_PROMPT_TEMPLATE,
+    COMPARISON_PROMPT_TEMPLATE,
+    BATCH_COMPARISON_PROMPT_TEMPLATE,
+    LLM_STRUCTURED_OUTPUT,
+)
+from core.jd_prep import prepare_jd
+from core.skills import without_skill_ids
+from core.llm_registry import GENERATION_CONFIG, LLM_BACKEND
+from core.text_normalizer import EDGE_LINES, REPEAT_RATIO
+from core.tokens import JD_TOKEN_BUDGET, RESUME_TOKEN_BUDGET
+from core.metrics import counter, gauge
+
+# Resume data cache configuration
+RESUME_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "1024"))
+RESUME_CACHE_TTL = float(os.getenv("RESUME_CACHE_TTL", "86400"))
+RESUME_CACHE_DB = os.getenv("RESUME_CACHE_DB", "")
+RESUME_CACHE_DB_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_DB_MAX_ENTRIES", "100000"))
+
+# Match result cache configuration
+MATCH_CACHE_MAX_ENTRIES = int(os.getenv("MATCH_CACHE_MAX_ENTRIES", "4096"))
+MATCH_CACHE_TTL = float(os.getenv("MATCH_CACHE_TTL", "3600"))
+MATCH_CACHE_DB = os.getenv("MATCH_CACHE_DB", "")
+MATCH_CACHE_DB_MAX_ENTRIES = int(os.getenv("MATCH_CACHE_DB_MAX_ENTRIES", "100000"))
+
+# Bump when text normalization or section splitting changes what reaches the prompts
+PREPROCESSING_VERSION = 2
+
+# Lookups by cache and result ("memory" or "disk" hit, or "miss")
+CACHE_LOOKUPS = counter("cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"])
+CACHE_HIT_RATIO = gauge("cache_hit_ratio", "Share of lookups answered by either tier since startup", ["cache"])
+
+
+class CacheStats:
+    """Hit, miss and eviction counters for a cache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class MemoryCache:
+    """
+    Thread-safe in-memory LRU cache with per-entry TTL.
+
+    Args:
+        max_entries: Maximum number of entries before the least recently
+            used one is evicted
+        ttl: Seconds an entry stays valid, or 0 to never expire
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at and expires_at < time.time():
+                del self._entries[key]
+                self.stats.evictions += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.time() + self.ttl if self.ttl else 0
+        with self._lock:
+            self._entries[key] = (copy.deepcopy(value), expires_at)
+            self._entries.move_to_end(key)
+            self.stats.sets += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    Persistent cache stored in a SQLite database.
+
+    Entries expire after ttl seconds and the least recently accessed rows
+    are removed once the table grows past max_entries.
+
+    Args:
+        path: Path to the SQLite database file
+        max_entries: Maximum number of rows kept on disk
+        ttl: Seconds an entry stays valid, or 0 to never expire
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000, ttl: float = 0):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            value, expires_at = row
+            if expires_at and expires_at < now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.stats.evictions += 1
+                self.stats.misses += 1
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else 0
+        payload = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, now)
+            )
+            self.stats.sets += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        cursor = self._conn.execute(
+            "DELETE FROM cache WHERE expires_at > 0 AND expires_at < ?", (now,)
+        )
+        self.stats.evictions += cursor.rowcount
+        count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count > self.max_entries:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                " SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+            self.stats.evictions += cursor.rowcount
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class TieredCache:
+    """
+    Two-level cache: an in-memory tier backed by an optional disk tier.
+
+    Disk hits are promoted into memory so repeated lookups stay fast.
+
+    Args:
+        memory: In-memory tier
+        disk: Optional persistent tier
+        name: Label of the cache in the lookup metrics
+    """
+
+    def __init__(self, memory: MemoryCache, disk: Optional[SQLiteCache] = None, name: str = ""):
+        self.memory = memory
+        self.disk = disk
+        self.name = name
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        result = "memory"
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            result = "disk"
+            if value is not None:
+                self.memory.set(key, value)
+        if value is None:
+            result = "miss"
+        CACHE_LOOKUPS.inc(cache=self.name, result=result)
+        lookups = {tier: CACHE_LOOKUPS.value(cache=self.name, result=tier) for tier in ("memory", "disk", "miss")}
+        CACHE_HIT_RATIO.set(1 - lookups["miss"] / sum(lookups.values()), cache=self.name)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get counters for each tier.
+
+        Returns:
+            dict: Entry counts and hit/miss counters per tier
+        """
+        stats = {"memory": {"entries": len(self.memory), **self.memory.stats.to_dict()}}
+        if self.disk is not None:
+            stats["disk"] = {"entries": len(self.disk), **self.disk.stats.to_dict()}
+        return stats
+
+
+class SingleFlight:
+    """
+    Collapse concurrent identical async calls into a single in-flight call.
+
+    The first caller for a key runs the call; callers arriving while it is
+    still running wait for the same result instead of starting their own.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run func for key, or join the call already in flight for key.
+
+        Args:
+            key: Identity of the call
+            func: Zero-argument coroutine function to run
+
+        Returns:
+            Any: Result of the (possibly shared) call
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.shared += 1
+            return copy.deepcopy(await asyncio.shield(task))
+
+        task = asyncio.ensure_future(func())
+        self._calls[key] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._calls.get(key) is task:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+def build_cache(max_entries: int, ttl: float, db_path: str = "", db_max_entries: int = 100000,
+                name: str = "") -> TieredCache:
+    """
+    Build a tiered cache, adding the SQLite tier only when db_path is set.
+
+    Args:
+        max_entries: Maximum entries in the memory tier
+        ttl: Entry lifetime in seconds, 0 to never expire
+        db_path: SQLite file for the disk tier, empty to disable it
+        db_max_entries: Maximum rows kept in the disk tier
+        name: Label of the cache in the lookup metrics
+
+    Returns:
+        TieredCache: Configured cache
+    """
+    disk = SQLiteCache(db_path, max_entries=db_max_entries, ttl=ttl) if db_path else None
+    return TieredCache(MemoryCache(max_entries=max_entries, ttl=ttl), disk, name)
+
+
+def resume_cache_key(file_bytes: bytes) -> str:
+    """
+    Build the content-addressed cache key for a resume PDF.
+
+    The key covers the PDF bytes, the extraction prompt, the model and
+    its generation config, and the backend and preprocessing settings,
+    so changing any of the latter naturally invalidates old entries.
+
+    Args:
+        file_bytes: Raw bytes of the PDF file
+
+    Returns:
+        str: Hex digest identifying the extraction result
+    """
+    digest = hashlib.sha256()
+    digest.update(file_bytes)
+    digest.update(EXTRACTION_PROMPT_TEMPLATE.encode("utf-8"))
+    digest.update(MODEL_NAME.encode("utf-8"))
+    digest.update(_settings_fingerprint())
+    return digest.hexdigest()
+
+
+def _settings_fingerprint() -> bytes:
+    # Settings that change the prompt input or who answers it; a stub
+    # backend's replies must never be served as Gemini results
+    return json.dumps({
+        "backend": LLM_BACKEND,
+        "generation_config": GENERATION_CONFIG,
+        "structured_output": LLM_STRUCTURED_OUTPUT,
+        "resume_token_budget": RESUME_TOKEN_BUDGET,
+        "jd_token_budget": JD_TOKEN_BUDGET,
+        "normalizer": [EDGE_LINES, REPEAT_RATIO],
+        "preprocessing": PREPROCESSING_VERSION,
+    }, sort_keys=True).encode("utf-8")
+
+
+def match_cache_version() -> str:
+    """
+    Identify the current comparison prompts, model, generation config,
+    backend and preprocessing settings.
+
+    Single and batched comparisons share the match cache, so both
+    templates are part of the version.
+
+    Returns:
+        str: Short hash that changes whenever a prompt, the model or a
+            preprocessing setting changes
+    """
+    digest = hashlib.sha256()
+    digest.update(COMPARISON_PROMPT_TEMPLATE.encode("utf-8"))
+    digest.update(BATCH_COMPARISON_PROMPT_TEMPLATE.encode("utf-8"))
+    digest.update(MODEL_NAME.encode("utf-8"))
+    digest.update(_settings_fingerprint())
+    return digest.hexdigest()[:16]
+
+
+def match_cache_key(resume_data: Dict[str, Any], jd_text: str) -> str:
+    """
+    Build the cache key for a resume/job description comparison.
+
+    Args:
+        resume_data: Structured resume data
+        jd_text: Job description text
+
+    Returns:
+        str: Key made of the prompt/model version, a fingerprint of the
+            canonical resume JSON and a hash of the normalized JD
+    """
+    canonical = json.dumps(without_skill_ids(resume_data), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    resume_fingerprint = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return f"{match_cache_version()}:{resume_fingerprint}:{prepare_jd(jd_text).digest}"
+
+
+# Shared cache for structured resume data, keyed by resume_cache_key
+resume_data_cache = build_cache(
+    RESUME_CACHE_MAX_ENTRIES,
+    RESUME_CACHE_TTL,
+    RESUME_CACHE_DB,
+    RESUME_CACHE_DB_MAX_ENTRIES,
+    name="resume_data"
+)
+
+# Shared cache for comparison results, keyed by match_cache_key
+match_result_cache = build_cache(
+    MATCH_CACHE_MAX_ENTRIES,
+    MATCH_CACHE_TTL,
+    MATCH_CACHE_DB,
+    MATCH_CACHE_DB_MAX_ENTRIES,
+    name="match"
+)
+
+# Deduplicates concurrent comparisons of the same pair
+match_single_flight = SingleFlight()
+
+
+def invalidate_caches(target: str = "all") -> None:
+    """
+    Drop cached results, e.g. after changing a prompt template or model.
+
+    Args:
+        target: "resume_data", "match" or "all"
+
+    Raises:
+        ValueError: If target is not a known cache
+    """
+    if target not in ("resume_data", "match", "all"):
+        raise ValueError(f"Unknown cache: {target}")
+    if target in ("resume_data", "all"):
+        resume_data_cache.clear()
+    if target in ("match", "all"):
+        match_result_cache.clear()
@@ -0,0 +1,437 @@
+"""
+Searchable store of extracted candidates.
+
+Every resume the pipeline extracts is saved with its structured data, so
+recruiters can search past candidates ("Kubernetes and 5+ years")
+without uploading and screening the PDFs again.
+
+Search uses two indexes:
+
+    candidate_terms  inverted index from a term to the candidates that
+                     have it: canonical skills ("skill:kubernetes"),
+                     skill categories ("category:cloud"), words of
+                     previous roles ("role:engineer") and of education
+                     ("edu:computer")
+    experience_years B-tree index for range filters on years of experience
+
+Term filters are intersected starting from the shortest posting list.
+"""
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from core.metrics import histogram
+from core.prescore import terms
+from core.skills import SKILL_IDS_FIELD, get_taxonomy, normalize_key
+
+logger = logging.getLogger(__name__)
+
+# SQLite file for the candidate store, ":memory:" to keep candidates in memory
+CANDIDATES_DB = os.getenv("CANDIDATES_DB") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "candidates.db"
+)
+
+# Largest page of search results
+CANDIDATE_SEARCH_MAX_LIMIT = 500
+
+# Values bound per "IN (...)" lookup, below SQLite's host parameter limit
+_IN_CHUNK = 500
+
+_SUMMARY_COLUMNS = "id, name, email, filename, experience_years, record, created_at, updated_at, seq"
+_EMPTY: FrozenSet[int] = frozenset()
+
+CANDIDATE_SEARCH_SECONDS = histogram(
+    "candidate_search_seconds", "Time to run a candidate search",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+)
+
+
+def candidate_id(file_bytes: bytes) -> str:
+    """
+    Identify a candidate by the bytes of their resume PDF.
+
+    Args:
+        file_bytes: Raw bytes of the PDF file
+
+    Returns:
+        str: Candidate id; uploading the same PDF again gives the same id
+    """
+    return hashlib.sha256(file_bytes).hexdigest()[:24]
+
+
+def _as_list(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(item) for item in value if item]
+    return [str(value)] if value else []
+
+
+def index_terms(resume_data: Dict[str, Any]) -> Set[str]:
+    """
+    Collect the inverted index terms of a candidate.
+
+    Args:
+        resume_data: Structured resume data
+
+    Returns:
+        set: Prefixed skill, category, role and education terms
+    """
+    taxonomy = get_taxonomy()
+    skills = _as_list(resume_data.get("skills"))
+    if SKILL_IDS_FIELD in resume_data:
+        skill_ids = _as_list(resume_data[SKILL_IDS_FIELD])
+        unmatched = [skill for skill in skills if not taxonomy.lookup(skill) and not taxonomy.scan(skill)]
+    else:
+        skill_ids, unmatched = taxonomy.normalize(skills)
+    index = {f"skill:{skill_id}" for skill_id in skill_ids}
+    index.update(f"skill:{normalize_key(skill)}" for skill in unmatched)
+    for skill_id in skill_ids:
+        index.update(f"category:{category}" for category in taxonomy.category_path(skill_id))
+    for role in _as_list(resume_data.get("previous_roles")):
+        index.update(f"role:{term}" for term in terms(role))
+    for education in _as_list(resume_data.get("education")):
+        index.update(f"edu:{term}" for term in terms(education))
+    return index
+
+
+def query_terms(skills: Iterable[str] = (), categories: Iterable[str] = (), roles: Iterable[str] = (),
+                education: Iterable[str] = ()) -> Set[str]:
+    """
+    Turn search filters into the index terms a candidate must have.
+
+    Args:
+        skills: Free-text skills, normalized like extracted skills
+        categories: Skill category ids
+        roles: Role words or phrases, every word must match
+        education: Education words or phrases, every word must match
+
+    Returns:
+        set: Required index terms
+    """
+    taxonomy = get_taxonomy()
+    required = set()
+    for skill in skills:
+        skill_ids = [taxonomy.lookup(skill)] if taxonomy.lookup(skill) else taxonomy.scan(skill)
+        required.update(f"skill:{skill_id}" for skill_id in skill_ids or [normalize_key(skill)])
+    required.update(f"category:{category}" for category in categories)
+    for role in roles:
+        required.update(f"role:{term}" for term in terms(role))
+    for item in education:
+        required.update(f"edu:{term}" for term in terms(item))
+    return required
+
+
+class CandidateStore:
+    """
+    Extracted candidates in SQLite with an inverted index over their terms.
+
+    SQLite holds the records and the postings. Term searches run on an
+    in-memory copy where each term's postings are split by years of
+    experience (term -> years -> candidate numbers), so filtering the year
+    range and ranking by experience need no per-candidate work and terms
+    are intersected one year bucket at a time. The copy is
+    loaded on the first search and brought up to date from the change
+    counter before every search, so saves from other worker processes
+    are seen too.
+
+    Args:
+        path: SQLite database file, or ":memory:"
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            # Readers are not blocked while a screening saves a candidate
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            " seq INTEGER PRIMARY KEY,"
+            " id TEXT NOT NULL UNIQUE,"
+            " name TEXT,"
+            " email TEXT,"
+            " filename TEXT,"
+            " experience_years REAL NOT NULL,"
+            " record TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS candidates_experience ON candidates (experience_years)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS candidates_version ON candidates (version)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS candidate_terms ("
+            " term TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " PRIMARY KEY (term, seq)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS candidate_terms_seq ON candidate_terms (seq)")
+        self._conn.commit()
+        self._postings: Dict[str, Dict[float, Set[int]]] = {}
+        self._terms_of: Dict[int, Set[str]] = {}
+        self._years: Dict[int, float] = {}
+        self._year_values: List[float] = []
+        self._synced_version = 0
+
+    def save(self, candidate: str, resume_data: Dict[str, Any], filename: Optional[str] = None) -> bool:
+        """
+        Insert or update a candidate and its index terms.
+
+        Args:
+            candidate: Candidate id from candidate_id
+            resume_data: Structured resume data
+            filename: Uploaded file name, kept from earlier saves if None
+
+        Returns:
+            bool: False if the stored record was already identical
+        """
+        record = json.dumps(resume_data, sort_keys=True)
+        contact = resume_data.get("contact_info") or {}
+        try:
+            years = float(resume_data.get("experience_years") or 0)
+        except (TypeError, ValueError):
+            years = 0.0
+        index = index_terms(resume_data)
+        now = time.time()
+        with self._lock:
+            # The write lock is taken before the version is read, so two
+            # processes saving at once cannot allocate the same version
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT seq, record, filename FROM candidates WHERE id = ?", (candidate,)
+                ).fetchone()
+                if row is not None and row[1] == record and (filename is None or row[2] == filename):
+                    self._conn.rollback()
+                    return False
+                version = self._conn.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM candidates").fetchone()[0]
+                if row is None:
+                    seq = self._conn.execute(
+                        "INSERT INTO candidates"
+                        " (id, name, email, filename, experience_years, record, version, created_at, updated_at)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (candidate, contact.get("name"), contact.get("email"), filename, years, record, version,
+                         now, now)
+                    ).lastrowid
+                else:
+                    seq = row[0]
+                    self._conn.execute(
+                        "UPDATE candidates SET name = ?, email = ?, filename = COALESCE(?, filename),"
+                        " experience_years = ?, record = ?, version = ?, updated_at = ? WHERE seq = ?",
+                        (contact.get("name"), contact.get("email"), filename, years, record, version, now, seq)
+                    )
+                    self._conn.execute("DELETE FROM candidate_terms WHERE seq = ?", (seq,))
+                self._conn.executemany(
+                    "INSERT INTO candidate_terms (term, seq) VALUES (?, ?)", [(term, seq) for term in index]
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return True
+
+    def _select_in(self, query: str, values: List[Any]) -> List[Any]:
+        # Run a query ending in "IN ({})" over values, a chunk at a time
+        rows: List[Any] = []
+        for start in range(0, len(values), _IN_CHUNK):
+            chunk = values[start:start + _IN_CHUNK]
+            rows.extend(self._conn.execute(query.format(",".join("?" * len(chunk))), chunk).fetchall())
+        return rows
+
+    def _sync(self) -> None:
+        # Apply candidates saved since the last sync, by any process
+        latest = self._conn.execute("SELECT COALESCE(MAX(version), 0) FROM candidates").fetchone()[0]
+        if latest == self._synced_version:
+            return
+        changed = self._conn.execute(
+            "SELECT seq, experience_years FROM candidates WHERE version > ?", (self._synced_version,)
+        ).fetchall()
+        if self._synced_version == 0:
+            postings = self._conn.execute("SELECT term, seq FROM candidate_terms")
+        else:
+            postings = self._select_in("SELECT term, seq FROM candidate_terms WHERE seq IN ({})",
+                                       [seq for seq, _ in changed])
+        for seq, years in changed:
+            for term in self._terms_of.pop(seq, ()):
+                self._postings[term][self._years[seq]].discard(seq)
+            self._terms_of[seq] = set()
+            self._years[seq] = years
+            position = bisect.bisect_left(self._year_values, years)
+            if position == len(self._year_values) or self._year_values[position] != years:
+                self._year_values.insert(position, years)
+        years_of = self._years
+        for term, seq in postings:
+            self._postings.setdefault(term, {}).setdefault(years_of[seq], set()).add(seq)
+            self._terms_of[seq].add(term)
+        self._synced_version = latest
+
+    def get(self, candidate: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a stored candidate.
+
+        Args:
+            candidate: Candidate id
+
+        Returns:
+            dict: Candidate summary with the full resume data, or None
+        """
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_SUMMARY_COLUMNS} FROM candidates WHERE id = ?", (candidate,)).fetchone()
+        if row is None:
+            return None
+        return {**self._summary(row), "resume_data": json.loads(row[5])}
+
+    def get_many(self, seqs: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Look up stored candidates by their candidate numbers.
+
+        Args:
+            seqs: Candidate numbers, as from changes
+
+        Returns:
+            dict: Candidate summaries with the full resume data, keyed by
+                candidate number; unknown numbers are left out
+        """
+        with self._lock:
+            rows = self._select_in(f"SELECT {_SUMMARY_COLUMNS} FROM candidates WHERE seq IN ({{}})", seqs)
+        return {row[8]: {**self._summary(row), "resume_data": json.loads(row[5])} for row in rows}
+
+    def changes(self, since_version: int) -> Tuple[int, List[Tuple[int, Dict[str, Any]]]]:
+        """
+        Get the candidates saved after a version, for indexes kept outside the store.
+
+        Args:
+            since_version: Version returned by the previous call, 0 for all
+
+        Returns:
+            tuple: (latest version, (candidate number, resume data) pairs)
+        """
+        with self._lock:
+            latest = self._conn.execute("SELECT COALESCE(MAX(version), 0) FROM candidates").fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT seq, record FROM candidates WHERE version > ? AND version <= ?", (since_version, latest)
+            ).fetchall()
+        return latest, [(seq, json.loads(record)) for seq, record in rows]
+
+    def search(self, required_terms: Set[str], min_years: Optional[float] = None,
+               max_years: Optional[float] = None, limit: int = 50, offset: int = 0) -> Dict[str, Any]:
+        """
+        Find candidates that have every required term and fit the year range.
+
+        Args:
+            required_terms: Index terms from query_terms
+            min_years: Minimum years of experience, inclusive
+            max_years: Maximum years of experience, inclusive
+            limit: Page size
+            offset: Results to skip
+
+        Returns:
+            dict: Total matches and one page of candidate summaries, most
+                experienced first
+        """
+        started = time.perf_counter()
+        low = float("-inf") if min_years is None else min_years
+        high = float("inf") if max_years is None else max_years
+        with self._lock:
+            if required_terms:
+                self._sync()
+                # Shortest posting list first
+                postings = sorted(
+                    (self._postings.get(term, {}) for term in required_terms),
+                    key=lambda buckets: sum(map(len, buckets.values()))
+                )
+                # Walk the year buckets from the most experienced down
+                total = 0
+                page: List[int] = []
+                wanted = offset + limit
+                start = bisect.bisect_right(self._year_values, high)
+                stop = bisect.bisect_left(self._year_values, low)
+                for years in reversed(self._year_values[stop:start]):
+                    hits = postings[0].get(years)
+                    for other in postings[1:]:
+                        if not hits:
+                            break
+                        hits = hits & other.get(years, _EMPTY)
+                    if not hits:
+                        continue
+                    total += len(hits)
+                    if len(page) < wanted:
+                        page.extend(sorted(hits, reverse=True)[:wanted - len(page)])
+                page = page[offset:]
+                rows = self._select_in(f"SELECT {_SUMMARY_COLUMNS} FROM candidates WHERE seq IN ({{}})", page)
+                order = {seq: position for position, seq in enumerate(page)}
+                rows.sort(key=lambda row: order[row[8]])
+            else:
+                # Year range only: served by the experience_years index
+                where = " WHERE experience_years BETWEEN ? AND ?"
+                bounds = [low, high]
+                total = self._conn.execute(f"SELECT COUNT(*) FROM candidates{where}", bounds).fetchone()[0]
+                rows = self._conn.execute(
+                    f"SELECT {_SUMMARY_COLUMNS} FROM candidates{where}"
+                    " ORDER BY experience_years DESC, seq DESC LIMIT ? OFFSET ?",
+                    bounds + [limit, offset]
+                ).fetchall()
+        elapsed = time.perf_counter() - started
+        CANDIDATE_SEARCH_SECONDS.observe(elapsed)
+        return {
+            "total": total,
+            "candidates": [self._summary(row) for row in rows],
+            "took_ms": round(elapsed * 1000, 2),
+        }
+
+    @staticmethod
+    def _summary(row: Any) -> Dict[str, Any]:
+        resume_data = json.loads(row[5])
+        return {
+            "id": row[0],
+            "name": row[1],
+            "email": row[2],
+            "filename": row[3],
+            "experience_years": row[4],
+            "skill_ids": resume_data.get(SKILL_IDS_FIELD, []),
+            "previous_roles": resume_data.get("previous_roles", []),
+            "education": resume_data.get("education", []),
+            "created_at": row[6],
+            "updated_at": row[7],
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the size of the store.
+
+        Returns:
+            dict: Stored candidates, index postings and indexed terms
+        """
+        with self._lock:
+            candidates = self._conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+            postings = self._conn.execute("SELECT COUNT(*) FROM candidate_terms").fetchone()[0]
+            terms_loaded = len(self._postings)
+        return {"candidates": candidates, "postings": postings, "terms_in_memory": terms_loaded}
+
+
+async def save_candidate(file_bytes: bytes, resume_data: Dict[str, Any], filename: Optional[str] = None) -> None:
+    """
+    Save an extracted resume to the candidate store without blocking the loop.
+
+    A failure is logged and does not fail the screening that triggered it.
+
+    Args:
+        file_bytes: Raw bytes of the PDF file
+        resume_data: Structured resume data
+        filename: Uploaded file name
+    """
+    try:
+        await asyncio.to_thread(candidate_store.save, candidate_id(file_bytes), resume_data, filename)
+    except Exception as e:
+        logger.error(f"Saving candidate failed: {str(e)}")
+
+
+candidate_store = CandidateStore(CANDIDATES_DB)
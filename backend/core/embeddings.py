@@ -0,0 +1,355 @@
+"""
+Embedding retrieval of stored candidates for a job description.
+
+Comparing a JD with every stored candidate through Gemini is far too
+slow for a large pool. Retrieval embeds every candidate once and the JD
+per request, and ranks candidates by cosine similarity, so only the top
+K are sent to the comparison.
+
+Embeddings come from a pluggable local model (EMBEDDING_MODEL, any
+sentence-transformers model when the package is installed) or from the
+default hashing vectorizer, which needs no model and runs offline. The
+hashing vectorizer maps each term into one of EMBEDDING_DIM buckets;
+skills become their canonical id plus their skill categories, so a JD
+asking for "GCP" still ranks an AWS engineer above a teacher.
+
+Vectors are kept in a NumPy matrix, one row per candidate number, and
+searched by brute force. With EMBEDDING_INDEX_PATH the matrix is a
+memory-mapped file, so a restart does not embed every candidate again.
+The index follows the candidate store through its change counter.
+"""
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.candidates import CandidateStore, candidate_store
+from core.metrics import histogram
+from core.prescore import build_jd_index, terms
+from core.skills import SKILL_IDS_FIELD, get_taxonomy
+
+logger = logging.getLogger(__name__)
+
+# "hashing" or the name of a local sentence-transformers model
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "hashing")
+
+# Dimensions of hashing vectorizer embeddings
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "256"))
+
+# File for the memory-mapped embedding matrix, empty to keep it in memory
+EMBEDDING_INDEX_PATH = os.getenv("EMBEDDING_INDEX_PATH", "")
+
+# Candidates embedded per model call while the index catches up
+EMBEDDING_BATCH_SIZE = 256
+
+# Weight of a skill's categories relative to the skill itself
+CATEGORY_WEIGHT = 0.5
+
+EMBEDDING_SEARCH_SECONDS = histogram(
+    "embedding_search_seconds", "Time to retrieve the nearest candidates for a job description",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+)
+
+
+def _as_list(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(item) for item in value if item]
+    return [str(value)] if value else []
+
+
+def resume_document(resume_data: Dict[str, Any]) -> str:
+    """
+    Render the parts of structured resume data that describe fit for a role.
+
+    Args:
+        resume_data: Structured resume data
+
+    Returns:
+        str: Skills, previous roles, education and achievements as text
+    """
+    taxonomy = get_taxonomy()
+    skills = _as_list(resume_data.get("skills"))
+    # Canonical names let a model see "Kubernetes" for "k8s"
+    skills += [
+        taxonomy.skills[skill_id]["name"]
+        for skill_id in _as_list(resume_data.get(SKILL_IDS_FIELD)) if skill_id in taxonomy.skills
+    ]
+    return "\n".join([
+        "Skills: " + ", ".join(skills),
+        "Roles: " + ", ".join(_as_list(resume_data.get("previous_roles"))),
+        "Education: " + ", ".join(_as_list(resume_data.get("education"))),
+        "Achievements: " + "; ".join(_as_list(resume_data.get("key_achievements"))),
+    ])
+
+
+def jd_document(jd_text: str) -> str:
+    """
+    Render the requirement lines of a job description, as the pre-scorer reads them.
+
+    Args:
+        jd_text: Job description text
+
+    Returns:
+        str: Requirement lines, or the whole text if it has none
+    """
+    return "\n".join(line for line, _ in build_jd_index(jd_text).requirements) or jd_text
+
+
+@functools.lru_cache(maxsize=65536)
+def _bucket(term: str, dim: int) -> Tuple[int, float]:
+    # Stable across processes, unlike hash()
+    value = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "big")
+    return value % dim, 1.0 if value >> 63 else -1.0
+
+
+class HashingEmbedder:
+    """
+    Deterministic embeddings from hashed terms, needing no model.
+
+    Args:
+        dim: Number of dimensions
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            np.ndarray: float32 matrix with one unit-length row per text;
+                texts without terms get a zero row
+        """
+        taxonomy = get_taxonomy()
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            weights: Dict[str, float] = {}
+            for term in terms(text):
+                weights[term] = 1.0
+                for category in taxonomy.category_path(term):
+                    key = f"category:{category}"
+                    weights[key] = weights.get(key, 0.0) + CATEGORY_WEIGHT
+            for term, weight in weights.items():
+                column, sign = _bucket(term, self.dim)
+                vectors[row, column] += sign * weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return np.divide(vectors, norms, out=vectors, where=norms > 0)
+
+
+class SentenceTransformerEmbedder:
+    """
+    Embeddings from a local sentence-transformers model.
+
+    Args:
+        model_name: Model name or path
+
+    Raises:
+        ImportError: If sentence-transformers is not installed
+    """
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name)
+        self.dim = int(self._model.get_sentence_embedding_dimension())
+        self.name = model_name
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            np.ndarray: float32 matrix with one unit-length row per text
+        """
+        return np.asarray(self._model.encode(texts, normalize_embeddings=True), dtype=np.float32)
+
+
+@functools.lru_cache(maxsize=1)
+def get_embedder() -> Any:
+    """
+    Get the process-wide embedder, loading the model on first use.
+
+    Falls back to the hashing vectorizer if EMBEDDING_MODEL cannot be
+    loaded.
+
+    Returns:
+        HashingEmbedder or SentenceTransformerEmbedder: Embedder
+    """
+    if EMBEDDING_MODEL and EMBEDDING_MODEL != "hashing":
+        try:
+            return SentenceTransformerEmbedder(EMBEDDING_MODEL)
+        except Exception as e:
+            logger.warning(f"Embedding model {EMBEDDING_MODEL} unavailable, using the hashing vectorizer: {str(e)}")
+    return HashingEmbedder(EMBEDDING_DIM)
+
+
+class CandidateVectorIndex:
+    """
+    Embeddings of stored candidates, searched by brute-force cosine similarity.
+
+    Row n of the matrix holds candidate number n. Rows are embedded
+    when the candidate is first seen or its record changes, before the
+    next search. With a path, the matrix is memory-mapped from that file
+    and a small "<path>.json" records the model and the last change
+    applied; the file is rebuilt when the model changes.
+
+    Args:
+        store: Candidate store to follow
+        path: File for the memory-mapped matrix, or None to keep it in memory
+        embedder: Embedder to use, get_embedder() if None
+    """
+
+    def __init__(self, store: CandidateStore, path: Optional[str] = None, embedder: Any = None):
+        self.store = store
+        self.path = path or None
+        self._embedder = embedder
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._present = np.zeros(0, dtype=bool)
+        self._synced_version = 0
+
+    @property
+    def embedder(self) -> Any:
+        """Embedder of this index, loaded on first use."""
+        if self._embedder is None:
+            self._embedder = get_embedder()
+        return self._embedder
+
+    def _load(self) -> None:
+        # Reopen the memory-mapped matrix if it was built by the same model
+        dim = self.embedder.dim
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        if self.path is None:
+            return
+        try:
+            with open(f"{self.path}.json", "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = {}
+        rows = os.path.getsize(self.path) // (4 * dim) if os.path.exists(self.path) else 0
+        if meta.get("model") != self.embedder.name or meta.get("dim") != dim or not rows:
+            open(self.path, "wb").close()
+            return
+        self._matrix = np.memmap(self.path, dtype=np.float32, mode="r+", shape=(rows, dim))
+        self._present = np.any(self._matrix != 0, axis=1)
+        self._synced_version = int(meta.get("version", 0))
+
+    def _grow(self, rows: int) -> None:
+        dim = self.embedder.dim
+        rows = max(rows, 2 * len(self._matrix), 1024)
+        if self.path is None:
+            grown = np.zeros((rows, dim), dtype=np.float32)
+            grown[:len(self._matrix)] = self._matrix
+            self._matrix = grown
+        else:
+            if isinstance(self._matrix, np.memmap):
+                self._matrix.flush()
+            self._matrix = None
+            os.truncate(self.path, rows * dim * 4)
+            self._matrix = np.memmap(self.path, dtype=np.float32, mode="r+", shape=(rows, dim))
+        present = np.zeros(rows, dtype=bool)
+        present[:len(self._present)] = self._present
+        self._present = present
+
+    def _save_meta(self) -> None:
+        if self.path is None:
+            return
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+        meta = {"model": self.embedder.name, "dim": self.embedder.dim, "version": self._synced_version}
+        with open(f"{self.path}.json.tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(f"{self.path}.json.tmp", f"{self.path}.json")
+
+    def _sync(self) -> None:
+        if self._matrix is None:
+            self._load()
+        latest, changed = self.store.changes(self._synced_version)
+        if latest == self._synced_version:
+            return
+        if latest < self._synced_version:
+            # The store was replaced since the matrix was written
+            self._matrix[:] = 0
+            self._present[:] = False
+            latest, changed = self.store.changes(0)
+        if changed:
+            started = time.perf_counter()
+            highest = max(seq for seq, _ in changed)
+            if highest >= len(self._matrix):
+                self._grow(highest + 1)
+            for start in range(0, len(changed), EMBEDDING_BATCH_SIZE):
+                chunk = changed[start:start + EMBEDDING_BATCH_SIZE]
+                seqs = [seq for seq, _ in chunk]
+                self._matrix[seqs] = self.embedder.embed([resume_document(data) for _, data in chunk])
+                self._present[seqs] = True
+            logger.info(f"Embedded {len(changed)} candidates in {time.perf_counter() - started:.2f}s")
+        self._synced_version = latest
+        self._save_meta()
+
+    def search(self, jd_text: str, top_k: int) -> Dict[str, Any]:
+        """
+        Find the candidates most similar to a job description.
+
+        Args:
+            jd_text: Job description text
+            top_k: Number of candidates to return
+
+        Returns:
+            dict: "matches" as (candidate number, similarity) pairs, most
+                similar first, the number of candidates searched and the
+                search time
+        """
+        started = time.perf_counter()
+        query = self.embedder.embed([jd_document(jd_text)])[0]
+        with self._lock:
+            self._sync()
+            scores = np.asarray(self._matrix @ query)
+            scores[~self._present] = -np.inf
+            searched = int(self._present.sum())
+        k = min(top_k, searched)
+        if k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+        else:
+            top = np.zeros(0, dtype=np.int64)
+        elapsed = time.perf_counter() - started
+        EMBEDDING_SEARCH_SECONDS.observe(elapsed)
+        return {
+            "matches": [(int(seq), float(scores[seq])) for seq in top],
+            "searched": searched,
+            "took_ms": round(elapsed * 1000, 2),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the size of the index.
+
+        Returns:
+            dict: Model, dimensions, embedded candidates and whether the
+                matrix is memory-mapped
+        """
+        with self._lock:
+            embedded = int(self._present.sum())
+        return {
+            "model": self.embedder.name,
+            "dim": self.embedder.dim,
+            "embedded": embedded,
+            "memory_mapped": self.path is not None,
+        }
+
+
+candidate_vectors = CandidateVectorIndex(candidate_store, EMBEDDING_INDEX_PATH)
@@ -0,0 +1,186 @@
+"""
+Health state for liveness and readiness probes.
+
+Checking Gemini on every probe cost a real generate call each time, and
+load balancers probe every few seconds. Instead a background task
+probes Gemini every HEALTH_PROBE_INTERVAL seconds and the health
+endpoints answer from the last result. A probe is skipped when a real
+Gemini call already succeeded within the interval, so a busy server
+sends no probe calls at all. The first probe starts in the background at
+startup, so the server does not wait on Gemini; until it finishes the
+status is unknown and readiness fails.
+
+    liveness   the process is serving requests
+    readiness  Gemini was reachable within HEALTH_MAX_AGE seconds
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from core.llm_client import test_gemini_connection_async
+from core.llm_registry import last_success_at
+from core.metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+# Seconds between Gemini probes
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "60"))
+# Seconds before a probe counts as failed
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "10"))
+# Readiness fails once Gemini has not been reachable for this many seconds
+HEALTH_MAX_AGE = float(os.getenv("HEALTH_MAX_AGE", str(3 * HEALTH_PROBE_INTERVAL)))
+
+GEMINI_UP = gauge("gemini_up", "1 if Gemini was reachable at the last health probe")
+HEALTH_PROBES = counter("health_probes_total", "Gemini health probes by outcome (ok, failed, timeout or skipped)",
+                        ["outcome"])
+HEALTH_PROBE_SECONDS = histogram(
+    "health_probe_seconds", "Latency of Gemini health probes",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10)
+)
+
+
+class HealthProber:
+    """
+    Background task that keeps the Gemini status fresh.
+
+    Args:
+        probe: Coroutine returning True if Gemini answers
+        last_traffic: Returns when a real Gemini call last succeeded
+        interval: Seconds between probes
+        timeout: Seconds before a probe counts as failed
+        max_age: Seconds a successful probe keeps the server ready
+    """
+
+    def __init__(self, probe: Callable[[], Awaitable[bool]], last_traffic: Callable[[], float],
+                 interval: float = HEALTH_PROBE_INTERVAL, timeout: float = HEALTH_PROBE_TIMEOUT,
+                 max_age: float = HEALTH_MAX_AGE):
+        self.probe = probe
+        self.last_traffic = last_traffic
+        self.interval = interval
+        self.timeout = timeout
+        self.max_age = max_age
+        self.started_at = time.time()
+        self._task: Optional[asyncio.Task] = None
+        self._state: Dict[str, Any] = {
+            "gemini": "unknown",
+            "last_probe_at": None,
+            "last_probe_ms": None,
+            "last_probe_source": None,
+            "last_success_at": None,
+            "last_error": None,
+            "consecutive_failures": 0,
+        }
+
+    def start(self) -> None:
+        """Start probing in the background; the first probe runs right away."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Cancel the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self.interval)
+
+    async def probe_once(self) -> Dict[str, Any]:
+        """
+        Refresh the Gemini status now.
+
+        Returns:
+            dict: Updated status, as from state
+        """
+        started = time.time()
+        traffic = self.last_traffic()
+        if started - traffic < self.interval:
+            HEALTH_PROBES.inc(outcome="skipped")
+            self._record(True, traffic, None, "traffic", None)
+            return self.state()
+
+        error = None
+        try:
+            ok = await asyncio.wait_for(self.probe(), self.timeout)
+            if not ok:
+                error = "Gemini did not answer the probe"
+            HEALTH_PROBES.inc(outcome="ok" if ok else "failed")
+        except asyncio.TimeoutError:
+            ok, error = False, f"Probe timed out after {self.timeout:g}s"
+            HEALTH_PROBES.inc(outcome="timeout")
+        except Exception as e:
+            ok, error = False, str(e)
+            HEALTH_PROBES.inc(outcome="failed")
+        elapsed = time.time() - started
+        HEALTH_PROBE_SECONDS.observe(elapsed)
+        if not ok:
+            logger.warning(f"Gemini health probe failed: {error}")
+        self._record(ok, started, round(elapsed * 1000, 1), "probe", error)
+        return self.state()
+
+    def _record(self, ok: bool, at: float, latency_ms: Optional[float], source: str, error: Optional[str]) -> None:
+        state = self._state
+        state["gemini"] = "connected" if ok else "disconnected"
+        state["last_probe_at"] = at
+        state["last_probe_source"] = source
+        if latency_ms is not None:
+            state["last_probe_ms"] = latency_ms
+        state["last_error"] = error
+        state["consecutive_failures"] = 0 if ok else state["consecutive_failures"] + 1
+        if ok:
+            state["last_success_at"] = at
+        GEMINI_UP.set(1 if ok else 0)
+
+    def state(self) -> Dict[str, Any]:
+        """
+        Get the cached Gemini status.
+
+        Returns:
+            dict: Status ("connected", "disconnected" or "unknown" before
+                the first probe), when and how it was last checked
+                ("probe", or "traffic" when a real call proved it), probe
+                latency, age of the last check, last error and failures
+                in a row
+        """
+        now = time.time()
+        state = dict(self._state)
+        state["last_probe_age_s"] = round(now - state["last_probe_at"], 1) if state["last_probe_at"] else None
+        return state
+
+    def status(self) -> str:
+        """
+        Summarize the Gemini status for the health endpoint.
+
+        Returns:
+            str: "healthy" if Gemini is connected, "degraded" if the last
+                check failed, "unknown" before the first check
+        """
+        return {"connected": "healthy", "disconnected": "degraded"}.get(self._state["gemini"], "unknown")
+
+    def live(self) -> Dict[str, Any]:
+        """
+        Get the liveness status, which needs no Gemini state.
+
+        Returns:
+            dict: Status and process uptime
+        """
+        return {"status": "alive", "uptime_s": round(time.time() - self.started_at, 1)}
+
+    def ready(self) -> bool:
+        """
+        Check whether the server can screen resumes.
+
+        Returns:
+            bool: True if a probe or a real call reached Gemini within
+                max_age seconds
+        """
+        last_success = max(self._state["last_success_at"] or 0.0, self.last_traffic())
+        return time.time() - last_success <= self.max_age
+
+
+health_prober = HealthProber(test_gemini_connection_async, last_success_at)
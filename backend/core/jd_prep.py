@@ -0,0 +1,121 @@
+"""
+Job description preprocessing.
+
+Everything the pipeline needs from a job description - the normalized
+text and its hash for cache keys, the token-budgeted text for prompts and
+the list of requirements - depends only on the JD, so it is computed once
+per distinct JD and memoized. The screening pipeline starts it while the
+PDF is still being parsed and the resume extracted.
+"""
+import functools
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from core.tokens import BudgetResult, JD_SECTION_PRIORITY, fit_jd_text, section_priority, split_sections
+
+# Distinct job descriptions kept prepared in memory
+JD_PREP_CACHE_SIZE = int(os.getenv("JD_PREP_CACHE_SIZE", "256"))
+
+# Sections at or above this priority hold requirements (requirements,
+# responsibilities, preferred qualifications, experience)
+REQUIREMENT_MIN_PRIORITY = 6
+
+_BULLET = re.compile(r"^\s*(?:[-*•▪●◦]|\d+[.)])\s+")
+_LABELED = re.compile(r"^\s*([A-Za-z][A-Za-z &/'-]{1,40}):\s+(\S.*)$")
+
+
+@dataclass(frozen=True)
+class PreparedJD:
+    """
+    A job description ready for matching.
+
+    Attributes:
+        text: Original job description text
+        normalized: Lowercased text with single spaces
+        digest: SHA-256 hex digest of the normalized text
+        budgeted: Text trimmed to the JD token budget
+        requirements: Bullet points from the requirement sections
+    """
+    text: str
+    normalized: str
+    digest: str
+    budgeted: BudgetResult
+    requirements: Tuple[str, ...]
+
+
+def normalize_jd_text(jd_text: str) -> str:
+    """
+    Normalize a job description for hashing: lowercase, single spaces.
+
+    Args:
+        jd_text: Job description text
+
+    Returns:
+        str: Normalized text
+    """
+    return " ".join(jd_text.lower().split())
+
+
+def extract_requirements(jd_text: str) -> List[str]:
+    """
+    Collect the bullet points of a job description's requirement sections.
+
+    Inline requirement lines such as "Required skills: Python, SQL" count
+    as requirements wherever they appear. If the JD has no recognizable
+    requirement sections, bullets from the whole text are used.
+
+    Args:
+        jd_text: Job description text
+
+    Returns:
+        list: Requirement lines without their bullet markers
+    """
+    requirements: List[str] = []
+    all_bullets: List[str] = []
+    for heading, body in split_sections(jd_text):
+        lines = body.splitlines()[1:] if heading else body.splitlines()
+        for line in lines:
+            labeled = _LABELED.match(line)
+            if labeled and section_priority(labeled.group(1), JD_SECTION_PRIORITY) >= REQUIREMENT_MIN_PRIORITY:
+                requirements.append(labeled.group(2).strip())
+        bullets = [_BULLET.sub("", line).strip() for line in lines if _BULLET.match(line)]
+        bullets = [bullet for bullet in bullets if bullet]
+        all_bullets.extend(bullets)
+        if heading and section_priority(heading, JD_SECTION_PRIORITY) >= REQUIREMENT_MIN_PRIORITY:
+            requirements.extend(bullets)
+    return requirements or all_bullets
+
+
+@functools.lru_cache(maxsize=JD_PREP_CACHE_SIZE)
+def prepare_jd(jd_text: str) -> PreparedJD:
+    """
+    Preprocess a job description, reusing the result for repeated JDs.
+
+    Args:
+        jd_text: Job description text
+
+    Returns:
+        PreparedJD: Normalized, hashed and budgeted JD with its requirements
+    """
+    normalized = normalize_jd_text(jd_text)
+    return PreparedJD(
+        text=jd_text,
+        normalized=normalized,
+        digest=hashlib.sha256(normalized.encode("utf-8")).hexdigest(),
+        budgeted=fit_jd_text(jd_text),
+        requirements=tuple(extract_requirements(jd_text))
+    )
+
+
+def get_stats() -> Dict[str, int]:
+    """
+    Get prepared JD cache statistics.
+
+    Returns:
+        dict: Hits, misses and prepared JDs held
+    """
+    info = prepare_jd.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
@@ -0,0 +1,253 @@
+"""
+Registry of parsed job descriptions.
+
+Recruiters screen many candidates against the same few roles. A job
+description is registered once: Gemini extracts its requirements into a
+structured record, and screenings that pass the record's id send a
+compact rendering of those requirements instead of the full JD text, so
+every comparison prompt is smaller. Records are versioned; registering
+new text under an existing id adds a version. Concurrent registrations
+of the same text share one extraction and store one record.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.cache import SingleFlight
+from core.jd_prep import prepare_jd
+from core.llm_client import extract_jd_requirements_async
+from core.tokens import estimate_tokens
+
+# SQLite file for registered job descriptions, empty to keep them in memory
+JD_REGISTRY_DB = os.getenv("JD_REGISTRY_DB", "")
+
+# Requirement extractions in flight, by JD hash
+_extractions = SingleFlight()
+
+
+def _as_years(value: Any) -> Optional[float]:
+    # Gemini may answer "5+" or "3-5" despite the schema; such values are left out
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def render_requirements(requirements: Dict[str, Any]) -> str:
+    """
+    Render structured requirements as compact text for comparison prompts.
+
+    Args:
+        requirements: Record from extract_jd_requirements
+
+    Returns:
+        str: One line per requirement type, responsibilities as bullets
+    """
+    lines = []
+    title = requirements.get("title") or "Unspecified role"
+    seniority = requirements.get("seniority")
+    lines.append(f"Role: {title} ({seniority})" if seniority else f"Role: {title}")
+    if requirements.get("required_skills"):
+        lines.append("Required skills: " + ", ".join(requirements["required_skills"]))
+    if requirements.get("preferred_skills"):
+        lines.append("Preferred skills: " + ", ".join(requirements["preferred_skills"]))
+    years = _as_years(requirements.get("min_experience_years"))
+    if years:
+        lines.append(f"Minimum experience: {years:g} years")
+    if requirements.get("education"):
+        lines.append("Education: " + "; ".join(requirements["education"]))
+    if requirements.get("responsibilities"):
+        lines.append("Responsibilities:")
+        lines.extend(f"- {item}" for item in requirements["responsibilities"])
+    return "\n".join(lines)
+
+
+class JDRegistry:
+    """
+    Versioned job description records in SQLite.
+
+    Args:
+        path: SQLite database file, or ":memory:"
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_descriptions ("
+            " id TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " jd_hash TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " record TEXT NOT NULL,"
+            " PRIMARY KEY (id, version))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS job_descriptions_hash ON job_descriptions (jd_hash)")
+        self._conn.commit()
+
+    def add(self, jd_text: str, requirements: Dict[str, Any],
+            jd_id: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Store a parsed job description as a new record or a new version.
+
+        If the text is already registered (as the latest version of jd_id,
+        or as any record when jd_id is None) that record is returned
+        instead. The check and the insert run in one write transaction,
+        so concurrent registrations, from other processes too, neither
+        duplicate a record nor reuse a version number.
+
+        Args:
+            jd_text: Original job description text
+            requirements: Structured requirements extracted from it
+            jd_id: Existing id to add a version to, None for a new record
+
+        Returns:
+            tuple: (stored or existing record, True if it was stored now)
+        """
+        jd_hash = prepare_jd(jd_text).digest
+        compact_text = render_requirements(requirements)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if jd_id is None:
+                    row = self._conn.execute(
+                        "SELECT record FROM job_descriptions WHERE jd_hash = ? ORDER BY created_at DESC LIMIT 1",
+                        (jd_hash,)
+                    ).fetchone()
+                    existing = json.loads(row[0]) if row else None
+                    version = 1
+                else:
+                    row = self._conn.execute(
+                        "SELECT record FROM job_descriptions WHERE id = ? ORDER BY version DESC LIMIT 1", (jd_id,)
+                    ).fetchone()
+                    latest = json.loads(row[0]) if row else None
+                    existing = latest if latest is not None and latest["jd_hash"] == jd_hash else None
+                    version = latest["version"] + 1 if latest is not None else 1
+                if existing is not None:
+                    self._conn.rollback()
+                    return existing, False
+
+                record = {
+                    "id": jd_id or uuid.uuid4().hex[:12],
+                    "version": version,
+                    "created_at": time.time(),
+                    "jd_hash": jd_hash,
+                    "requirements": requirements,
+                    "compact_text": compact_text,
+                    "tokens": {"jd": estimate_tokens(jd_text), "compact": estimate_tokens(compact_text)},
+                    "jd_text": jd_text,
+                }
+                self._conn.execute(
+                    "INSERT INTO job_descriptions (id, version, jd_hash, created_at, record) VALUES (?, ?, ?, ?, ?)",
+                    (record["id"], version, jd_hash, record["created_at"], json.dumps(record))
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return record, True
+
+    def get(self, jd_id: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job description record.
+
+        Args:
+            jd_id: Record id
+            version: Version number, None for the latest
+
+        Returns:
+            dict: Record, or None if not found
+        """
+        with self._lock:
+            if version is None:
+                row = self._conn.execute(
+                    "SELECT record FROM job_descriptions WHERE id = ? ORDER BY version DESC LIMIT 1", (jd_id,)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT record FROM job_descriptions WHERE id = ? AND version = ?", (jd_id, version)
+                ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_by_hash(self, jd_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the newest record parsed from a job description with this hash.
+
+        Args:
+            jd_hash: Digest from core.jd_prep.prepare_jd
+
+        Returns:
+            dict: Record, or None if this JD was never registered
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record FROM job_descriptions WHERE jd_hash = ? ORDER BY created_at DESC LIMIT 1", (jd_hash,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list_latest(self) -> List[Dict[str, Any]]:
+        """
+        List the latest version of every job description.
+
+        Returns:
+            list: Id, version, title, seniority and creation time of each record
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record FROM job_descriptions AS jd WHERE version = ("
+                " SELECT MAX(version) FROM job_descriptions WHERE id = jd.id)"
+                " ORDER BY created_at DESC"
+            ).fetchall()
+        summaries = []
+        for (row,) in rows:
+            record = json.loads(row)
+            summaries.append({
+                "id": record["id"],
+                "version": record["version"],
+                "title": record["requirements"].get("title", ""),
+                "seniority": record["requirements"].get("seniority", ""),
+                "created_at": record["created_at"],
+            })
+        return summaries
+
+
+async def register_job_description(jd_text: str, jd_id: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+    """
+    Parse and store a job description unless it is already registered.
+
+    Concurrent registrations of the same text share one requirement
+    extraction, and only one of them stores a record.
+
+    Args:
+        jd_text: Job description text
+        jd_id: Existing id to add a version to, None to create a record
+
+    Returns:
+        tuple: (record, True if a new record or version was created)
+
+    Raises:
+        KeyError: If jd_id is given but not registered
+        Exception: If requirement extraction fails
+    """
+    jd_hash = prepare_jd(jd_text).digest
+    if jd_id is None:
+        existing = jd_registry.find_by_hash(jd_hash)
+    else:
+        existing = jd_registry.get(jd_id)
+        if existing is None:
+            raise KeyError(jd_id)
+        if existing["jd_hash"] != jd_hash:
+            existing = None
+    if existing is not None:
+        return existing, False
+
+    requirements = await _extractions.do(jd_hash, lambda: extract_jd_requirements_async(jd_text))
+    return jd_registry.add(jd_text, requirements, jd_id)
+
+
+jd_registry = JDRegistry(JD_REGISTRY_DB or ":memory:")
@@ -0,0 +1,487 @@
+"""
+Background job queue for screenings.
+
+POST /jobs/screen stores the upload and returns a job id straight away,
+and a fixed pool of asyncio workers drains the queue through the normal
+screening pipeline, so no HTTP connection is held open for the LLM round
+trip. Jobs are kept in memory by default, or in SQLite when JOBS_DB is
+set, in which case queued jobs also survive a restart. Results are
+polled with GET /jobs/{id} or POSTed to an optional webhook URL.
+
+Webhook URLs are resolved before a job is accepted and again before
+delivery, and hosts with private, loopback or link-local addresses are
+refused so the server cannot be pointed at its own network. Redirects
+are not followed.
+"""
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.parse
+import urllib.request
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.metrics import counter, gauge, histogram
+from core.screening import ScreeningError, screen_resume_bytes
+
+logger = logging.getLogger(__name__)
+
+# Worker tasks draining the queue per process
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Jobs allowed to wait in the queue before submissions are refused
+JOB_QUEUE_MAX_SIZE = int(os.getenv("JOB_QUEUE_MAX_SIZE", "1000"))
+# Total size of the uploads waiting in the queue before submissions are refused
+JOB_QUEUE_MAX_MB = float(os.getenv("JOB_QUEUE_MAX_MB", "256"))
+JOB_QUEUE_MAX_BYTES = int(JOB_QUEUE_MAX_MB * 1024 * 1024)
+# Seconds finished jobs are kept for polling
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "86400"))
+# SQLite file for jobs, empty to keep them in memory
+JOBS_DB = os.getenv("JOBS_DB", "")
+# Webhook delivery
+JOB_WEBHOOK_TIMEOUT = float(os.getenv("JOB_WEBHOOK_TIMEOUT", "10"))
+JOB_WEBHOOK_RETRIES = int(os.getenv("JOB_WEBHOOK_RETRIES", "3"))
+# Comma-separated webhook hosts; empty allows any public host. ".example.com" also allows subdomains
+JOB_WEBHOOK_ALLOWED_HOSTS = [
+    host.strip().lower() for host in os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()
+]
+# Allow webhooks to private, loopback and link-local addresses, e.g. in development
+JOB_WEBHOOK_ALLOW_PRIVATE = os.getenv("JOB_WEBHOOK_ALLOW_PRIVATE", "false").lower() == "true"
+
+QUEUE_DEPTH = gauge("jobs_queue_depth", "Jobs waiting for a worker")
+JOBS_RUNNING = gauge("jobs_running", "Jobs being processed by a worker")
+JOB_WAIT_SECONDS = histogram("job_wait_seconds", "Time jobs spend queued before a worker starts them", ["kind"])
+JOB_RUN_SECONDS = histogram("job_run_seconds", "Time workers spend processing a job", ["kind"])
+JOBS_FINISHED = counter("jobs_finished_total", "Jobs finished by kind and final status", ["kind", "status"])
+WEBHOOK_DELIVERIES = counter("job_webhook_deliveries_total", "Webhook deliveries by outcome", ["outcome"])
+
+# Job fields returned to clients
+JOB_FIELDS = [
+    "id", "kind", "status", "created_at", "started_at", "finished_at",
+    "result", "error", "webhook_url", "webhook_status",
+]
+
+JobHandler = Callable[[Dict[str, Any], bytes], Awaitable[Dict[str, Any]]]
+
+
+class QueueFullError(Exception):
+    """The job queue is at JOB_QUEUE_MAX_SIZE jobs or JOB_QUEUE_MAX_BYTES of uploads."""
+
+
+class MemoryJobStore:
+    """
+    Job records and their inputs kept in process memory.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._payloads: Dict[str, Tuple[Dict[str, Any], bytes]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict[str, Any], params: Dict[str, Any], data: bytes) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+            self._payloads[job["id"]] = (params, data)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def payload(self, job_id: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        with self._lock:
+            return self._payloads.get(job_id)
+
+    def delete_payload(self, job_id: str) -> None:
+        with self._lock:
+            self._payloads.pop(job_id, None)
+
+    def unfinished(self) -> List[str]:
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job["status"] in ("queued", "running")]
+        return [job["id"] for job in sorted(jobs, key=lambda job: job["created_at"])]
+
+    def prune(self, finished_before: float) -> int:
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job["finished_at"] and job["finished_at"] < finished_before
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+                self._payloads.pop(job_id, None)
+        return len(expired)
+
+    def count_by_status(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return counts
+
+
+class SQLiteJobStore:
+    """
+    Job records and their inputs stored in a SQLite database.
+
+    Args:
+        path: Path to the SQLite database file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " finished_at REAL,"
+            " record TEXT NOT NULL,"
+            " params TEXT,"
+            " data BLOB)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at)")
+        self._conn.commit()
+
+    def create(self, job: Dict[str, Any], params: Dict[str, Any], data: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, created_at, finished_at, record, params, data)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job["id"], job["status"], job["created_at"], job["finished_at"],
+                 json.dumps(job), json.dumps(params), data)
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            row = self._conn.execute("SELECT record FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            job = json.loads(row[0])
+            job.update(fields)
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, record = ? WHERE id = ?",
+                (job["status"], job["finished_at"], json.dumps(job), job_id)
+            )
+            self._conn.commit()
+
+    def payload(self, job_id: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        with self._lock:
+            row = self._conn.execute("SELECT params, data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def delete_payload(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET params = NULL, data = NULL WHERE id = ?", (job_id,))
+            self._conn.commit()
+
+    def unfinished(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def prune(self, finished_before: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (finished_before,)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+
+def _host_allowed(host: str) -> bool:
+    return any(
+        host == allowed or (allowed.startswith(".") and host.endswith(allowed))
+        for allowed in JOB_WEBHOOK_ALLOWED_HOSTS
+    )
+
+
+def check_webhook_url(url: str) -> None:
+    """
+    Check that a webhook URL is safe for the server to call.
+
+    The URL must be http(s), its host must be in JOB_WEBHOOK_ALLOWED_HOSTS
+    when that is set, and unless JOB_WEBHOOK_ALLOW_PRIVATE is set every
+    address the host resolves to must be public.
+
+    Args:
+        url: Webhook URL
+
+    Raises:
+        ValueError: If the URL is not allowed
+    """
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError("webhook_url must be an http or https URL")
+    host = parsed.hostname.lower()
+    if JOB_WEBHOOK_ALLOWED_HOSTS and not _host_allowed(host):
+        raise ValueError(f"webhook_url host {host} is not allowed")
+    if JOB_WEBHOOK_ALLOW_PRIVATE:
+        return
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, parsed.port or None, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError, ValueError):
+        raise ValueError(f"webhook_url host {host} cannot be resolved")
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%")[0])
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f"webhook_url host {host} resolves to a non-public address")
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # A redirect could lead to an address check_webhook_url refused
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_webhook_opener = urllib.request.build_opener(_NoRedirect)
+
+
+def _post_webhook(url: str, body: bytes) -> None:
+    # Checked again at delivery, as the host may resolve differently by now
+    check_webhook_url(url)
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+    with _webhook_opener.open(request, timeout=JOB_WEBHOOK_TIMEOUT) as response:
+        response.read()
+
+
+class JobQueue:
+    """
+    Queue of background jobs drained by a pool of asyncio worker tasks.
+
+    Workers are started on first use, on the running event loop. Jobs left
+    queued or running in a persistent store are picked up again then.
+
+    Args:
+        store: MemoryJobStore or SQLiteJobStore
+        handlers: Coroutine run for each job kind, called with the job's
+            params and data; its return value is the job result
+        workers: Number of worker tasks
+        max_size: Maximum number of queued jobs
+        max_bytes: Maximum total size of the data of queued jobs
+    """
+
+    def __init__(self, store: Any, handlers: Dict[str, JobHandler], workers: int = JOB_WORKERS,
+                 max_size: int = JOB_QUEUE_MAX_SIZE, max_bytes: int = JOB_QUEUE_MAX_BYTES):
+        self.store = store
+        self.handlers = handlers
+        self.workers = workers
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Data size of each job submitted in this process until it finishes
+        self._data_sizes: Dict[str, int] = {}
+
+    def start(self) -> None:
+        """Start the worker tasks and re-queue unfinished jobs."""
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        for job_id in self.store.unfinished():
+            self.store.update(job_id, status="queued", started_at=None)
+            self._queue.put_nowait(job_id)
+        QUEUE_DEPTH.set(self._queue.qsize())
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Started {self.workers} job workers, {self._queue.qsize()} jobs queued")
+
+    async def stop(self) -> None:
+        """Cancel the worker tasks; unfinished jobs stay in the store."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def submit(self, kind: str, params: Dict[str, Any], data: bytes = b"",
+                     webhook_url: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Add a job to the queue.
+
+        Args:
+            kind: Job kind, a key of handlers
+            params: JSON-serializable job parameters
+            data: Binary job input, e.g. the uploaded PDF
+            webhook_url: URL the finished job is POSTed to, if any
+
+        Returns:
+            dict: The queued job
+
+        Raises:
+            ValueError: If the kind is unknown or the webhook URL is not
+                allowed (see check_webhook_url)
+            QueueFullError: If the queue is at max_size jobs or the data
+                would take it past max_bytes
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if webhook_url:
+            await asyncio.to_thread(check_webhook_url, webhook_url)
+        self.start()
+        if self._queue.qsize() >= self.max_size:
+            raise QueueFullError(f"Job queue is full ({self.max_size} jobs waiting)")
+        if self.queued_bytes() + len(data) > self.max_bytes:
+            raise QueueFullError(f"Job queue is full ({self.max_bytes // (1024 * 1024)} MB of uploads waiting)")
+
+        now = time.time()
+        self.store.prune(now - JOB_RESULT_TTL)
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            "webhook_url": webhook_url or None,
+            "webhook_status": "pending" if webhook_url else None,
+        }
+        self.store.create(job, params, data)
+        self._data_sizes[job["id"]] = len(data)
+        self._queue.put_nowait(job["id"])
+        QUEUE_DEPTH.set(self._queue.qsize())
+        return job
+
+    def queued_bytes(self) -> int:
+        """Total data size of the jobs submitted in this process that have not finished."""
+        return sum(self._data_sizes.values())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a job.
+
+        Args:
+            job_id: Job id returned by submit
+
+        Returns:
+            dict: Job status, timestamps and result or error, or None if
+                unknown or expired
+        """
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        return {field: job.get(field) for field in JOB_FIELDS}
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            QUEUE_DEPTH.set(self._queue.qsize())
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"Job {job_id} crashed the worker: {str(e)}")
+            finally:
+                self._data_sizes.pop(job_id, None)
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        payload = self.store.payload(job_id)
+        if job is None or payload is None:
+            return
+        kind = job["kind"]
+        started = time.time()
+        JOB_WAIT_SECONDS.observe(started - job["created_at"], kind=kind)
+        self.store.update(job_id, status="running", started_at=started)
+
+        JOBS_RUNNING.inc()
+        result, error = None, None
+        try:
+            result = await self.handlers[kind](*payload)
+        except ScreeningError as e:
+            error = {"stage": e.stage, "error": e.message, "status_code": e.status_code}
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            error = {"stage": "unknown", "error": str(e), "status_code": 500}
+        finally:
+            JOBS_RUNNING.dec()
+
+        finished = time.time()
+        status = "failed" if error else "succeeded"
+        JOB_RUN_SECONDS.observe(finished - started, kind=kind)
+        JOBS_FINISHED.inc(kind=kind, status=status)
+        self.store.update(job_id, status=status, finished_at=finished, result=result, error=error)
+        self.store.delete_payload(job_id)
+
+        if job["webhook_url"]:
+            delivered = await self._deliver_webhook(job["webhook_url"], self.get(job_id))
+            self.store.update(job_id, webhook_status="delivered" if delivered else "failed")
+
+    async def _deliver_webhook(self, url: str, job: Dict[str, Any]) -> bool:
+        body = json.dumps(job).encode("utf-8")
+        for attempt in range(JOB_WEBHOOK_RETRIES):
+            try:
+                await asyncio.to_thread(_post_webhook, url, body)
+                WEBHOOK_DELIVERIES.inc(outcome="delivered")
+                return True
+            except Exception as e:
+                logger.warning(f"Webhook delivery to {url} failed (attempt {attempt + 1}): {str(e)}")
+                if attempt + 1 < JOB_WEBHOOK_RETRIES:
+                    await asyncio.sleep(2 ** attempt)
+        WEBHOOK_DELIVERIES.inc(outcome="failed")
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue statistics.
+
+        Returns:
+            dict: Workers, queued and running jobs, bytes of data waiting
+                and stored jobs by status
+        """
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queued_bytes": self.queued_bytes(),
+            "running": int(JOBS_RUNNING.value()),
+            "jobs_by_status": self.store.count_by_status(),
+        }
+
+
+async def _run_screening(params: Dict[str, Any], data: bytes) -> Dict[str, Any]:
+    return await screen_resume_bytes(data, params["jd_text"], params.get("filename"))
+
+
+def build_job_store(db_path: str = JOBS_DB) -> Any:
+    """
+    Build the job store, in SQLite when db_path is set.
+
+    Args:
+        db_path: SQLite file, empty to keep jobs in memory
+
+    Returns:
+        MemoryJobStore or SQLiteJobStore: Configured store
+    """
+    return SQLiteJobStore(db_path) if db_path else MemoryJobStore()
+
+
+job_queue = JobQueue(build_job_store(), {"screen": _run_screening})
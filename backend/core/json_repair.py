@@ -0,0 +1,210 @@
+"""
+Tolerant parsing of JSON replies from Gemini.
+
+Even in JSON mode a reply can be wrapped in code fences or prose, carry a
+trailing comma, or stop mid-object when the output token limit is hit.
+Instead of failing the request, the parser scans the reply once,
+tracking strings and nesting, fixes what can be fixed locally and hands
+back the fragments it could not parse so only those are sent back to the
+model for repair.
+"""
+import json
+import re
+from typing import Any, List, Tuple
+
+_FENCE = re.compile(r"^```[a-zA-Z]*\s*|\s*```\s*$")
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_DANGLING_KEY = re.compile(r"[{,]\s*\"(?:[^\"\\]|\\.)*\"\s*:?\s*$")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class JSONRepairError(ValueError):
+    """
+    A reply could not be parsed as JSON, even after local repairs.
+
+    Args:
+        message: Description of the failure
+        fragment: JSON text that could not be parsed
+    """
+
+    def __init__(self, message: str, fragment: str):
+        super().__init__(message)
+        self.fragment = fragment
+
+
+def strip_code_fences(text: str) -> str:
+    """
+    Remove a surrounding Markdown code fence, e.g. ```json ... ```.
+
+    Args:
+        text: Model reply
+
+    Returns:
+        str: Reply without the fence
+    """
+    return _FENCE.sub("", text.strip())
+
+
+def _scan(text: str, start: int) -> Tuple[int, List[str], bool, List[Tuple[int, int]]]:
+    """
+    Scan a JSON value starting at text[start].
+
+    Returns the end offset, the stack of unclosed brackets, whether the
+    text ends inside a string, and the spans of top-level array elements.
+    """
+    stack: List[str] = []
+    in_string = False
+    escaped = False
+    elements: List[Tuple[int, int]] = []
+    element_start = None
+
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        in_array = stack == ["["]
+        if in_array and element_start is None and not char.isspace() and char not in ",]":
+            element_start = index
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                if in_array and element_start is not None:
+                    elements.append((element_start, index))
+                return index + 1, stack, False, elements
+        elif char == "," and in_array and element_start is not None:
+            elements.append((element_start, index))
+            element_start = None
+
+    if element_start is not None:
+        elements.append((element_start, len(text)))
+    return len(text), stack, in_string, elements
+
+
+def _escape_newlines_in_strings(text: str) -> str:
+    # Raw newlines inside string literals are invalid JSON but common
+    out = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            elif char == "\n":
+                out.append("\\n")
+                continue
+        elif char == '"':
+            in_string = True
+        out.append(char)
+    return "".join(out)
+
+
+def repair_json_text(fragment: str) -> str:
+    """
+    Apply local repairs to a JSON fragment.
+
+    Escapes raw newlines in strings, drops trailing commas and, if the
+    fragment was cut off, closes the open string, removes a dangling key
+    or comma and closes every open bracket.
+
+    Args:
+        fragment: JSON text starting with "{" or "["
+
+    Returns:
+        str: Repaired JSON text; not guaranteed to be valid
+    """
+    text = _escape_newlines_in_strings(fragment)
+    _, stack, in_string, _ = _scan(text, 0)
+    if stack:
+        if in_string:
+            text += '"'
+        text = text.rstrip()
+        if stack[-1] == "{":
+            text = _DANGLING_KEY.sub(lambda match: match.group(0)[0] if match.group(0)[0] == "{" else "", text)
+        text = text.rstrip().rstrip(",")
+        text += "".join(_CLOSERS[opener] for opener in reversed(stack))
+    return _TRAILING_COMMA.sub(r"\1", text)
+
+
+def _locate(text: str, opener: str) -> str:
+    text = strip_code_fences(text)
+    start = text.find(opener)
+    if start == -1:
+        raise JSONRepairError(f"No JSON {'object' if opener == '{' else 'array'} found in response", text)
+    end, _, _, _ = _scan(text, start)
+    return text[start:end]
+
+
+def parse_json_tolerant(text: str, opener: str = "{") -> Tuple[Any, bool]:
+    """
+    Parse a JSON object or array out of a model reply.
+
+    Args:
+        text: Model reply, possibly with fences or surrounding prose
+        opener: "{" for an object or "[" for an array
+
+    Returns:
+        tuple: (parsed value, True if local repairs were needed)
+
+    Raises:
+        JSONRepairError: If the value cannot be parsed; its fragment is
+            the JSON text from the opening bracket on
+    """
+    fragment = _locate(text, opener)
+    try:
+        return json.loads(fragment), False
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(repair_json_text(fragment)), True
+    except json.JSONDecodeError as e:
+        raise JSONRepairError(f"Invalid JSON after repair: {str(e)}", fragment)
+
+
+def parse_json_array_items(text: str) -> Tuple[List[Any], List[str]]:
+    """
+    Parse the elements of a JSON array one by one, keeping the good ones.
+
+    Used when the array as a whole cannot be parsed, so a single broken
+    element does not discard the rest of the reply.
+
+    Args:
+        text: Model reply containing a JSON array
+
+    Returns:
+        tuple: (parsed elements, text of the elements that failed)
+
+    Raises:
+        JSONRepairError: If the reply contains no array
+    """
+    fragment = _locate(text, "[")
+    _, _, _, spans = _scan(fragment, 0)
+    items: List[Any] = []
+    broken: List[str] = []
+    for element_start, element_end in spans:
+        element = fragment[element_start:element_end].strip()
+        if not element:
+            continue
+        try:
+            items.append(json.loads(element))
+        except json.JSONDecodeError:
+            try:
+                items.append(json.loads(repair_json_text(element)))
+            except json.JSONDecodeError:
+                broken.append(element)
+    return items, broken
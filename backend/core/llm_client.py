@@ -0,0 +1,322 @@
+"""
+Async client layer for the Gemini AI calls.
+
+The Gemini SDK calls in core.llm_extractor are blocking. This module runs
+them on a bounded thread pool so the FastAPI event loop stays free while
+a request is waiting on the model.
+"""
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Union
+
+from core.cache import match_result_cache, match_cache_key, match_single_flight
+from core.llm_extractor import (
+    extract_resume_data,
+    compare_resume_to_jd,
+    compare_resumes_to_jd_batch,
+    extract_jd_requirements,
+    plan_comparison_batches,
+    stream_resume_to_jd_comparison,
+    test_gemini_connection,
+)
+from core.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of Gemini calls allowed in flight per worker process
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_in_flight = 0
+_completed = 0
+_batched_candidates = 0
+_batch_fallbacks = 0
+
+# Candidates compared one by one after a packed comparison, by reason
+# ("error" when the packed call failed, "missing" when its reply left them out)
+BATCH_FALLBACKS = counter("compare_batch_fallbacks_total",
+                          "Candidates compared one by one after a packed comparison, by reason", ["reason"])
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Get the shared thread pool used for LLM calls, creating it on first use.
+
+    Returns:
+        ThreadPoolExecutor: Pool sized to LLM_MAX_CONCURRENCY
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=LLM_MAX_CONCURRENCY,
+            thread_name_prefix="llm"
+        )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    """Shut down the shared LLM thread pool, waiting for running calls."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+async def run_llm_call(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking LLM call on the bounded pool without blocking the event loop.
+
+    Calls beyond LLM_MAX_CONCURRENCY wait in the pool queue until a thread
+    becomes free.
+
+    Args:
+        func: Blocking callable to run
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Any: Return value of func
+    """
+    global _in_flight, _completed
+    loop = asyncio.get_running_loop()
+    _in_flight += 1
+    try:
+        return await loop.run_in_executor(
+            get_executor(), functools.partial(func, *args, **kwargs)
+        )
+    finally:
+        _in_flight -= 1
+        _completed += 1
+
+
+async def stream_llm_call(func: Callable[..., Iterator[Any]], *args: Any) -> AsyncIterator[Any]:
+    """
+    Iterate a blocking LLM stream on the bounded pool.
+
+    The generator runs on a pool thread and hands each item to the event
+    loop as soon as it is produced.
+
+    Args:
+        func: Blocking generator function to run
+        *args: Positional arguments for func
+
+    Yields:
+        Any: Items produced by func
+
+    Raises:
+        Exception: Whatever func raises
+    """
+    global _in_flight, _completed
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    end = object()
+
+    def produce() -> None:
+        try:
+            for item in func(*args):
+                loop.call_soon_threadsafe(queue.put_nowait, (item, None))
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, (end, e))
+        else:
+            loop.call_soon_threadsafe(queue.put_nowait, (end, None))
+
+    _in_flight += 1
+    try:
+        producer = loop.run_in_executor(get_executor(), produce)
+        while True:
+            item, error = await queue.get()
+            if error is not None:
+                raise error
+            if item is end:
+                break
+            yield item
+        await producer
+    finally:
+        _in_flight -= 1
+        _completed += 1
+
+
+async def extract_resume_data_async(resume_text: str) -> Dict[str, Any]:
+    """
+    Async version of core.llm_extractor.extract_resume_data.
+
+    Args:
+        resume_text: Raw text extracted from resume PDF
+
+    Returns:
+        dict: Structured resume data
+    """
+    return await run_llm_call(extract_resume_data, resume_text)
+
+
+async def extract_jd_requirements_async(jd_text: str) -> Dict[str, Any]:
+    """
+    Async version of core.llm_extractor.extract_jd_requirements.
+
+    Args:
+        jd_text: Job description text
+
+    Returns:
+        dict: Structured hiring requirements
+    """
+    return await run_llm_call(extract_jd_requirements, jd_text)
+
+
+async def compare_resume_to_jd_async(resume_data: Dict[str, Any], jd_text: str) -> Dict[str, Any]:
+    """
+    Async version of core.llm_extractor.compare_resume_to_jd.
+
+    Args:
+        resume_data: Structured resume data from extract_resume_data
+        jd_text: Job description text
+
+    Returns:
+        dict: Match analysis with score and summary
+    """
+    return await run_llm_call(compare_resume_to_jd, resume_data, jd_text)
+
+
+def stream_resume_to_jd_comparison_async(resume_data: Dict[str, Any], jd_text: str) -> AsyncIterator[str]:
+    """
+    Async version of core.llm_extractor.stream_resume_to_jd_comparison.
+
+    Args:
+        resume_data: Structured resume data from extract_resume_data
+        jd_text: Job description text
+
+    Returns:
+        AsyncIterator[str]: Reply text chunks as Gemini generates them
+    """
+    return stream_llm_call(stream_resume_to_jd_comparison, resume_data, jd_text)
+
+
+async def compare_resume_to_jd_cached(
+    resume_data: Dict[str, Any],
+    jd_text: str,
+    on_fresh: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Compare resume data to a job description, reusing earlier results.
+
+    Results are cached by (resume fingerprint, normalized JD hash), and
+    concurrent requests for the same pair share a single Gemini call.
+
+    Args:
+        resume_data: Structured resume data from extract_resume_data
+        jd_text: Job description text
+        on_fresh: Called with the result if this call made the Gemini
+            request, not for cached or shared results
+
+    Returns:
+        dict: Match analysis with score and summary
+    """
+    key = match_cache_key(resume_data, jd_text)
+    cached = match_result_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async def compare() -> Dict[str, Any]:
+        result = await compare_resume_to_jd_async(resume_data, jd_text)
+        match_result_cache.set(key, result)
+        if on_fresh is not None:
+            on_fresh(result)
+        return result
+
+    return await match_single_flight.do(key, compare)
+
+
+async def compare_resumes_to_jd_batched(
+    resume_records: List[Dict[str, Any]],
+    jd_text: str,
+    on_fresh: Optional[Callable[[int, Dict[str, Any]], None]] = None
+) -> List[Union[Dict[str, Any], Exception]]:
+    """
+    Compare many resumes to one job description using packed prompts.
+
+    Cached pairs are reused. The rest are grouped by
+    plan_comparison_batches so the JD is sent once per batch instead of
+    once per candidate. Candidates a batch reply is missing fall back to
+    an individual compare_resume_to_jd_cached call.
+
+    Args:
+        resume_records: Structured resume data for each candidate
+        jd_text: Job description text
+        on_fresh: Called with (index, result) for each result a Gemini
+            request made here produced, not for cached or shared results
+
+    Returns:
+        list: Match analysis for each candidate in input order, or the
+            exception raised by its fallback call
+    """
+    global _batched_candidates, _batch_fallbacks
+    keys = [match_cache_key(resume_data, jd_text) for resume_data in resume_records]
+    results: List[Any] = [match_result_cache.get(key) for key in keys]
+
+    pending = [index for index, result in enumerate(results) if result is None]
+    pending_records = [resume_records[index] for index in pending]
+    batches = plan_comparison_batches(pending_records, jd_text)
+
+    async def run_batch(batch: List[int]) -> None:
+        records = [pending_records[i] for i in batch]
+        try:
+            analyses = await run_llm_call(compare_resumes_to_jd_batch, records, jd_text)
+        except Exception as e:
+            logger.warning(f"Packed comparison of {len(records)} candidates failed, "
+                           f"comparing them one by one: {str(e)}")
+            BATCH_FALLBACKS.inc(len(records), reason="error")
+            return
+        for i, analysis in zip(batch, analyses):
+            if analysis is None:
+                BATCH_FALLBACKS.inc(reason="missing")
+            else:
+                index = pending[i]
+                results[index] = analysis
+                match_result_cache.set(keys[index], analysis)
+                if on_fresh is not None:
+                    on_fresh(index, analysis)
+
+    await asyncio.gather(*(run_batch(batch) for batch in batches))
+    _batched_candidates += len(pending)
+
+    missing = [index for index, result in enumerate(results) if result is None]
+    _batch_fallbacks += len(missing)
+    fallbacks = await asyncio.gather(
+        *(compare_resume_to_jd_cached(resume_records[index], jd_text,
+                                      functools.partial(on_fresh, index) if on_fresh is not None else None)
+          for index in missing),
+        return_exceptions=True
+    )
+    for index, result in zip(missing, fallbacks):
+        results[index] = result
+
+    return results
+
+
+async def test_gemini_connection_async() -> bool:
+    """
+    Async version of core.llm_extractor.test_gemini_connection.
+
+    Returns:
+        bool: True if connection successful, False otherwise
+    """
+    return await run_llm_call(test_gemini_connection)
+
+
+def get_stats() -> Dict[str, int]:
+    """
+    Get usage statistics for the LLM pool.
+
+    Returns:
+        dict: Configured concurrency, calls in flight and completed, and
+            batched comparison counters
+    """
+    return {
+        "max_concurrency": LLM_MAX_CONCURRENCY,
+        "in_flight": _in_flight,
+        "completed": _completed,
+        "batched_candidates": _batched_candidates,
+        "batch_fallbacks": _batch_fallbacks,
+    }
@@ -2,39 +2,108 @@
 Gemini AI integration for resume data extraction and job matching.
 """
 import json
+import logging
 import os
-from typing import Dict, Any, Optional
-import google.generativeai as genai
-from dotenv import load_dotenv
+from typing import Dict, Any, Iterator, List, Optional
 
-# Load environment variables
-load_dotenv()
+from core.json_repair import JSONRepairError, parse_json_tolerant, parse_json_array_items
+from core.llm_registry import MODEL_NAME, generate_content, stream_content
+from core.metrics import counter, histogram, TOKEN_BUCKETS
+from core.jd_prep import prepare_jd
+from core.skills import annotate_skills, without_skill_ids
+from core.tokens import estimate_tokens, fit_resume_text, BudgetResult
 
-# Configure Gemini AI
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY not found in environment variables")
+logger = logging.getLogger(__name__)
 
-genai.configure(api_key=GEMINI_API_KEY)
+# Prompt size metrics, labelled by call ("extract", "extract_jd", "compare",
+# "compare_stream", "compare_batch" or "repair")
+PROMPT_TOKENS_ESTIMATED = histogram(
+    "llm_prompt_tokens_estimated", "Estimated prompt tokens per Gemini call", ["call"], TOKEN_BUCKETS
+)
+PROMPT_TOKENS_ACTUAL = histogram(
+    "llm_prompt_tokens_actual", "Prompt tokens reported by Gemini per call", ["call"], TOKEN_BUCKETS
+)
+OUTPUT_TOKENS = counter("llm_output_tokens_total", "Output tokens reported by Gemini", ["call"])
+PROMPT_TRUNCATIONS = counter(
+    "llm_prompt_truncations_total", "Prompt inputs trimmed to the token budget", ["call", "input"]
+)
 
+# Reply parsing metrics; outcome is "strict", "tolerant" (fixed locally),
+# "repaired" (fixed by a repair request) or "failed"
+JSON_PARSE_RESULTS = counter("llm_json_parse_total", "Gemini JSON replies by how they were parsed", ["call", "outcome"])
+WASTED_FULL_RETRIES = counter(
+    "llm_wasted_full_retries_total",
+    "Gemini replies discarded as unparseable, so the full call has to be made again",
+    ["call"]
+)
 
-def extract_resume_data(resume_text: str) -> Dict[str, Any]:
-    """
-    Extract structured data from resume text using Gemini AI.
-    
-    Args:
-        resume_text: Raw text extracted from resume PDF
-        
-    Returns:
-        dict: Structured resume data with skills, experience, education, etc.
-        
-    Raises:
-        Exception: If AI extraction fails
-    """
-    try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        
-        prompt = f"""
+# Ask Gemini for JSON constrained to a response schema
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() == "true"
+
+# Response schemas in the OpenAPI subset Gemini accepts
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+RESUME_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "skills": _STRING_LIST,
+        "experience_years": {"type": "number"},
+        "education": _STRING_LIST,
+        "previous_roles": _STRING_LIST,
+        "key_achievements": _STRING_LIST,
+        "contact_info": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "nullable": True},
+                "email": {"type": "string", "nullable": True},
+                "phone": {"type": "string", "nullable": True},
+            },
+        },
+    },
+    "required": ["skills", "experience_years", "education", "previous_roles", "key_achievements"],
+}
+
+_MATCH_PROPERTIES = {
+    "match_score": {"type": "integer"},
+    "match_summary": {"type": "string"},
+    "skill_matches": _STRING_LIST,
+    "skill_gaps": _STRING_LIST,
+    "experience_match": {"type": "string"},
+    "education_match": {"type": "string"},
+    "overall_recommendation": {"type": "string"},
+}
+
+MATCH_SCHEMA = {
+    "type": "object",
+    "properties": _MATCH_PROPERTIES,
+    "required": ["match_score", "match_summary"],
+}
+
+BATCH_MATCH_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {"candidate_id": {"type": "string"}, **_MATCH_PROPERTIES},
+        "required": ["candidate_id", "match_score", "match_summary"],
+    },
+}
+
+JD_REQUIREMENTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "seniority": {"type": "string"},
+        "required_skills": _STRING_LIST,
+        "preferred_skills": _STRING_LIST,
+        "min_experience_years": {"type": "number", "nullable": True},
+        "education": _STRING_LIST,
+        "responsibilities": _STRING_LIST,
+    },
+    "required": ["title", "seniority", "required_skills", "preferred_skills", "education", "responsibilities"],
+}
+
+# Prompt templates, filled in with str.format
+EXTRACTION_PROMPT_TEMPLATE = """
         Extract structured information from the following resume text and return ONLY a valid JSON object with no additional text.
 
         Required JSON structure:
@@ -65,25 +134,137 @@ def extract_resume_data(resume_text: str) -> Dict[str, Any]:
         {resume_text}
 
         JSON Response:"""
-        
-        response = model.generate_content(prompt)
-        
-        # Parse the JSON response
-        response_text = response.text.strip()
 
-        # Try to extract JSON from response if it contains extra text
-        if response_text.startswith('```json'):
-            response_text = response_text.replace('```json', '').replace('```', '').strip()
-        elif response_text.startswith('```'):
-            response_text = response_text.replace('```', '').strip()
+COMPARISON_PROMPT_TEMPLATE = """
+        Compare the following resume data against the job description and provide a detailed match analysis. Return ONLY a valid JSON object with no additional text.
+
+        Resume Data:
+        {resume_json}
+
+        Job Description:
+        {jd_text}
+
+        Provide your analysis in the following JSON format:
+        {{
+            "match_score": number (0-100),
+            "match_summary": "detailed explanation of the match",
+            "skill_matches": ["matched skills"],
+            "skill_gaps": ["missing skills"],
+            "experience_match": "analysis of experience alignment",
+            "education_match": "analysis of education requirements",
+            "overall_recommendation": "hire/consider/reject with reasoning"
+        }}
+
+        Scoring criteria:
+        - Skills match (40%): How many required skills does the candidate have?
+        - Experience level (30%): Does experience years and roles align with requirements?
+        - Education (20%): Does education meet the job requirements?
+        - Overall fit (10%): General alignment with job responsibilities
 
-        # Find JSON object in response
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}') + 1
-        if start_idx != -1 and end_idx > start_idx:
-            response_text = response_text[start_idx:end_idx]
+        Be thorough in your analysis and provide specific examples.
+        Return ONLY the JSON object, no explanations or additional text.
+
+        JSON Response:"""
+
+BATCH_COMPARISON_PROMPT_TEMPLATE = """
+        Compare each of the following candidates against the job description and provide a match analysis for every candidate. Return ONLY a valid JSON array with no additional text.
+
+        Job Description:
+        {jd_text}
+
+        Candidates (one JSON object per line, identified by "candidate_id"):
+        {candidates_json}
 
-        resume_data = json.loads(response_text)
+        Return one object per candidate in the following JSON format:
+        [
+            {{
+                "candidate_id": "id of the candidate",
+                "match_score": number (0-100),
+                "match_summary": "detailed explanation of the match",
+                "skill_matches": ["matched skills"],
+                "skill_gaps": ["missing skills"],
+                "experience_match": "analysis of experience alignment",
+                "education_match": "analysis of education requirements",
+                "overall_recommendation": "hire/consider/reject with reasoning"
+            }}
+        ]
+
+        Scoring criteria:
+        - Skills match (40%): How many required skills does the candidate have?
+        - Experience level (30%): Does experience years and roles align with requirements?
+        - Education (20%): Does education meet the job requirements?
+        - Overall fit (10%): General alignment with job responsibilities
+
+        Score every candidate independently against the job description, not against each other.
+        Return ONLY the JSON array, no explanations or additional text.
+
+        JSON Response:"""
+
+JD_EXTRACTION_PROMPT_TEMPLATE = """
+        Extract the hiring requirements from the following job description and return ONLY a valid JSON object with no additional text.
+
+        Required JSON structure:
+        {{
+            "title": "job title",
+            "seniority": "intern/junior/mid/senior/lead/principal/manager",
+            "required_skills": ["skill1", "skill2", ...],
+            "preferred_skills": ["skill1", "skill2", ...],
+            "min_experience_years": number or null,
+            "education": ["requirement1", ...],
+            "responsibilities": ["responsibility1", ...]
+        }}
+
+        Instructions:
+        - List each skill as a short name (e.g. "Python", "Kubernetes", "Stakeholder management")
+        - Put must-have skills in required_skills and nice-to-have skills in preferred_skills
+        - Summarize each key responsibility in at most 12 words, at most 8 responsibilities
+        - Ignore company description, benefits and application instructions
+        - If information is not available, use empty arrays or null values
+        - Return ONLY the JSON object, no explanations or additional text
+
+        Job description:
+        {jd_text}
+
+        JSON Response:"""
+
+JSON_REPAIR_PROMPT_TEMPLATE = """
+        The following JSON is malformed. Fix only its syntax so it is valid JSON, keeping every key and value, and return ONLY the corrected JSON with no additional text.
+
+        {fragment}
+
+        JSON Response:"""
+
+# Resume fields sent in batched comparisons; contact details do not affect the score
+COMPACT_RESUME_FIELDS = ["skills", "experience_years", "education", "previous_roles", "key_achievements"]
+
+# Limits for batched comparisons
+COMPARE_BATCH_TOKEN_BUDGET = int(os.getenv("COMPARE_BATCH_TOKEN_BUDGET", "24000"))
+COMPARE_BATCH_MAX_SIZE = int(os.getenv("COMPARE_BATCH_MAX_SIZE", "10"))
+
+
+def extract_resume_data(resume_text: str) -> Dict[str, Any]:
+    """
+    Extract structured data from resume text using Gemini AI.
+    
+    Args:
+        resume_text: Raw text extracted from resume PDF
+        
+    Returns:
+        dict: Structured resume data with skills, experience, education,
+            etc., and the canonical skill_ids of the skills
+        
+    Raises:
+        Exception: If AI extraction fails
+    """
+    try:
+        budgeted_resume = fit_resume_text(resume_text)
+        _record_budget("extract", "resume", budgeted_resume)
+        prompt = EXTRACTION_PROMPT_TEMPLATE.format(resume_text=budgeted_resume.text)
+        
+        response = generate_content(prompt, generation_config=_json_config(RESUME_SCHEMA), call="extract")
+        _record_token_usage("extract", prompt, response)
+        
+        resume_data = _parse_json_object_reply("extract", response.text, RESUME_SCHEMA)
         
         # Validate required fields
         required_fields = ["skills", "experience_years", "education", "previous_roles", "key_achievements"]
@@ -91,9 +272,9 @@ def extract_resume_data(resume_text: str) -> Dict[str, Any]:
             if field not in resume_data:
                 resume_data[field] = [] if field != "experience_years" else 0
         
-        return resume_data
+        return annotate_skills(resume_data)
         
-    except json.JSONDecodeError as e:
+    except JSONRepairError as e:
         raise Exception(f"Failed to parse AI response as JSON: {str(e)}")
     except Exception as e:
         raise Exception(f"Error extracting resume data: {str(e)}")
@@ -114,73 +295,371 @@ def compare_resume_to_jd(resume_data: Dict[str, Any], jd_text: str) -> Dict[str,
         Exception: If AI comparison fails
     """
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
+        prompt = _comparison_prompt("compare", resume_data, jd_text)
         
-        prompt = f"""
-        Compare the following resume data against the job description and provide a detailed match analysis. Return ONLY a valid JSON object with no additional text.
+        response = generate_content(prompt, generation_config=_json_config(MATCH_SCHEMA), call="compare")
+        _record_token_usage("compare", prompt, response)
+        
+        match_analysis = _parse_json_object_reply("compare", response.text, MATCH_SCHEMA)
+        
+        return _normalize_match_analysis(match_analysis)
+        
+    except JSONRepairError as e:
+        raise Exception(f"Failed to parse AI response as JSON: {str(e)}")
+    except Exception as e:
+        raise Exception(f"Error comparing resume to job description: {str(e)}")
 
-        Resume Data:
-        {json.dumps(resume_data, indent=2)}
 
-        Job Description:
-        {jd_text}
+def extract_jd_requirements(jd_text: str) -> Dict[str, Any]:
+    """
+    Extract structured hiring requirements from a job description.
+    
+    Args:
+        jd_text: Job description text
+        
+    Returns:
+        dict: Title, seniority, required/preferred skills, minimum
+            experience, education and responsibilities
+        
+    Raises:
+        Exception: If AI extraction fails
+    """
+    try:
+        prompt = JD_EXTRACTION_PROMPT_TEMPLATE.format(jd_text=jd_text)
+        
+        response = generate_content(prompt, generation_config=_json_config(JD_REQUIREMENTS_SCHEMA), call="extract_jd")
+        _record_token_usage("extract_jd", prompt, response)
+        
+        requirements = _parse_json_object_reply("extract_jd", response.text, JD_REQUIREMENTS_SCHEMA)
+        
+        for field in ["required_skills", "preferred_skills", "education", "responsibilities"]:
+            if not isinstance(requirements.get(field), list):
+                requirements[field] = []
+        requirements.setdefault("title", "")
+        requirements.setdefault("seniority", "")
+        requirements.setdefault("min_experience_years", None)
+        
+        return requirements
+        
+    except JSONRepairError as e:
+        raise Exception(f"Failed to parse AI response as JSON: {str(e)}")
+    except Exception as e:
+        raise Exception(f"Error extracting job description requirements: {str(e)}")
 
-        Provide your analysis in the following JSON format:
-        {{
-            "match_score": number (0-100),
-            "match_summary": "detailed explanation of the match",
-            "skill_matches": ["matched skills"],
-            "skill_gaps": ["missing skills"],
-            "experience_match": "analysis of experience alignment",
-            "education_match": "analysis of education requirements",
-            "overall_recommendation": "hire/consider/reject with reasoning"
-        }}
 
-        Scoring criteria:
-        - Skills match (40%): How many required skills does the candidate have?
-        - Experience level (30%): Does experience years and roles align with requirements?
-        - Education (20%): Does education meet the job requirements?
-        - Overall fit (10%): General alignment with job responsibilities
+def stream_resume_to_jd_comparison(resume_data: Dict[str, Any], jd_text: str) -> Iterator[str]:
+    """
+    Stream the reply text of a resume comparison as Gemini generates it.
+    
+    Join the chunks and pass them to parse_match_reply for the final
+    match analysis.
+    
+    Args:
+        resume_data: Structured resume data from extract_resume_data
+        jd_text: Job description text
+        
+    Yields:
+        str: Reply text chunks
+        
+    Raises:
+        Exception: If the AI call fails
+    """
+    try:
+        prompt = _comparison_prompt("compare_stream", resume_data, jd_text)
+        
+        chunk = None
+        for chunk in stream_content(prompt, generation_config=_json_config(MATCH_SCHEMA), call="compare_stream"):
+            # Chunks without text parts, e.g. a final finish-reason chunk, raise on .text
+            try:
+                text = chunk.text
+            except ValueError:
+                continue
+            if text:
+                yield text
+        # The last chunk carries the usage for the whole reply
+        _record_token_usage("compare_stream", prompt, chunk)
+        
+    except Exception as e:
+        raise Exception(f"Error comparing resume to job description: {str(e)}")
 
-        Be thorough in your analysis and provide specific examples.
-        Return ONLY the JSON object, no explanations or additional text.
 
-        JSON Response:"""
+def parse_match_reply(response_text: str) -> Dict[str, Any]:
+    """
+    Parse the full reply text of a streamed comparison.
+    
+    Args:
+        response_text: Joined chunks from stream_resume_to_jd_comparison
         
-        response = model.generate_content(prompt)
+    Returns:
+        dict: Match analysis with score and summary
+        
+    Raises:
+        Exception: If the reply cannot be parsed or repaired
+    """
+    try:
+        return _normalize_match_analysis(_parse_json_object_reply("compare_stream", response_text, MATCH_SCHEMA))
+    except JSONRepairError as e:
+        raise Exception(f"Failed to parse AI response as JSON: {str(e)}")
+
+
+def _comparison_prompt(call: str, resume_data: Dict[str, Any], jd_text: str) -> str:
+    budgeted_jd = prepare_jd(jd_text).budgeted
+    _record_budget(call, "jd", budgeted_jd)
+    return COMPARISON_PROMPT_TEMPLATE.format(
+        resume_json=json.dumps(without_skill_ids(resume_data), indent=2),
+        jd_text=budgeted_jd.text
+    )
+
+
+def _record_budget(call: str, input_name: str, budgeted: BudgetResult) -> None:
+    if budgeted.truncated:
+        PROMPT_TRUNCATIONS.inc(call=call, input=input_name)
+        logger.info(
+            f"Trimmed {input_name} for {call} from ~{budgeted.tokens_before} to ~{budgeted.tokens_after} tokens, "
+            f"dropped sections: {budgeted.sections_dropped}"
+        )
+
+
+def _record_token_usage(call: str, prompt: str, response: Any) -> None:
+    # usage_metadata is only present in newer SDK/API versions
+    estimated = estimate_tokens(prompt)
+    PROMPT_TOKENS_ESTIMATED.observe(estimated, call=call)
+    usage = getattr(response, "usage_metadata", None)
+    actual = getattr(usage, "prompt_token_count", None)
+    output = getattr(usage, "candidates_token_count", None)
+    if actual:
+        PROMPT_TOKENS_ACTUAL.observe(actual, call=call)
+    if output:
+        OUTPUT_TOKENS.inc(output, call=call)
+    logger.info(f"Gemini {call} prompt tokens: estimated {estimated}, actual {actual if actual else 'n/a'}")
+
+
+def _json_config(schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    # Generation settings that make Gemini reply with JSON matching schema
+    if not LLM_STRUCTURED_OUTPUT:
+        return None
+    return {"response_mime_type": "application/json", "response_schema": schema}
+
+
+def _repair_fragment(fragment: str, opener: str, schema: Dict[str, Any]) -> Any:
+    """
+    Ask Gemini to fix the syntax of a malformed JSON fragment.
+
+    Only the fragment is sent, not the resume or job description, so a
+    repair costs a fraction of repeating the original call.
+
+    Raises:
+        JSONRepairError: If the repair request fails or its reply is
+            still not valid JSON
+    """
+    prompt = JSON_REPAIR_PROMPT_TEMPLATE.format(fragment=fragment)
+    try:
+        response = generate_content(prompt, generation_config=_json_config(schema), call="repair")
+        _record_token_usage("repair", prompt, response)
+        value, _ = parse_json_tolerant(response.text, opener)
+    except JSONRepairError:
+        raise
+    except Exception as e:
+        raise JSONRepairError(f"Repair request failed: {str(e)}", fragment)
+    return value
+
+
+def _missing_fields(value: Dict[str, Any], schema: Dict[str, Any]) -> List[str]:
+    # Fields the schema requires that value does not have
+    return [field for field in schema.get("required", []) if field not in value]
+
+
+def _parse_json_object_reply(call: str, response_text: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parse a JSON object reply, repairing it locally or with a re-ask.
+
+    Raises:
+        JSONRepairError: If the reply cannot be parsed or repaired, or a
+            repaired reply lacks a field the schema requires
+    """
+    try:
+        value, repaired = parse_json_tolerant(response_text, "{")
+        outcome = "tolerant" if repaired else "strict"
+    except JSONRepairError as e:
+        logger.warning(f"Gemini {call} reply is not valid JSON, requesting a repair: {str(e)}")
+        value, outcome = None, "failed"
+        if e.fragment.startswith("{"):
+            try:
+                value, outcome = _repair_fragment(e.fragment, "{", schema), "repaired"
+            except JSONRepairError as repair_error:
+                logger.warning(f"Could not repair {call} reply: {str(repair_error)}")
+        error = e
+
+    if not isinstance(value, dict):
+        JSON_PARSE_RESULTS.inc(call=call, outcome="failed")
+        WASTED_FULL_RETRIES.inc(call=call)
+        if outcome == "failed":
+            raise error
+        raise JSONRepairError("AI response is not a JSON object", response_text)
+    # A repaired reply may have been cut off before its last fields
+    missing = _missing_fields(value, schema)
+    if missing and outcome != "strict":
+        JSON_PARSE_RESULTS.inc(call=call, outcome="failed")
+        WASTED_FULL_RETRIES.inc(call=call)
+        raise JSONRepairError(f"Repaired AI response is missing {', '.join(missing)}", response_text)
+    JSON_PARSE_RESULTS.inc(call=call, outcome=outcome)
+    return value
+
+
+def _parse_json_array_reply(call: str, response_text: str, schema: Dict[str, Any]) -> List[Any]:
+    """
+    Parse a JSON array reply, keeping the elements that parse and
+    re-asking only for the broken ones.
+
+    Raises:
+        JSONRepairError: If no element of the reply can be recovered
+    """
+    try:
+        value, repaired = parse_json_tolerant(response_text, "[")
+        JSON_PARSE_RESULTS.inc(call=call, outcome="tolerant" if repaired else "strict")
+        return value
+    except JSONRepairError as e:
+        error = e
+    
+    logger.warning(f"Gemini {call} reply is not a valid JSON array, salvaging elements: {str(error)}")
+    try:
+        items, broken = parse_json_array_items(response_text)
+    except JSONRepairError:
+        items, broken = [], []
+    if broken:
+        try:
+            items.extend(_repair_fragment("[" + ",".join(broken) + "]", "[", schema))
+        except JSONRepairError as e:
+            logger.warning(f"Could not repair {len(broken)} {call} elements: {str(e)}")
+
+    if not items:
+        JSON_PARSE_RESULTS.inc(call=call, outcome="failed")
+        WASTED_FULL_RETRIES.inc(call=call)
+        raise error
+    JSON_PARSE_RESULTS.inc(call=call, outcome="repaired")
+    return items
+
+
+def _normalize_match_analysis(match_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    # Validate and ensure required fields; repaired replies missing them
+    # never get here, so only a complete reply that omits them is defaulted
+    if "match_score" not in match_analysis:
+        match_analysis["match_score"] = 0
+    if "match_summary" not in match_analysis:
+        match_analysis["match_summary"] = "Unable to generate match summary"
+    
+    # Ensure match_score is within valid range
+    match_analysis["match_score"] = max(0, min(100, int(match_analysis["match_score"])))
+    
+    return match_analysis
+
+
+def compact_resume_record(resume_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce resume data to the fields that matter for scoring.
+    
+    Args:
+        resume_data: Structured resume data from extract_resume_data
         
-        # Parse the JSON response
-        response_text = response.text.strip()
+    Returns:
+        dict: Resume data without contact details or unknown fields
+    """
+    return {field: resume_data[field] for field in COMPACT_RESUME_FIELDS if field in resume_data}
 
-        # Try to extract JSON from response if it contains extra text
-        if response_text.startswith('```json'):
-            response_text = response_text.replace('```json', '').replace('```', '').strip()
-        elif response_text.startswith('```'):
-            response_text = response_text.replace('```', '').strip()
 
-        # Find JSON object in response
-        start_idx = response_text.find('{')
-        end_idx = response_text.rfind('}') + 1
-        if start_idx != -1 and end_idx > start_idx:
-            response_text = response_text[start_idx:end_idx]
+def plan_comparison_batches(
+    resume_records: List[Dict[str, Any]],
+    jd_text: str,
+    token_budget: int = COMPARE_BATCH_TOKEN_BUDGET,
+    max_batch_size: int = COMPARE_BATCH_MAX_SIZE
+) -> List[List[int]]:
+    """
+    Group resumes into batches that fit a prompt token budget.
+    
+    The job description and prompt instructions are paid once per batch;
+    candidates are added to a batch until the next one would exceed the
+    budget or the batch reaches max_batch_size.
+    
+    Args:
+        resume_records: Structured resume data for each candidate
+        jd_text: Job description text
+        token_budget: Maximum estimated prompt tokens per batch
+        max_batch_size: Maximum candidates per batch
+        
+    Returns:
+        list: Batches as lists of indexes into resume_records
+    """
+    base_tokens = estimate_tokens(BATCH_COMPARISON_PROMPT_TEMPLATE) + prepare_jd(jd_text).budgeted.tokens_after
+    
+    batches = []
+    current = []
+    current_tokens = base_tokens
+    for index, resume_data in enumerate(resume_records):
+        record_tokens = estimate_tokens(json.dumps(compact_resume_record(resume_data)))
+        if current and (current_tokens + record_tokens > token_budget or len(current) >= max_batch_size):
+            batches.append(current)
+            current = []
+            current_tokens = base_tokens
+        current.append(index)
+        current_tokens += record_tokens
+    if current:
+        batches.append(current)
+    
+    return batches
+
 
-        match_analysis = json.loads(response_text)
+def compare_resumes_to_jd_batch(resume_records: List[Dict[str, Any]], jd_text: str) -> List[Optional[Dict[str, Any]]]:
+    """
+    Compare several resumes against one job description in a single prompt.
+    
+    Args:
+        resume_records: Structured resume data for each candidate
+        jd_text: Job description text
         
-        # Validate and ensure required fields
-        if "match_score" not in match_analysis:
-            match_analysis["match_score"] = 0
-        if "match_summary" not in match_analysis:
-            match_analysis["match_summary"] = "Unable to generate match summary"
+    Returns:
+        list: Match analysis for each candidate, in input order, or None
+            for candidates the model did not return a usable analysis for
         
-        # Ensure match_score is within valid range
-        match_analysis["match_score"] = max(0, min(100, int(match_analysis["match_score"])))
+    Raises:
+        Exception: If the AI call fails or the reply is not a JSON array
+    """
+    try:
+        candidates_json = "\n".join(
+            json.dumps({"candidate_id": str(index), **compact_resume_record(resume_data)}, separators=(",", ":"))
+            for index, resume_data in enumerate(resume_records)
+        )
+        budgeted_jd = prepare_jd(jd_text).budgeted
+        _record_budget("compare_batch", "jd", budgeted_jd)
+        prompt = BATCH_COMPARISON_PROMPT_TEMPLATE.format(jd_text=budgeted_jd.text, candidates_json=candidates_json)
+        
+        response = generate_content(prompt, generation_config=_json_config(BATCH_MATCH_SCHEMA), call="compare_batch")
+        _record_token_usage("compare_batch", prompt, response)
+        
+        analyses = _parse_json_array_reply("compare_batch", response.text, BATCH_MATCH_SCHEMA)
         
-        return match_analysis
+        results: List[Optional[Dict[str, Any]]] = [None] * len(resume_records)
+        for analysis in analyses:
+            # Elements cut off before their score are compared again one by one
+            if not isinstance(analysis, dict) or _missing_fields(analysis, BATCH_MATCH_SCHEMA["items"]):
+                continue
+            try:
+                index = int(analysis.pop("candidate_id"))
+                if 0 <= index < len(results) and results[index] is None:
+                    results[index] = _normalize_match_analysis(analysis)
+            except (KeyError, TypeError, ValueError):
+                continue
         
-    except json.JSONDecodeError as e:
+        # Candidates missing from the reply are compared again one by one
+        missing = results.count(None)
+        if missing:
+            WASTED_FULL_RETRIES.inc(missing, call="compare_batch")
+        
+        return results
+        
+    except JSONRepairError as e:
         raise Exception(f"Failed to parse AI response as JSON: {str(e)}")
     except Exception as e:
-        raise Exception(f"Error comparing resume to job description: {str(e)}")
+        raise Exception(f"Error comparing resumes to job description: {str(e)}")
 
 
 def test_gemini_connection() -> bool:
@@ -191,8 +670,9 @@ def test_gemini_connection() -> bool:
         bool: True if connection successful, False otherwise
     """
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        response = model.generate_content("Hello, respond with 'OK' if you can hear me.")
+        response = generate_content(
+            "Hello, respond with 'OK' if you can hear me.", {"max_output_tokens": 5}, call="health"
+        )
         return "OK" in response.text.upper()
     except:
         return False
@@ -0,0 +1,347 @@
+"""
+Process-wide registry for the Gemini client and models.
+
+The API client is configured once and each GenerativeModel is created
+once per (model, generation config) and reused by every call, so the hot
+path does no per-request setup. With the REST transport the client's HTTP
+session gets a connection pool sized to the LLM thread pool; the default
+pool keeps only 10 connections, so with more concurrent calls the extra
+connections were closed after each request and every overflow call paid
+a new TCP and TLS handshake. The gRPC transport multiplexes all calls
+over one persistent channel.
+
+google.generativeai takes most of a second to import, so it is imported
+and configured on the first model request rather than at startup; the
+API key is only required by then.
+
+Calls go through the backend selected by LLM_BACKEND: "gemini", or
+"stub" (core.llm_stub) to run the pipeline offline with simulated
+latency and errors, e.g. for load tests. Other backends can be added
+with register_backend.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from core.metrics import counter, gauge, histogram
+
+logger = logging.getLogger(__name__)
+
+# Backend that answers LLM calls: "gemini", "stub" or a registered backend
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+
+# Gemini model used for all calls
+MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+
+# Generation settings shared by every call; unset values use the model defaults
+GENERATION_CONFIG: Dict[str, Any] = {}
+if os.getenv("GEMINI_TEMPERATURE"):
+    GENERATION_CONFIG["temperature"] = float(os.getenv("GEMINI_TEMPERATURE"))
+if os.getenv("GEMINI_MAX_OUTPUT_TOKENS"):
+    GENERATION_CONFIG["max_output_tokens"] = int(os.getenv("GEMINI_MAX_OUTPUT_TOKENS"))
+
+# "grpc" or "rest"; empty uses the SDK default (gRPC)
+GEMINI_TRANSPORT = os.getenv("GEMINI_TRANSPORT", "") or None
+# Override of the API endpoint, e.g. a proxy or a local stub server
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "")
+# Keep-alive connections held by the REST transport; matches the LLM thread pool by default
+GEMINI_HTTP_POOL_SIZE = int(os.getenv("GEMINI_HTTP_POOL_SIZE", os.getenv("LLM_MAX_CONCURRENCY", "32")))
+
+_lock = threading.Lock()
+_api_key: Optional[str] = None
+_genai: Any = None
+_models: Dict[Tuple[str, str], Any] = {}
+_http_adapter = None
+_backend: Any = None
+_stats = {
+    "models_created": 0,
+    "calls": 0,
+    "errors": 0,
+    "in_flight": 0,
+    "peak_in_flight": 0,
+}
+_last_success_at = 0.0
+
+# Per-call metrics, labelled by call as in core.llm_extractor
+LLM_CALL_SECONDS = histogram("llm_call_seconds", "Latency of LLM calls until the full reply", ["call", "outcome"])
+LLM_CALLS_IN_FLIGHT = gauge("llm_calls_in_flight", "LLM calls waiting for their reply", ["call"])
+LLM_CALL_ERRORS = counter("llm_call_errors_total", "LLM calls that raised, by error type", ["call", "error"])
+LLM_STREAM_FIRST_CHUNK_SECONDS = histogram(
+    "llm_stream_first_chunk_seconds", "Time to the first chunk of streamed LLM replies", ["call"]
+)
+
+
+def configure(api_key: str) -> None:
+    """
+    Set the Gemini API key for this process.
+
+    The client is configured with it on the next model request, and
+    cached models are cleared so they pick up the new client.
+
+    Args:
+        api_key: Gemini API key
+    """
+    global _api_key, _genai, _http_adapter
+    with _lock:
+        _api_key = api_key
+        _genai = None
+        _models.clear()
+        _http_adapter = None
+
+
+def _load_client() -> Any:
+    # Import and configure the SDK on first use; call with _lock held
+    global _api_key, _genai
+    if _genai is None:
+        api_key = _api_key or os.getenv("GEMINI_API_KEY")
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY not found in environment variables")
+        import google.generativeai as genai
+
+        options = {"api_endpoint": GEMINI_API_ENDPOINT} if GEMINI_API_ENDPOINT else None
+        genai.configure(api_key=api_key, transport=GEMINI_TRANSPORT, client_options=options)
+        _api_key, _genai = api_key, genai
+    return _genai
+
+
+def _mount_http_pool() -> None:
+    # The REST transport talks through a requests session; give it a pool
+    # as large as the number of concurrent calls. gRPC has no session.
+    global _http_adapter
+    if _http_adapter is not None:
+        return
+    from google.generativeai import client as genai_client
+
+    transport = getattr(genai_client.get_default_generative_client(), "_transport", None)
+    session = getattr(transport, "_session", None)
+    if session is None:
+        return
+
+    from requests.adapters import HTTPAdapter
+
+    _http_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=GEMINI_HTTP_POOL_SIZE)
+    session.mount("https://", _http_adapter)
+    session.mount("http://", _http_adapter)
+    logger.info(f"Gemini REST transport pooling up to {GEMINI_HTTP_POOL_SIZE} connections")
+
+
+def get_model(generation_config: Optional[Dict[str, Any]] = None, model_name: str = MODEL_NAME) -> Any:
+    """
+    Get the shared GenerativeModel for a model and generation config.
+
+    Args:
+        generation_config: Settings merged over GENERATION_CONFIG
+        model_name: Gemini model name
+
+    Returns:
+        genai.GenerativeModel: Model created on first use and then reused
+    """
+    config = {**GENERATION_CONFIG, **(generation_config or {})}
+    key = (model_name, json.dumps(config, sort_keys=True, default=str))
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            model = _load_client().GenerativeModel(model_name, generation_config=config or None)
+            _mount_http_pool()
+            _models[key] = model
+            _stats["models_created"] += 1
+    return model
+
+
+def _call_started(call: str) -> float:
+    with _lock:
+        _stats["calls"] += 1
+        _stats["in_flight"] += 1
+        _stats["peak_in_flight"] = max(_stats["peak_in_flight"], _stats["in_flight"])
+    LLM_CALLS_IN_FLIGHT.inc(call=call)
+    return time.perf_counter()
+
+
+def _call_finished(call: str, started: float, error: Optional[BaseException]) -> None:
+    global _last_success_at
+    with _lock:
+        _stats["in_flight"] -= 1
+        if error is not None:
+            _stats["errors"] += 1
+        else:
+            _last_success_at = time.time()
+    LLM_CALLS_IN_FLIGHT.dec(call=call)
+    LLM_CALL_SECONDS.observe(time.perf_counter() - started, call=call, outcome="error" if error else "ok")
+    if error is not None:
+        LLM_CALL_ERRORS.inc(call=call, error=type(error).__name__)
+
+
+def last_success_at() -> float:
+    """
+    Get when a Gemini call last succeeded in this process.
+
+    Returns:
+        float: Unix time of the last successful call, 0 if none yet
+    """
+    return _last_success_at
+
+
+class GeminiBackend:
+    """
+    Backend answering calls with the shared Gemini models.
+
+    Backends implement generate and stream; call names the pipeline
+    step ("extract", "compare", "compare_stream", "compare_batch",
+    "extract_jd", "repair" or "health") and may be ignored.
+    """
+
+    name = "gemini"
+
+    def generate(self, prompt: str, generation_config: Optional[Dict[str, Any]], call: str, **kwargs: Any) -> Any:
+        return get_model(generation_config).generate_content(prompt, **kwargs)
+
+    def stream(self, prompt: str, generation_config: Optional[Dict[str, Any]], call: str) -> Iterator[Any]:
+        return iter(get_model(generation_config).generate_content(prompt, stream=True))
+
+
+def _stub_backend() -> Any:
+    from core.llm_stub import StubBackend
+
+    return StubBackend.from_env()
+
+
+_backend_factories: Dict[str, Callable[[], Any]] = {"gemini": GeminiBackend, "stub": _stub_backend}
+
+
+def register_backend(name: str, factory: Callable[[], Any]) -> None:
+    """
+    Make a backend selectable with LLM_BACKEND.
+
+    Args:
+        name: Value of LLM_BACKEND that selects it
+        factory: Creates the backend, an object with generate and stream
+            methods like GeminiBackend
+    """
+    global _backend
+    with _lock:
+        _backend_factories[name] = factory
+        _backend = None
+
+
+def get_backend() -> Any:
+    """
+    Get the backend selected by LLM_BACKEND, creating it on first use.
+
+    Returns:
+        Backend answering LLM calls
+
+    Raises:
+        ValueError: If LLM_BACKEND names no known backend
+    """
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                factory = _backend_factories.get(LLM_BACKEND)
+                if factory is None:
+                    raise ValueError(f"Unknown LLM_BACKEND: {LLM_BACKEND}")
+                _backend = factory()
+    return _backend
+
+
+def generate_content(prompt: str, generation_config: Optional[Dict[str, Any]] = None, call: str = "",
+                     **kwargs: Any) -> Any:
+    """
+    Send a prompt through the selected backend, tracking pool utilization.
+
+    Args:
+        prompt: Prompt text
+        generation_config: Settings merged over GENERATION_CONFIG
+        call: Pipeline step making the call
+        **kwargs: Extra arguments for GenerativeModel.generate_content
+
+    Returns:
+        GenerateContentResponse: Reply with text and usage_metadata
+    """
+    backend = get_backend()
+    started = _call_started(call)
+    error = None
+    try:
+        return backend.generate(prompt, generation_config, call, **kwargs)
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        _call_finished(call, started, error)
+
+
+def stream_content(prompt: str, generation_config: Optional[Dict[str, Any]] = None, call: str = "") -> Iterator[Any]:
+    """
+    Stream a reply from the selected backend chunk by chunk.
+
+    The call counts as in flight until the stream is exhausted or closed.
+
+    Args:
+        prompt: Prompt text
+        generation_config: Settings merged over GENERATION_CONFIG
+        call: Pipeline step making the call
+
+    Yields:
+        GenerateContentResponse: Reply chunks as they arrive
+    """
+    backend = get_backend()
+    started = _call_started(call)
+    error = None
+    first = True
+    try:
+        for chunk in backend.stream(prompt, generation_config, call):
+            if first:
+                LLM_STREAM_FIRST_CHUNK_SECONDS.observe(time.perf_counter() - started, call=call)
+                first = False
+            yield chunk
+    except Exception as e:
+        # GeneratorExit, when the consumer stops reading early, is not an error
+        error = e
+        raise
+    finally:
+        _call_finished(call, started, error)
+
+
+def _http_pool_stats() -> Optional[Dict[str, int]]:
+    if _http_adapter is None:
+        return None
+    container = _http_adapter.poolmanager.pools
+    pools = [container[key] for key in container.keys()]
+    return {
+        "max_connections": GEMINI_HTTP_POOL_SIZE,
+        "connections_opened": sum(pool.num_connections for pool in pools),
+        "requests": sum(pool.num_requests for pool in pools),
+        # The pool queue is pre-filled with None placeholders for unopened slots
+        "idle_connections": sum(
+            1 for pool in pools if pool.pool is not None for conn in list(pool.pool.queue) if conn is not None
+        ),
+    }
+
+
+def get_stats() -> Dict[str, Any]:
+    """
+    Get model registry and connection pool statistics.
+
+    Returns:
+        dict: Model and transport settings, models created, calls made,
+            calls in flight and pool utilization; "http_pool" has
+            connection counts when the REST transport is used
+    """
+    with _lock:
+        stats = dict(_stats)
+    return {
+        "backend": LLM_BACKEND,
+        "model": MODEL_NAME,
+        "transport": GEMINI_TRANSPORT or "grpc",
+        "models_cached": len(_models),
+        **stats,
+        "utilization": round(stats["in_flight"] / GEMINI_HTTP_POOL_SIZE, 3) if GEMINI_HTTP_POOL_SIZE else 0.0,
+        "http_pool": _http_pool_stats(),
+    }
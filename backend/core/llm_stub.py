@@ -0,0 +1,328 @@
+"""
+Local stand-in for Gemini, for load tests and benchmarks without a key.
+
+Selected with LLM_BACKEND=stub. Replies are built from the prompt, so the
+same resume and job description always get the same extraction and
+score, and the rest of the pipeline (parsing, caching, ranking) runs
+exactly as with Gemini. Each call sleeps for a latency drawn from
+LLM_STUB_LATENCY and fails with a simulated 503 at LLM_STUB_ERROR_RATE;
+LLM_STUB_MALFORMED_RATE wraps replies in prose and a markdown fence the
+way Gemini sometimes does, exercising the tolerant reply parser.
+
+Latency distributions:
+
+    fixed:SECONDS
+    uniform:LOW,HIGH
+    normal:MEAN,STDDEV
+    lognormal:MEDIAN,SIGMA
+
+LLM_STUB_CONFIG names a JSON file overriding "latency", "error_rate",
+"malformed_rate" or a canned "reply" per call ("extract", "compare",
+"compare_stream", "compare_batch", "extract_jd", "repair" or "health"):
+
+    {"compare": {"latency": "lognormal:2.5,0.4", "error_rate": 0.02},
+     "extract_jd": {"reply": {"title": "Engineer", "seniority": "mid", ...}}}
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from core.skills import get_taxonomy
+from core.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Seconds each call takes
+LLM_STUB_LATENCY = os.getenv("LLM_STUB_LATENCY", "lognormal:1.0,0.35")
+# Share of calls failing with a simulated 503
+LLM_STUB_ERROR_RATE = float(os.getenv("LLM_STUB_ERROR_RATE", "0"))
+# Share of replies wrapped in prose and a markdown fence
+LLM_STUB_MALFORMED_RATE = float(os.getenv("LLM_STUB_MALFORMED_RATE", "0"))
+# Seed for latencies and injected failures, empty for a random seed
+LLM_STUB_SEED = os.getenv("LLM_STUB_SEED", "")
+# JSON file with per-call overrides
+LLM_STUB_CONFIG = os.getenv("LLM_STUB_CONFIG", "")
+
+# Chunks per streamed reply
+STREAM_CHUNKS = 8
+
+# Share of the latency spent before the first streamed chunk
+STREAM_FIRST_CHUNK_SHARE = 0.3
+
+_CANDIDATE_ID = re.compile(r'"candidate_id":"([^"]+)"')
+_EXPERIENCE = re.compile(r'"experience_years":\s*([0-9.]+)')
+
+
+class StubServiceUnavailable(Exception):
+    """Simulated Gemini outage."""
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a latency distribution.
+
+    Args:
+        spec: Distribution as "name:parameters", see the module docstring
+
+    Returns:
+        callable: Draws a latency in seconds from a random generator
+
+    Raises:
+        ValueError: If the distribution is unknown or its parameters invalid
+    """
+    name, _, params = spec.partition(":")
+    try:
+        values = [float(value) for value in params.split(",")] if params else []
+    except ValueError:
+        raise ValueError(f"Invalid latency parameters: {spec}")
+    name = name.strip().lower()
+    if name == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if name == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if name == "normal" and len(values) == 2:
+        return lambda rng: rng.gauss(values[0], values[1])
+    if name == "lognormal" and len(values) == 2 and values[0] > 0:
+        return lambda rng: values[0] * rng.lognormvariate(0.0, values[1])
+    raise ValueError(f"Invalid latency distribution: {spec}")
+
+
+def _digest(text: str) -> int:
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _between(text: str, start: str, end: str) -> str:
+    _, _, rest = text.partition(start)
+    return rest.partition(end)[0] if end else rest
+
+
+def _skill_names(text: str) -> List[str]:
+    taxonomy = get_taxonomy()
+    return [taxonomy.skills[skill_id]["name"] for skill_id in taxonomy.scan(text)]
+
+
+def fake_resume(resume_text: str) -> Dict[str, Any]:
+    """
+    Extract resume data the way a model might, from skills named in the text.
+
+    Args:
+        resume_text: Resume text
+
+    Returns:
+        dict: Resume data in the extraction format
+    """
+    digest = _digest(resume_text)
+    lines = [line.strip() for line in resume_text.splitlines() if line.strip()]
+    return {
+        "skills": _skill_names(resume_text),
+        "experience_years": digest % 16,
+        "education": [line for line in lines if re.search(r"\b(degree|bachelor|master|university|college)\b",
+                                                          line, re.IGNORECASE)][:3],
+        "previous_roles": [line for line in lines if re.search(r"\b(engineer|developer|teacher|manager|analyst)\b",
+                                                               line, re.IGNORECASE)][:4],
+        "key_achievements": [],
+        "contact_info": {"name": lines[0][:60] if lines else None, "email": None, "phone": None},
+    }
+
+
+def fake_match(resume_text: str, jd_text: str) -> Dict[str, Any]:
+    """
+    Score a resume against a job description by the skills they share.
+
+    Args:
+        resume_text: Resume data or text
+        jd_text: Job description text
+
+    Returns:
+        dict: Match analysis in the comparison format
+    """
+    required = _skill_names(jd_text)
+    offered = set(_skill_names(resume_text))
+    matches = [skill for skill in required if skill in offered]
+    gaps = [skill for skill in required if skill not in offered]
+    share = len(matches) / len(required) if required else 0.5
+    score = min(100, int(30 + 60 * share + _digest(resume_text + jd_text) % 10))
+    experience = _EXPERIENCE.search(resume_text)
+    recommendation = "hire" if score >= 75 else "consider" if score >= 50 else "reject"
+    return {
+        "match_score": score,
+        "match_summary": f"Matches {len(matches)} of {len(required)} required skills.",
+        "skill_matches": matches,
+        "skill_gaps": gaps,
+        "experience_match": f"{experience.group(1) if experience else 'Unknown'} years of experience.",
+        "education_match": "Education not assessed by the stub backend.",
+        "overall_recommendation": f"{recommendation}: stub score {score}",
+    }
+
+
+def fake_jd(jd_text: str) -> Dict[str, Any]:
+    """
+    Extract job requirements from the skills named in a job description.
+
+    Args:
+        jd_text: Job description text
+
+    Returns:
+        dict: Requirements in the JD extraction format
+    """
+    lines = [line.strip() for line in jd_text.splitlines() if line.strip()]
+    return {
+        "title": lines[0][:80] if lines else "",
+        "seniority": "mid",
+        "required_skills": _skill_names(jd_text),
+        "preferred_skills": [],
+        "min_experience_years": None,
+        "education": [],
+        "responsibilities": [line.lstrip("-* ") for line in lines[1:9]],
+    }
+
+
+def fake_reply(call: str, prompt: str) -> Any:
+    """
+    Build the reply a call expects from its prompt.
+
+    Args:
+        call: Pipeline step making the call
+        prompt: Prompt text
+
+    Returns:
+        Reply value, serialized to JSON by the caller; a string for
+        calls that do not expect JSON
+    """
+    if call == "extract":
+        return fake_resume(_between(prompt, "Resume text:", "JSON Response:"))
+    if call in ("compare", "compare_stream"):
+        return fake_match(_between(prompt, "Resume Data:", "Job Description:"),
+                          _between(prompt, "Job Description:", "Provide your analysis"))
+    if call == "compare_batch":
+        jd_text = _between(prompt, "Job Description:", "Candidates (")
+        candidates = _between(prompt, "Candidates (", "Return one object").splitlines()
+        return [
+            {"candidate_id": match.group(1), **fake_match(line, jd_text)}
+            for line in candidates for match in [_CANDIDATE_ID.search(line)] if match
+        ]
+    if call == "extract_jd":
+        return fake_jd(_between(prompt, "Job description:", "JSON Response:"))
+    if call == "repair":
+        return prompt.split("\n\n", 1)[-1].rsplit("JSON Response:", 1)[0].strip()
+    return "OK"
+
+
+class StubBackend:
+    """
+    LLM backend answering locally with simulated latency and failures.
+
+    Args:
+        latency: Default latency distribution
+        error_rate: Default share of calls failing with a simulated 503
+        malformed_rate: Default share of replies wrapped in prose
+        seed: Seed for latencies and failures, None for a random seed
+        overrides: Per-call "latency", "error_rate", "malformed_rate"
+            and canned "reply"
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: str = LLM_STUB_LATENCY, error_rate: float = LLM_STUB_ERROR_RATE,
+                 malformed_rate: float = LLM_STUB_MALFORMED_RATE, seed: Optional[int] = None,
+                 overrides: Optional[Dict[str, Dict[str, Any]]] = None):
+        self._default = {
+            "latency": parse_latency(latency),
+            "error_rate": error_rate,
+            "malformed_rate": malformed_rate,
+        }
+        self._calls: Dict[str, Dict[str, Any]] = {}
+        for call, settings in (overrides or {}).items():
+            merged = dict(self._default)
+            merged.update(settings)
+            if isinstance(merged["latency"], str):
+                merged["latency"] = parse_latency(merged["latency"])
+            self._calls[call] = merged
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "StubBackend":
+        """
+        Create the stub configured by the LLM_STUB_* environment variables.
+
+        Returns:
+            StubBackend: Configured stub
+        """
+        overrides = None
+        if LLM_STUB_CONFIG:
+            with open(LLM_STUB_CONFIG, "r", encoding="utf-8") as f:
+                overrides = json.load(f)
+        seed = int(LLM_STUB_SEED) if LLM_STUB_SEED else None
+        logger.info(f"Using the stub LLM backend, latency {LLM_STUB_LATENCY}, error rate {LLM_STUB_ERROR_RATE}")
+        return cls(seed=seed, overrides=overrides)
+
+    def _draw(self, settings: Dict[str, Any]) -> Tuple[float, bool, bool]:
+        # One lock for the shared generator keeps seeded runs reproducible
+        with self._rng_lock:
+            latency = max(0.0, settings["latency"](self._rng))
+            failed = self._rng.random() < settings["error_rate"]
+            malformed = self._rng.random() < settings["malformed_rate"]
+        return latency, failed, malformed
+
+    def _reply_text(self, call: str, prompt: str, settings: Dict[str, Any], malformed: bool) -> str:
+        reply = settings["reply"] if "reply" in settings else fake_reply(call, prompt)
+        text = reply if isinstance(reply, str) else json.dumps(reply, indent=2)
+        if malformed:
+            text = f"Here is the analysis you asked for:\n```json\n{text}\n```\nLet me know if you need more."
+        return text
+
+    def _response(self, prompt: str, text: str, output_text: str) -> SimpleNamespace:
+        usage = SimpleNamespace(prompt_token_count=estimate_tokens(prompt),
+                                candidates_token_count=estimate_tokens(output_text))
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+    def generate(self, prompt: str, generation_config: Optional[Dict[str, Any]], call: str, **kwargs: Any) -> Any:
+        """
+        Answer a prompt after the simulated latency.
+
+        Raises:
+            StubServiceUnavailable: For the injected share of failures
+        """
+        settings = self._calls.get(call, self._default)
+        latency, failed, malformed = self._draw(settings)
+        # Runs on the LLM thread pool, so blocking here is what Gemini does
+        time.sleep(latency)
+        if failed:
+            raise StubServiceUnavailable(f"503 Service Unavailable (simulated {call or 'call'} failure)")
+        text = self._reply_text(call, prompt, settings, malformed)
+        return self._response(prompt, text, text)
+
+    def stream(self, prompt: str, generation_config: Optional[Dict[str, Any]], call: str) -> Iterator[Any]:
+        """
+        Stream a reply in STREAM_CHUNKS chunks spread over the simulated latency.
+
+        Raises:
+            StubServiceUnavailable: For the injected share of failures,
+                before the first chunk
+        """
+        settings = self._calls.get(call, self._default)
+        latency, failed, malformed = self._draw(settings)
+        time.sleep(latency * STREAM_FIRST_CHUNK_SHARE)
+        if failed:
+            raise StubServiceUnavailable(f"503 Service Unavailable (simulated {call or 'call'} failure)")
+        text = self._reply_text(call, prompt, settings, malformed)
+        size = -(-len(text) // STREAM_CHUNKS)
+        pause = latency * (1 - STREAM_FIRST_CHUNK_SHARE) / STREAM_CHUNKS
+        for start in range(0, len(text), size or 1):
+            if start:
+                time.sleep(pause)
+            chunk = text[start:start + size]
+            if start + size < len(text):
+                yield SimpleNamespace(text=chunk, usage_metadata=None)
+            else:
+                # Like Gemini, the last chunk carries the usage for the whole reply
+                yield self._response(prompt, chunk, text)
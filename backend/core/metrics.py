@@ -0,0 +1,220 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms are kept per label set in a process-wide
+registry and rendered by render_prometheus() for the /metrics endpoint.
+"""
+import bisect
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Default histogram buckets for latencies in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Default histogram buckets for token counts
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def _format_labels(self, values: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labels, values))
+        if extra is not None:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+        return "{" + rendered + "}"
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. requests or errors."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{self._format_labels(key)} {value:g}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, e.g. queue depth or calls in flight."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{self._format_labels(key)} {value:g}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts, then +Inf count and sum
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def total(self, **labels: str) -> float:
+        series = self._series.get(self._key(labels))
+        return series[-1] if series else 0.0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+                cumulative += series[len(self.buckets)]
+                lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', '+Inf'))} {cumulative}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {series[-1]:g}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+_registry: Dict[str, _Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(metric: _Metric) -> _Metric:
+    with _registry_lock:
+        existing = _registry.get(metric.name)
+        if existing is not None:
+            return existing
+        _registry[metric.name] = metric
+        return metric
+
+
+def counter(name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+    """
+    Get or create a counter in the process-wide registry.
+
+    Args:
+        name: Metric name
+        description: Help text
+        labels: Label names
+
+    Returns:
+        Counter: Registered counter
+    """
+    return _register(Counter(name, description, labels))
+
+
+def gauge(name: str, description: str, labels: Sequence[str] = ()) -> Gauge:
+    """
+    Get or create a gauge in the process-wide registry.
+
+    Args:
+        name: Metric name
+        description: Help text
+        labels: Label names
+
+    Returns:
+        Gauge: Registered gauge
+    """
+    return _register(Gauge(name, description, labels))
+
+
+def histogram(name: str, description: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    """
+    Get or create a histogram in the process-wide registry.
+
+    Args:
+        name: Metric name
+        description: Help text
+        labels: Label names
+        buckets: Upper bounds of the histogram buckets
+
+    Returns:
+        Histogram: Registered histogram
+    """
+    return _register(Histogram(name, description, labels, buckets))
+
+
+def render_prometheus() -> str:
+    """
+    Render every registered metric in the Prometheus text format.
+
+    Returns:
+        str: Exposition text
+    """
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines: List[str] = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -2,8 +2,119 @@
 PDF text extraction module for resume parsing.
 """
 import io
-from pypdf import PdfReader
-from typing import Optional
+import os
+import time
+import zipfile
+import zlib
+from dataclasses import dataclass, field
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from core.text_normalizer import normalize_page_texts
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+logger = logging.getLogger(__name__)
+
+# Bytes decompressed from a zip entry at a time
+ZIP_READ_CHUNK_SIZE = 64 * 1024
+
+# Every PDF file starts with this header
+PDF_SIGNATURE = b"%PDF"
+
+
+@dataclass
+class PDFParseResult:
+    """
+    Result of reading a PDF once: validity, pages and metadata.
+    
+    Attributes:
+        is_valid: True if the bytes are a readable PDF with at least one page
+        page_count: Number of pages in the document
+        page_texts: Extracted text of each page ("" where extraction failed)
+        metadata: Document information dictionary (title, author, ...)
+        error: Reason the PDF is invalid, if it is
+        page_seconds: Time spent extracting each page
+        page_errors: Why extraction failed, by zero-based page index
+    """
+    is_valid: bool
+    page_count: int = 0
+    page_texts: List[str] = field(default_factory=list)
+    metadata: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+    page_seconds: List[float] = field(default_factory=list)
+    page_errors: Dict[int, str] = field(default_factory=dict)
+    
+    @property
+    def text(self) -> str:
+        """Text of all pages joined with newlines."""
+        return "\n".join(page_text for page_text in self.page_texts if page_text).strip()
+
+
+def parse_pdf(file_bytes: bytes) -> PDFParseResult:
+    """
+    Validate a PDF and extract its text with a single PdfReader pass.
+    
+    Args:
+        file_bytes: Raw bytes of the PDF file
+        
+    Returns:
+        PDFParseResult: Parse result; is_valid is False instead of raising
+            when the bytes are not a readable PDF
+    """
+    # pypdf is imported on first use to keep startup fast
+    from pypdf import PdfReader
+
+    try:
+        pdf_reader = PdfReader(io.BytesIO(file_bytes))
+        page_count = len(pdf_reader.pages)
+    except Exception as e:
+        return PDFParseResult(is_valid=False, error=f"Error parsing PDF: {str(e)}")
+    
+    if page_count == 0:
+        return PDFParseResult(is_valid=False, error="PDF file contains no pages")
+    
+    result = PDFParseResult(
+        is_valid=True,
+        page_count=page_count,
+        metadata=read_pdf_metadata(pdf_reader)
+    )
+    
+    # Extract text from all pages
+    for page_num, page in enumerate(pdf_reader.pages):
+        start = time.perf_counter()
+        try:
+            result.page_texts.append(page.extract_text() or "")
+        except Exception as e:
+            print(f"Warning: Could not extract text from page {page_num + 1}: {str(e)}")
+            result.page_texts.append("")
+            result.page_errors[page_num] = str(e)
+        result.page_seconds.append(time.perf_counter() - start)
+    
+    return result
+
+
+def read_pdf_metadata(pdf_reader: "PdfReader") -> Dict[str, str]:
+    """
+    Read the document information dictionary of a PDF.
+    
+    Args:
+        pdf_reader: Open PDF reader
+        
+    Returns:
+        dict: Metadata with the leading "/" stripped from keys, or an
+            empty dict if the PDF has none or it cannot be read
+    """
+    try:
+        if pdf_reader.metadata:
+            return {
+                key.lstrip('/'): str(value)
+                for key, value in pdf_reader.metadata.items()
+            }
+    except Exception:
+        pass
+    return {}
 
 
 def parse_pdf_to_text(file_bytes: bytes) -> str:
@@ -21,35 +132,8 @@ def parse_pdf_to_text(file_bytes: bytes) -> str:
         Exception: For other PDF processing errors
     """
     try:
-        # Create a BytesIO object from the file bytes
-        pdf_file = io.BytesIO(file_bytes)
-        
-        # Create PDF reader object
-        pdf_reader = PdfReader(pdf_file)
-        
-        # Check if PDF has pages
-        if len(pdf_reader.pages) == 0:
-            raise ValueError("PDF file contains no pages")
-        
-        # Extract text from all pages
-        extracted_text = ""
-        for page_num, page in enumerate(pdf_reader.pages):
-            try:
-                page_text = page.extract_text()
-                if page_text:
-                    extracted_text += page_text + "\n"
-            except Exception as e:
-                print(f"Warning: Could not extract text from page {page_num + 1}: {str(e)}")
-                continue
-        
-        # Clean up the extracted text
-        extracted_text = extracted_text.strip()
-        
-        if not extracted_text:
-            raise ValueError("No text could be extracted from the PDF")
-        
-        return extracted_text
-        
+        result = parse_pdf(file_bytes)
+        return pdf_result_to_text(result)
     except ValueError:
         # Re-raise ValueError as is
         raise
@@ -57,6 +141,37 @@ def parse_pdf_to_text(file_bytes: bytes) -> str:
         raise Exception(f"Error parsing PDF: {str(e)}")
 
 
+def pdf_result_to_text(result: PDFParseResult) -> str:
+    """
+    Get the normalized text of a parse result, checking that there is some.
+    
+    Repeated headers/footers, hyphenation breaks and whitespace runs are
+    removed (see core.text_normalizer) to keep the LLM prompt short.
+    
+    Args:
+        result: Result of parse_pdf
+        
+    Returns:
+        str: Extracted text content from the PDF
+        
+    Raises:
+        ValueError: If the PDF is invalid, empty or has no text
+    """
+    if not result.is_valid:
+        raise ValueError(result.error)
+    
+    normalized = normalize_page_texts(result.page_texts)
+    logger.info(
+        f"Normalized PDF text: {normalized.chars_before} -> {normalized.chars_after} chars, "
+        f"~{normalized.tokens_saved} tokens saved"
+    )
+    extracted_text = normalized.text
+    if not extracted_text:
+        raise ValueError("No text could be extracted from the PDF")
+    
+    return extracted_text
+
+
 def validate_pdf_file(file_bytes: bytes) -> bool:
     """
     Validate if the provided bytes represent a valid PDF file.
@@ -67,9 +182,78 @@ def validate_pdf_file(file_bytes: bytes) -> bool:
     Returns:
         bool: True if valid PDF, False otherwise
     """
+    from pypdf import PdfReader
+
     try:
         pdf_file = io.BytesIO(file_bytes)
         pdf_reader = PdfReader(pdf_file)
         return len(pdf_reader.pages) > 0
     except:
         return False
+
+
+def extract_pdfs_from_zip(file_bytes: bytes, max_files: int = 200, max_file_size: int = 20 * 1024 * 1024,
+                          max_total_size: Optional[int] = None) -> List[Tuple[str, bytes]]:
+    """
+    Extract the PDF files contained in a zip archive.
+    
+    Entries are decompressed in chunks and counted as they are read, since
+    the sizes an archive declares can be forged; entries without a %PDF
+    header are skipped.
+    
+    Args:
+        file_bytes: Raw bytes of the zip archive
+        max_files: Maximum number of PDFs to extract
+        max_file_size: Maximum uncompressed size of a single PDF in bytes
+        max_total_size: Maximum uncompressed size of all PDFs together in
+            bytes, None for no limit
+        
+    Returns:
+        list: (filename, PDF bytes) pairs
+        
+    Raises:
+        ValueError: If the archive is invalid or exceeds the limits
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(file_bytes))
+    except zipfile.BadZipFile:
+        raise ValueError("Invalid zip archive")
+    
+    pdfs = []
+    total = 0
+    with archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or not name.lower().endswith('.pdf'):
+                continue
+            # Skip macOS resource fork entries
+            if name.startswith('__MACOSX/') or os.path.basename(name).startswith('._'):
+                continue
+            if len(pdfs) >= max_files:
+                raise ValueError(f"Zip archive contains more than {max_files} PDF files")
+            if info.file_size > max_file_size:
+                raise ValueError(f"{name} exceeds the maximum file size")
+
+            data = bytearray()
+            try:
+                with archive.open(info) as entry:
+                    while True:
+                        chunk = entry.read(ZIP_READ_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        data += chunk
+                        if len(data) > max_file_size:
+                            raise ValueError(f"{name} exceeds the maximum file size")
+                        if max_total_size is not None and total + len(data) > max_total_size:
+                            raise ValueError("Zip archive exceeds the maximum total uncompressed size")
+                        if len(data) >= len(PDF_SIGNATURE) and not data.startswith(PDF_SIGNATURE):
+                            break
+            except (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError) as e:
+                raise ValueError(f"{name} could not be decompressed: {str(e)}")
+            if not data.startswith(PDF_SIGNATURE):
+                logger.warning(f"Skipping {name} in zip archive: not a PDF file")
+                continue
+            total += len(data)
+            pdfs.append((os.path.basename(name), bytes(data)))
+    
+    return pdfs
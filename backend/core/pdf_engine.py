@@ -0,0 +1,372 @@
+"""
+Process-pool PDF extraction engine.
+
+pypdf is pure Python, so text extraction is CPU bound and would stall the
+event loop if run inline. The engine runs it in worker processes, splits
+long documents into page ranges that are extracted in parallel, and
+enforces per-page and per-document time limits plus a per-worker memory
+limit so a pathological PDF fails instead of hanging the server.
+"""
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Set
+
+from core.parser import PDFParseResult, parse_pdf, read_pdf_metadata
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Number of worker processes; 0 extracts in a thread without limits
+PDF_POOL_WORKERS = int(os.getenv("PDF_POOL_WORKERS", str(os.cpu_count() or 2)))
+# Documents with more pages than this are split across workers
+PDF_SPLIT_PAGES = int(os.getenv("PDF_SPLIT_PAGES", "4"))
+# Pages per task once a document is split
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "2"))
+# Time limits in seconds
+PDF_PAGE_TIMEOUT = float(os.getenv("PDF_PAGE_TIMEOUT", "5"))
+PDF_DOCUMENT_TIMEOUT = float(os.getenv("PDF_DOCUMENT_TIMEOUT", "20"))
+# Address space limit per worker process in MB, 0 for no limit
+PDF_WORKER_MEMORY_MB = int(os.getenv("PDF_WORKER_MEMORY_MB", "1024"))
+# Replace each worker after this many tasks to return leaked memory
+PDF_MAX_TASKS_PER_CHILD = int(os.getenv("PDF_MAX_TASKS_PER_CHILD", "200"))
+
+# Extra time the parent waits past the document deadline before killing workers
+_KILL_GRACE_SECONDS = 2.0
+
+_pool: Optional[ProcessPoolExecutor] = None
+# Unfinished tasks of each pool, so a retired pool can drain before it is killed
+_pool_tasks: Dict[ProcessPoolExecutor, Set[asyncio.Future]] = {}
+# Retired pools waiting for their other documents to finish
+_retiring: Set[asyncio.Task] = set()
+_stats = {
+    "documents": 0,
+    "pages": 0,
+    "page_errors": 0,
+    "page_timeouts": 0,
+    "document_timeouts": 0,
+    "worker_restarts": 0,
+    "worker_crashes": 0,
+    "page_seconds_total": 0.0,
+    "page_seconds_max": 0.0,
+}
+
+
+class PDFExtractionError(Exception):
+    """Extraction of one document failed in the engine rather than in pypdf."""
+
+
+class PDFTimeoutError(PDFExtractionError):
+    """Extraction exceeded the per-page or per-document time limit."""
+
+
+class PDFWorkerCrashError(PDFExtractionError):
+    """A worker process died while extracting the document, even after a retry."""
+
+
+def _init_worker(memory_limit_mb: int) -> None:
+    # Let the parent handle Ctrl+C and cap the worker's address space
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if resource is not None and memory_limit_mb > 0:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+@contextmanager
+def _time_limit(seconds: float):
+    # SIGALRM only works in the main thread of a Unix process, which is
+    # where pool workers run tasks; elsewhere the limit is not enforced
+    if not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def on_alarm(signum, frame):
+        raise PDFTimeoutError(f"Time limit of {seconds:.1f}s exceeded")
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _extract_page_range(file_bytes: bytes, start: int, end: int, page_timeout: float, deadline: float) -> Dict[str, Any]:
+    """
+    Worker task: extract the text of pages [start, end) of a PDF.
+
+    Returns a plain dict so nothing pypdf-specific crosses the process
+    boundary. "pages" holds (text, seconds, error) tuples, and
+    "deadline_exceeded" is set if the document deadline passed.
+    """
+    # pypdf is imported on first use to keep startup fast
+    from pypdf import PdfReader
+
+    try:
+        pdf_reader = PdfReader(io.BytesIO(file_bytes))
+        page_count = len(pdf_reader.pages)
+    except MemoryError:
+        return {"error": "Memory limit exceeded while opening PDF"}
+    except Exception as e:
+        return {"error": f"Error parsing PDF: {str(e)}"}
+
+    chunk: Dict[str, Any] = {"page_count": page_count, "pages": []}
+    if start == 0:
+        chunk["metadata"] = read_pdf_metadata(pdf_reader)
+
+    for page_num in range(start, min(end, page_count)):
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            chunk["deadline_exceeded"] = True
+            break
+        began = time.perf_counter()
+        text, error = "", None
+        try:
+            with _time_limit(min(page_timeout, remaining)):
+                text = pdf_reader.pages[page_num].extract_text() or ""
+        except PDFTimeoutError as e:
+            error = f"timeout: {str(e)}"
+        except MemoryError:
+            error = "memory limit exceeded"
+        except Exception as e:
+            error = str(e)
+        chunk["pages"].append((text, time.perf_counter() - began, error))
+
+    return chunk
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared extraction pool, creating it on first use.
+
+    Returns:
+        ProcessPoolExecutor: Pool with PDF_POOL_WORKERS processes
+    """
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=PDF_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(PDF_WORKER_MEMORY_MB,),
+            max_tasks_per_child=PDF_MAX_TASKS_PER_CHILD or None
+        )
+    return _pool
+
+
+def _terminate_workers(pool: ProcessPoolExecutor) -> None:
+    # Kill the workers so a runaway extraction stops using CPU
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+    _pool_tasks.pop(pool, None)
+
+
+def _detach_pool(pool: ProcessPoolExecutor) -> None:
+    # Route new documents to a fresh pool
+    global _pool
+    if _pool is pool:
+        _pool = None
+        _stats["worker_restarts"] += 1
+
+
+def _reset_broken_pool(pool: ProcessPoolExecutor) -> None:
+    # A dead worker fails every task of its pool; the documents involved
+    # retry on a new pool, and only the first of them replaces it
+    _detach_pool(pool)
+    pool.shutdown(wait=False, cancel_futures=True)
+    _pool_tasks.pop(pool, None)
+
+
+def _retire_pool(pool: ProcessPoolExecutor, hung: List[asyncio.Future]) -> None:
+    """
+    Replace a pool with a stuck worker without failing other documents.
+
+    Tasks of other documents stop at their own deadlines, so the pool is
+    killed once they finish (or after one more document timeout) rather
+    than right away.
+    """
+    _detach_pool(pool)
+    others = [task for task in _pool_tasks.get(pool, ()) if task not in hung and not task.done()]
+
+    async def recycle() -> None:
+        if others:
+            await asyncio.wait(others, timeout=PDF_DOCUMENT_TIMEOUT + _KILL_GRACE_SECONDS)
+        _terminate_workers(pool)
+
+    task = asyncio.get_running_loop().create_task(recycle())
+    _retiring.add(task)
+    task.add_done_callback(_retiring.discard)
+
+
+def _submit(pool: ProcessPoolExecutor, tasks: List[asyncio.Future], *args: Any) -> asyncio.Future:
+    # Run one _extract_page_range task, tracked per document and per pool
+    future = asyncio.get_running_loop().run_in_executor(pool, _extract_page_range, *args)
+    tasks.append(future)
+    pool_tasks = _pool_tasks.setdefault(pool, set())
+    pool_tasks.add(future)
+    future.add_done_callback(pool_tasks.discard)
+    return future
+
+
+def shutdown_pool() -> None:
+    """Shut down the extraction pool and kill retired pools still draining."""
+    global _pool
+    for task in list(_retiring):
+        task.cancel()
+    for pool in list(_pool_tasks):
+        if pool is not _pool:
+            _terminate_workers(pool)
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool_tasks.pop(_pool, None)
+        _pool = None
+
+
+async def _extract_in_pool(file_bytes: bytes, pool: ProcessPoolExecutor,
+                           tasks: List[asyncio.Future]) -> PDFParseResult:
+    deadline = time.time() + PDF_DOCUMENT_TIMEOUT
+
+    # The first task also reports the page count; only long documents pay
+    # for opening the PDF again in other workers
+    first = await _submit(pool, tasks, file_bytes, 0, PDF_SPLIT_PAGES, PDF_PAGE_TIMEOUT, deadline)
+    if "error" in first:
+        return PDFParseResult(is_valid=False, error=first["error"])
+    page_count = first["page_count"]
+    if page_count == 0:
+        return PDFParseResult(is_valid=False, error="PDF file contains no pages")
+
+    chunks: List[Dict[str, Any]] = [first]
+    if page_count > PDF_SPLIT_PAGES:
+        rest = await asyncio.gather(*(
+            _submit(pool, tasks, file_bytes, start, start + PDF_PAGES_PER_TASK, PDF_PAGE_TIMEOUT, deadline)
+            for start in range(PDF_SPLIT_PAGES, page_count, PDF_PAGES_PER_TASK)
+        ))
+        for chunk in rest:
+            if "error" in chunk:
+                return PDFParseResult(is_valid=False, error=chunk["error"])
+        chunks.extend(rest)
+
+    if any(chunk.get("deadline_exceeded") for chunk in chunks):
+        raise PDFTimeoutError(f"PDF extraction exceeded {PDF_DOCUMENT_TIMEOUT:g}s")
+
+    result = PDFParseResult(is_valid=True, page_count=page_count, metadata=first.get("metadata", {}))
+    for chunk in chunks:
+        for text, seconds, error in chunk["pages"]:
+            if error is not None:
+                result.page_errors[len(result.page_texts)] = error
+            result.page_texts.append(text)
+            result.page_seconds.append(seconds)
+    return result
+
+
+async def _extract_with_retry(file_bytes: bytes) -> PDFParseResult:
+    for attempt in range(2):
+        pool = get_pool()
+        tasks: List[asyncio.Future] = []
+        try:
+            # Workers stop at the document deadline on their own; the
+            # parent-side timeout only fires if a worker is stuck
+            return await asyncio.wait_for(
+                _extract_in_pool(file_bytes, pool, tasks),
+                timeout=PDF_DOCUMENT_TIMEOUT + _KILL_GRACE_SECONDS
+            )
+        except asyncio.TimeoutError:
+            logger.error("PDF extraction exceeded the document time limit, replacing workers")
+            _retire_pool(pool, tasks)
+            raise
+        except BrokenProcessPool:
+            _stats["worker_crashes"] += 1
+            logger.error(f"PDF extraction worker died (attempt {attempt + 1}), replacing workers")
+            _reset_broken_pool(pool)
+    raise PDFWorkerCrashError("PDF extraction worker crashed on this document")
+
+
+def _record(result: PDFParseResult) -> None:
+    _stats["documents"] += 1
+    _stats["pages"] += len(result.page_seconds)
+    _stats["page_errors"] += len(result.page_errors)
+    _stats["page_timeouts"] += sum(1 for error in result.page_errors.values() if error.startswith("timeout"))
+    _stats["page_seconds_total"] += sum(result.page_seconds)
+    if result.page_seconds:
+        _stats["page_seconds_max"] = max(_stats["page_seconds_max"], max(result.page_seconds))
+
+
+async def extract_pdf(file_bytes: bytes) -> PDFParseResult:
+    """
+    Validate a PDF and extract its text off the event loop.
+
+    Pages that fail or exceed PDF_PAGE_TIMEOUT come back empty and are
+    listed in page_errors. If a worker gets stuck past
+    PDF_DOCUMENT_TIMEOUT, new documents go to a fresh pool and the old
+    one is killed once its other documents finish. If a worker dies, the
+    document is retried once on a fresh pool.
+
+    Args:
+        file_bytes: Raw bytes of the PDF file
+
+    Returns:
+        PDFParseResult: Parse result with per-page text and latency
+
+    Raises:
+        PDFTimeoutError: If the document time limit is exceeded
+        PDFWorkerCrashError: If a worker died on the document twice
+    """
+    try:
+        if PDF_POOL_WORKERS > 0:
+            result = await _extract_with_retry(file_bytes)
+        else:
+            result = await asyncio.wait_for(
+                asyncio.to_thread(parse_pdf, file_bytes),
+                timeout=PDF_DOCUMENT_TIMEOUT
+            )
+    except PDFTimeoutError:
+        _stats["document_timeouts"] += 1
+        raise
+    except asyncio.TimeoutError:
+        _stats["document_timeouts"] += 1
+        raise PDFTimeoutError(f"PDF extraction exceeded {PDF_DOCUMENT_TIMEOUT:g}s")
+
+    if result.is_valid:
+        _record(result)
+        logger.info(
+            f"Extracted {result.page_count} pages, per-page ms: "
+            f"{[round(seconds * 1000, 1) for seconds in result.page_seconds]}"
+        )
+    return result
+
+
+def get_stats() -> Dict[str, Any]:
+    """
+    Get extraction counters and page latency.
+
+    Returns:
+        dict: Documents and pages processed, errors, timeouts, worker
+            restarts and crashes, and average/maximum page latency in
+            milliseconds
+    """
+    pages = _stats["pages"]
+    return {
+        "workers": PDF_POOL_WORKERS,
+        "documents": _stats["documents"],
+        "pages": pages,
+        "page_errors": _stats["page_errors"],
+        "page_timeouts": _stats["page_timeouts"],
+        "document_timeouts": _stats["document_timeouts"],
+        "worker_restarts": _stats["worker_restarts"],
+        "worker_crashes": _stats["worker_crashes"],
+        "page_ms_avg": round(_stats["page_seconds_total"] * 1000 / pages, 2) if pages else 0.0,
+        "page_ms_max": round(_stats["page_seconds_max"] * 1000, 2),
+    }
@@ -0,0 +1,333 @@
+"""
+Deterministic local pre-scoring of resumes against a job description.
+
+Most applicants to a high-volume role are clear mismatches, yet each one
+costs a full Gemini comparison. The pre-scorer compares the extracted
+resume data with the JD's requirements locally, in microseconds, and
+only candidates scoring at least PRESCORE_THRESHOLD are sent to Gemini.
+Whenever Gemini scores a pre-scored candidate (cached or shared results
+don't count again), their agreement is recorded so the threshold can be
+tuned; with the default threshold of 0 every candidate still goes
+to Gemini and the pre-scorer only runs in shadow mode.
+
+The score combines three parts:
+
+    skills      IDF-weighted share of the JD's requirement terms found in
+                the resume's skills, roles, education and achievements
+    role        best term overlap between a previous role and the JD title
+    experience  resume years relative to the minimum years the JD asks for
+
+Skills are compared by their canonical ids from the skill taxonomy, so
+"ReactJS" in a resume covers "React.js" in the JD. Parts the JD gives no
+information on (no title, no years) are left out and the remaining
+weights are rescaled.
+"""
+import functools
+import math
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from core.jd_prep import JD_PREP_CACHE_SIZE, prepare_jd
+from core.metrics import counter, histogram
+from core.skills import SKILL_IDS_FIELD, get_taxonomy
+
+# Candidates scoring below this are screened out without calling Gemini
+PRESCORE_THRESHOLD = int(os.getenv("PRESCORE_THRESHOLD", "0"))
+
+# Local and Gemini scores this close (in points) count as agreeing
+PRESCORE_AGREEMENT_TOLERANCE = int(os.getenv("PRESCORE_AGREEMENT_TOLERANCE", "20"))
+
+# Weights of the score parts
+SKILL_WEIGHT = 0.6
+ROLE_WEIGHT = 0.15
+EXPERIENCE_WEIGHT = 0.25
+
+# A requirement line counts as covered at this share of its term weight
+REQUIREMENT_COVERED = 0.5
+
+# Years of experience asked for: "5+ years of experience", "3-5 years' relevant
+# experience", "experience: 4 years". Other durations ("a 2 year contract") don't count.
+_YEARS = re.compile(
+    r"(\d+(?:\.\d+)?)\s*\+?\s*(?:(?:-|to)\s*\d+\s*\+?\s*)?years?'?\s+(?:of\s+)?(?:[a-z-]+\s+){0,3}?experience"
+    r"|experience\s*(?:of|:|-)?\s*(?:at least\s+|minimum\s+)?(\d+(?:\.\d+)?)\s*\+?\s*years?",
+    re.IGNORECASE
+)
+_TITLE_LABEL = re.compile(r"^\s*(?:role|title|position|job title)\s*:\s*", re.IGNORECASE)
+_STOPWORDS = frozenset("""
+    a an and are as at be by for from has have in is it of on or our the to we will with you your
+    years year experience strong good excellent ability able work working knowledge understanding
+    plus etc including such using use eg ie must should preferred required minimum
+""".split())
+
+PRESCORE_DECISIONS = counter(
+    "prescore_decisions_total", "Screenings by pre-scoring decision (skip or llm)", ["decision"]
+)
+PRESCORE_AGREEMENT = counter(
+    "prescore_agreement_total", "Pre-scores compared with the Gemini score, by outcome", ["outcome"]
+)
+PRESCORE_SCORE_DIFF = histogram(
+    "prescore_llm_score_diff", "Absolute difference between pre-score and Gemini score",
+    buckets=(5, 10, 15, 20, 30, 40, 50, 75, 100)
+)
+
+
+def terms(text: str) -> FrozenSet[str]:
+    """
+    Split text into lowercase content terms.
+
+    Skill mentions, including multi-word ones ("Amazon Web Services"),
+    become a single term: the skill's canonical id.
+
+    Args:
+        text: Any text
+
+    Returns:
+        frozenset: Terms without stopwords
+    """
+    return frozenset(term for term, _ in get_taxonomy().segment(text) if term not in _STOPWORDS)
+
+
+@dataclass(frozen=True)
+class JDIndex:
+    """
+    Job description requirements indexed for scoring.
+
+    Attributes:
+        requirements: (requirement line, its terms) pairs
+        weights: IDF weight of every requirement term
+        total_weight: Sum of the weights
+        jd_terms: Terms of the whole job description, with skill ids
+        title_terms: Terms of the job title
+        min_years: Smallest number of years of experience asked for
+    """
+    requirements: Tuple[Tuple[str, FrozenSet[str]], ...]
+    weights: Dict[str, float]
+    total_weight: float
+    jd_terms: FrozenSet[str]
+    title_terms: FrozenSet[str]
+    min_years: Optional[float]
+
+
+@functools.lru_cache(maxsize=JD_PREP_CACHE_SIZE)
+def build_jd_index(jd_text: str) -> JDIndex:
+    """
+    Index a job description's requirements, once per distinct JD.
+
+    Terms are weighted by inverse document frequency over the requirement
+    lines, so a term named in every line ("python" in a Python role)
+    weighs less than a specific one mentioned once.
+
+    Args:
+        jd_text: Job description text
+
+    Returns:
+        JDIndex: Requirement terms, weights, title and minimum years
+    """
+    prepared = prepare_jd(jd_text)
+    text = prepared.budgeted.text
+    lines = list(prepared.requirements) or [line for line in text.splitlines() if line.strip()]
+    requirements = tuple((line, terms(line)) for line in lines)
+    requirements = tuple(item for item in requirements if item[1])
+
+    document_frequency: Dict[str, int] = {}
+    for _, line_terms in requirements:
+        for term in line_terms:
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+    count = len(requirements)
+    weights = {term: math.log(1 + count / df) for term, df in document_frequency.items()}
+
+    title = next((line.strip() for line in text.splitlines() if line.strip()), "")
+    title = "" if title.endswith(":") else _TITLE_LABEL.sub("", title)
+    years = [float(match.group(1) or match.group(2)) for match in _YEARS.finditer(text)]
+    return JDIndex(
+        requirements=requirements,
+        weights=weights,
+        total_weight=sum(weights.values()),
+        jd_terms=terms(text),
+        title_terms=terms(title) if len(title.split()) <= 8 else frozenset(),
+        min_years=min(years) if years else None,
+    )
+
+
+@dataclass(frozen=True)
+class PreScore:
+    """
+    Local score of one resume against one job description.
+
+    Attributes:
+        score: 0-100 combined score
+        skills: Share of requirement weight covered, 0-1
+        role: Best role/title overlap, 0-1, None if the JD has no title
+        experience: Years relative to the minimum, 0-1, None if the JD
+            asks for no years
+        skill_matches: Resume skills named in the JD
+        gaps: Requirement lines the resume barely covers
+    """
+    score: int
+    skills: float
+    role: Optional[float]
+    experience: Optional[float]
+    skill_matches: Tuple[str, ...]
+    gaps: Tuple[str, ...]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Score and its parts for a response body."""
+        return {
+            "score": self.score,
+            "skills": round(self.skills, 3),
+            "role": None if self.role is None else round(self.role, 3),
+            "experience": None if self.experience is None else round(self.experience, 3),
+        }
+
+
+def _as_list(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(item) for item in value if item]
+    return [str(value)] if value else []
+
+
+def prescore(resume_data: Dict[str, Any], jd_text: str) -> PreScore:
+    """
+    Score extracted resume data against a job description locally.
+
+    Args:
+        resume_data: Structured resume data from extraction
+        jd_text: Job description text
+
+    Returns:
+        PreScore: Combined score and its parts
+    """
+    index = build_jd_index(jd_text)
+    skills = _as_list(resume_data.get("skills"))
+    roles = _as_list(resume_data.get("previous_roles"))
+    resume_terms = terms(" ".join(
+        skills + roles + _as_list(resume_data.get("education")) + _as_list(resume_data.get("key_achievements"))
+    )).union(_as_list(resume_data.get(SKILL_IDS_FIELD)))
+
+    if index.total_weight:
+        covered = resume_terms & index.weights.keys()
+        skill_score = sum(index.weights[term] for term in covered) / index.total_weight
+    else:
+        skill_score = 0.0
+    gaps = []
+    for line, line_terms in index.requirements:
+        line_weight = sum(index.weights[term] for term in line_terms)
+        line_covered = sum(index.weights[term] for term in line_terms & resume_terms)
+        if line_covered < REQUIREMENT_COVERED * line_weight:
+            gaps.append(line)
+
+    role_score = None
+    if index.title_terms:
+        role_score = max(
+            (len(index.title_terms & terms(role)) / len(index.title_terms | terms(role)) for role in roles),
+            default=0.0
+        )
+
+    experience_score = None
+    if index.min_years:
+        try:
+            years = float(resume_data.get("experience_years") or 0)
+        except (TypeError, ValueError):
+            years = 0.0
+        experience_score = min(1.0, years / index.min_years)
+
+    parts = [(SKILL_WEIGHT, skill_score), (ROLE_WEIGHT, role_score), (EXPERIENCE_WEIGHT, experience_score)]
+    parts = [(weight, value) for weight, value in parts if value is not None]
+    combined = sum(weight * value for weight, value in parts) / sum(weight for weight, _ in parts)
+    return PreScore(
+        score=round(100 * combined),
+        skills=skill_score,
+        role=role_score,
+        experience=experience_score,
+        skill_matches=tuple(skill for skill in skills if terms(skill) and terms(skill) <= index.jd_terms),
+        gaps=tuple(gaps),
+    )
+
+
+def prescreen(resume_data: Dict[str, Any], jd_text: str) -> Tuple[PreScore, bool]:
+    """
+    Pre-score a resume and decide whether Gemini needs to compare it.
+
+    Args:
+        resume_data: Structured resume data from extraction
+        jd_text: Job description text
+
+    Returns:
+        tuple: (pre-score, True if the candidate is screened out locally)
+    """
+    result = prescore(resume_data, jd_text)
+    skip = result.score < PRESCORE_THRESHOLD
+    PRESCORE_DECISIONS.inc(decision="skip" if skip else "llm")
+    return result, skip
+
+
+def screened_out_analysis(result: PreScore) -> Dict[str, Any]:
+    """
+    Build a match analysis for a candidate screened out locally.
+
+    Args:
+        result: Pre-score below the threshold
+
+    Returns:
+        dict: Match analysis with the same fields Gemini returns
+    """
+    experience = "Not assessed"
+    if result.experience is not None:
+        experience = f"Meets {round(100 * result.experience)}% of the required years of experience"
+    return {
+        "match_score": result.score,
+        "match_summary": (
+            f"Screened out by local pre-scoring: score {result.score} is below the "
+            f"threshold of {PRESCORE_THRESHOLD}, so no AI comparison was run."
+        ),
+        "skill_matches": list(result.skill_matches),
+        "skill_gaps": list(result.gaps[:10]),
+        "experience_match": experience,
+        "education_match": "Not assessed",
+        "overall_recommendation": "no hire - clear mismatch with the job requirements",
+    }
+
+
+def record_agreement(result: PreScore, llm_score: Any) -> None:
+    """
+    Compare a pre-score with the Gemini score for the same candidate.
+
+    Args:
+        result: Local pre-score
+        llm_score: match_score from Gemini
+    """
+    try:
+        diff = abs(result.score - float(llm_score))
+    except (TypeError, ValueError):
+        return
+    PRESCORE_SCORE_DIFF.observe(diff)
+    PRESCORE_AGREEMENT.inc(outcome="agree" if diff <= PRESCORE_AGREEMENT_TOLERANCE else "disagree")
+
+
+def get_stats() -> Dict[str, Any]:
+    """
+    Get pre-scoring statistics for this process.
+
+    Returns:
+        dict: Threshold, decisions, short-circuit rate and agreement with
+            Gemini scores
+    """
+    skipped = PRESCORE_DECISIONS.value(decision="skip")
+    compared = PRESCORE_DECISIONS.value(decision="llm")
+    agreed = PRESCORE_AGREEMENT.value(outcome="agree")
+    checked = agreed + PRESCORE_AGREEMENT.value(outcome="disagree")
+    diffs = PRESCORE_SCORE_DIFF.count()
+    index_info = build_jd_index.cache_info()
+    return {
+        "threshold": PRESCORE_THRESHOLD,
+        "agreement_tolerance": PRESCORE_AGREEMENT_TOLERANCE,
+        "scored": int(skipped + compared),
+        "short_circuited": int(skipped),
+        "short_circuit_rate": round(skipped / (skipped + compared), 4) if skipped + compared else 0.0,
+        "compared_with_llm": int(checked),
+        "agreement_rate": round(agreed / checked, 4) if checked else None,
+        "mean_abs_diff": round(PRESCORE_SCORE_DIFF.total() / diffs, 2) if diffs else None,
+        "jd_index": {"hits": index_info.hits, "misses": index_info.misses, "size": index_info.currsize},
+    }
@@ -0,0 +1,537 @@
+"""
+Resume screening pipeline shared by the single and batch endpoints.
+"""
+import asyncio
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from core.cache import resume_data_cache, resume_cache_key, match_result_cache, match_cache_key, match_single_flight
+from core.candidates import candidate_store, save_candidate
+from core.jd_prep import prepare_jd
+from core.json_repair import JSONRepairError, parse_json_tolerant
+from core.llm_client import (
+    extract_resume_data_async,
+    compare_resume_to_jd_cached,
+    compare_resumes_to_jd_batched,
+    run_llm_call,
+    stream_resume_to_jd_comparison_async,
+)
+from core.llm_extractor import parse_match_reply
+from core.parser import pdf_result_to_text
+from core.pdf_engine import PDFExtractionError, extract_pdf
+from core.prescore import prescreen, record_agreement, screened_out_analysis
+from core.skills import annotate_skills
+from core.timings import STAGE_ERRORS, StageTimings
+
+logger = logging.getLogger(__name__)
+
+# Maximum resumes from one batch being screened at the same time
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "16"))
+
+# Compare batch candidates several per prompt instead of one call each
+BATCH_PACKED_COMPARISON = os.getenv("BATCH_PACKED_COMPARISON", "true").lower() == "true"
+
+# Most candidates a shortlist sends to the comparison
+SHORTLIST_MAX_TOP_K = int(os.getenv("SHORTLIST_MAX_TOP_K", "100"))
+
+
+class ScreeningError(Exception):
+    """
+    A screening step failed.
+
+    Args:
+        stage: Pipeline stage that failed ("validate", "parse", "extract" or "compare")
+        message: Client-facing error message
+        status_code: HTTP status code to report for this failure
+    """
+
+    def __init__(self, stage: str, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.stage = stage
+        self.message = message
+        self.status_code = status_code
+
+
+async def parse_resume_pdf(file_bytes: bytes) -> str:
+    """
+    Validate a PDF resume and extract its normalized text.
+
+    Args:
+        file_bytes: Raw bytes of the PDF file
+
+    Returns:
+        str: Resume text
+
+    Raises:
+        ScreeningError: If the PDF is invalid or parsing fails
+    """
+    try:
+        parse_result = await extract_pdf(file_bytes)
+    except PDFExtractionError as e:
+        logger.error(f"PDF parsing failed in the extraction engine: {str(e)}")
+        raise ScreeningError("parse", f"Failed to extract text from PDF: {str(e)}", 422)
+    if not parse_result.is_valid:
+        raise ScreeningError("validate", "Invalid PDF file or file is corrupted", 400)
+    try:
+        resume_text = pdf_result_to_text(parse_result)
+    except Exception as e:
+        logger.error(f"PDF parsing failed: {str(e)}")
+        raise ScreeningError("parse", f"Failed to extract text from PDF: {str(e)}", 422)
+    logger.info("Successfully extracted text from PDF")
+    return resume_text
+
+
+async def extract_resume(resume_text: str, cache_key: str) -> Dict[str, Any]:
+    """
+    Extract structured data from resume text and cache it.
+
+    Args:
+        resume_text: Resume text from parse_resume_pdf
+        cache_key: Resume data cache key of the PDF
+
+    Returns:
+        dict: Structured resume data
+
+    Raises:
+        ScreeningError: If extraction fails
+    """
+    try:
+        resume_data = await extract_resume_data_async(resume_text)
+        logger.info("Successfully extracted resume data using AI")
+    except Exception as e:
+        logger.error(f"Resume data extraction failed: {str(e)}")
+        raise ScreeningError("extract", f"Failed to extract resume data: {str(e)}")
+
+    resume_data_cache.set(cache_key, resume_data)
+    return resume_data
+
+
+async def get_resume_data(file_bytes: bytes, timings: Optional[StageTimings] = None,
+                          filename: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get structured resume data for a PDF, from cache when possible.
+
+    The data is also saved to the candidate store.
+
+    Args:
+        file_bytes: Raw bytes of the PDF file
+        timings: Records the parse and extract stages if given
+        filename: Uploaded file name, kept with the stored candidate
+
+    Returns:
+        dict: Structured resume data
+
+    Raises:
+        ScreeningError: If validation, parsing or extraction fails
+    """
+    # Reuse structured data if this exact PDF was extracted before
+    cache_key = resume_cache_key(file_bytes)
+    resume_data = resume_data_cache.get(cache_key)
+    if resume_data is not None:
+        logger.info("Using cached resume data")
+        # Re-normalize so cached data follows the current taxonomy
+        resume_data = annotate_skills(resume_data)
+    else:
+        timings = timings or StageTimings()
+
+        # Step 1: Validate and extract text from PDF
+        with timings.stage("parse"):
+            resume_text = await parse_resume_pdf(file_bytes)
+
+        # Step 2: Extract structured data from resume
+        with timings.stage("extract"):
+            resume_data = await extract_resume(resume_text, cache_key)
+
+    await save_candidate(file_bytes, resume_data, filename)
+    return resume_data
+
+
+async def _prepare_jd_timed(jd_text: str, timings: StageTimings) -> None:
+    with timings.stage("jd_prepare"):
+        await asyncio.to_thread(prepare_jd, jd_text)
+
+
+def start_jd_preparation(jd_text: str, timings: StageTimings) -> "asyncio.Task[None]":
+    """
+    Start preparing a job description in the background.
+
+    The prepared JD is memoized, so the comparison step picks it up
+    instead of recomputing it. Await the task before comparing.
+
+    Args:
+        jd_text: Job description text
+        timings: Records the jd_prepare stage
+
+    Returns:
+        asyncio.Task: Task that finishes when the JD is prepared
+    """
+    return asyncio.create_task(_prepare_jd_timed(jd_text, timings))
+
+
+def format_match_result(match_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Shape a match analysis into the screening response format.
+
+    Args:
+        match_analysis: Match analysis from the comparison step
+
+    Returns:
+        dict: Match score, summary and detailed analysis
+    """
+    return {
+        "match_score": match_analysis.get("match_score", 0),
+        "match_summary": match_analysis.get("match_summary", "No summary available"),
+        "detailed_analysis": match_analysis  # Include full analysis for debugging
+    }
+
+
+async def screen_resume_bytes(file_bytes: bytes, jd_text: str, filename: Optional[str] = None,
+                              timings: Optional[StageTimings] = None) -> Dict[str, Any]:
+    """
+    Screen one PDF resume against a job description.
+
+    Args:
+        file_bytes: Raw bytes of the PDF file
+        jd_text: Job description text to match against
+        filename: Uploaded file name, kept with the stored candidate
+        timings: Timings of the request so far, e.g. with its validate stage
+
+    Returns:
+        dict: Match score, summary, detailed analysis, pre-score and
+            stage timings
+
+    Raises:
+        ScreeningError: If any pipeline step fails
+    """
+    # The JD is prepared while the PDF is parsed and the resume extracted
+    timings = timings or StageTimings()
+    jd_task = start_jd_preparation(jd_text, timings)
+    try:
+        resume_data = await get_resume_data(file_bytes, timings, filename)
+    finally:
+        await jd_task
+
+    # Step 3: Score locally; clear mismatches skip the Gemini comparison
+    with timings.stage("prescore"):
+        pre, skipped = prescreen(resume_data, jd_text)
+
+    # Step 4: Compare resume to job description
+    if skipped:
+        logger.info(f"Screened out by pre-scoring with score {pre.score}")
+        match_analysis = screened_out_analysis(pre)
+    else:
+        try:
+            with timings.stage("compare"):
+                # Agreement is only recorded for scores Gemini produced for this request
+                match_analysis = await compare_resume_to_jd_cached(
+                    resume_data, jd_text, lambda analysis: record_agreement(pre, analysis.get("match_score", 0))
+                )
+            logger.info(f"Match analysis completed with score: {match_analysis.get('match_score', 0)}")
+        except Exception as e:
+            logger.error(f"Resume comparison failed: {str(e)}")
+            raise ScreeningError("compare", f"Failed to compare resume to job description: {str(e)}")
+
+    stage_timings = timings.to_dict()
+    logger.info(f"Screening timings: {stage_timings}")
+    return {
+        **format_match_result(match_analysis),
+        "prescore": {**pre.to_dict(), "skipped_llm": skipped},
+        "timings": stage_timings,
+    }
+
+
+async def stream_screening(file_bytes: bytes, jd_text: str,
+                           filename: Optional[str] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Screen one PDF resume, reporting progress as each stage finishes.
+
+    Events, as (name, data) pairs:
+        "stage": a stage finished; data has "stage", "elapsed_ms" and
+            "cached", plus "score" and "skipped_llm" for "prescore"
+        "resume_data": structured resume data, sent before comparison
+        "match_delta": a chunk of the comparison reply; data has "text"
+            and "partial", the analysis parsed so far or None
+        "result": the final match result with stage timings, as from
+            screen_resume_bytes
+        "error": a stage failed; data has "stage" ("unknown" for an
+            unexpected error), "error" and "status_code". No events follow.
+
+    The comparison shares the single-flight of compare_resume_to_jd_cached:
+    a request that finds an identical comparison already in flight waits
+    for its result and gets no "match_delta" events.
+
+    Args:
+        file_bytes: Raw bytes of the PDF file
+        jd_text: Job description text to match against
+        filename: Uploaded file name, kept with the stored candidate
+
+    Yields:
+        tuple: Event name and data
+    """
+    timings = StageTimings()
+    jd_task = start_jd_preparation(jd_text, timings)
+
+    def stage_event(stage: str, cached: bool = False) -> Tuple[str, Dict[str, Any]]:
+        elapsed_ms = timings.stages[stage][1] if stage in timings.stages else timings.elapsed_ms()
+        return "stage", {"stage": stage, "elapsed_ms": round(elapsed_ms, 1), "cached": cached}
+
+    try:
+        cache_key = resume_cache_key(file_bytes)
+        resume_data = resume_data_cache.get(cache_key)
+        if resume_data is not None:
+            resume_data = annotate_skills(resume_data)
+            yield stage_event("extract", cached=True)
+        else:
+            with timings.stage("parse"):
+                resume_text = await parse_resume_pdf(file_bytes)
+            yield stage_event("parse")
+            with timings.stage("extract"):
+                resume_data = await extract_resume(resume_text, cache_key)
+            yield stage_event("extract")
+        await save_candidate(file_bytes, resume_data, filename)
+        yield "resume_data", {"resume_data": resume_data}
+        await jd_task
+
+        with timings.stage("prescore"):
+            pre, skipped = prescreen(resume_data, jd_text)
+        yield "stage", {**stage_event("prescore")[1], "score": pre.score, "skipped_llm": skipped}
+
+        key = match_cache_key(resume_data, jd_text)
+        match_analysis = screened_out_analysis(pre) if skipped else match_result_cache.get(key)
+        compare_cached = match_analysis is not None
+        if not compare_cached:
+            deltas: "asyncio.Queue[str]" = asyncio.Queue()
+
+            async def compare() -> Dict[str, Any]:
+                reply = ""
+                async for text in stream_resume_to_jd_comparison_async(resume_data, jd_text):
+                    reply += text
+                    deltas.put_nowait(text)
+                # Parsing may need a repair request, so it runs on the LLM pool
+                analysis = await run_llm_call(parse_match_reply, reply)
+                match_result_cache.set(key, analysis)
+                record_agreement(pre, analysis.get("match_score", 0))
+                return analysis
+
+            try:
+                with timings.stage("compare"):
+                    shared = asyncio.ensure_future(match_single_flight.do(key, compare))
+                    reply = ""
+                    # Relay chunks until the call is done and every chunk was sent
+                    while True:
+                        if deltas.empty():
+                            if shared.done():
+                                break
+                            next_delta = asyncio.ensure_future(deltas.get())
+                            await asyncio.wait({next_delta, shared}, return_when=asyncio.FIRST_COMPLETED)
+                            if not next_delta.done():
+                                next_delta.cancel()
+                                continue
+                            text = next_delta.result()
+                        else:
+                            text = deltas.get_nowait()
+                        reply += text
+                        try:
+                            partial, _ = parse_json_tolerant(reply, "{")
+                        except JSONRepairError:
+                            partial = None
+                        yield "match_delta", {"text": text, "partial": partial}
+                    match_analysis = await shared
+            except Exception as e:
+                logger.error(f"Resume comparison failed: {str(e)}")
+                raise ScreeningError("compare", f"Failed to compare resume to job description: {str(e)}")
+            logger.info(f"Match analysis completed with score: {match_analysis.get('match_score', 0)}")
+        if not skipped:
+            yield stage_event("compare", cached=compare_cached)
+        yield "result", {
+            **format_match_result(match_analysis),
+            "prescore": {**pre.to_dict(), "skipped_llm": skipped},
+            "timings": timings.to_dict(),
+        }
+    except ScreeningError as e:
+        yield "error", {"stage": e.stage, "error": e.message, "status_code": e.status_code}
+    except Exception as e:
+        logger.error(f"Unexpected error in streamed screening: {str(e)}")
+        yield "error", {"stage": "unknown", "error": f"Internal server error: {str(e)}", "status_code": 500}
+    finally:
+        await jd_task
+
+
+async def compare_extracted(resumes: List[Tuple[str, Dict[str, Any]]], jd_text: str) -> List[Any]:
+    """
+    Compare extracted resumes with one job description, several per prompt.
+
+    Candidates the local pre-scorer screens out are not sent to Gemini.
+
+    Args:
+        resumes: (name for logs, structured resume data) pairs
+        jd_text: Job description text to match against
+
+    Returns:
+        list: For each resume in order, its match result with pre-score,
+            or the ScreeningError that failed its comparison
+    """
+    results: List[Any] = [None] * len(resumes)
+    ready = []
+    for i, (_, resume_data) in enumerate(resumes):
+        pre, skipped = prescreen(resume_data, jd_text)
+        if skipped:
+            results[i] = {
+                **format_match_result(screened_out_analysis(pre)),
+                "prescore": {**pre.to_dict(), "skipped_llm": True},
+            }
+        else:
+            ready.append((i, pre))
+    analyses = await compare_resumes_to_jd_batched(
+        [resumes[i][1] for i, _ in ready], jd_text,
+        lambda index, analysis: record_agreement(ready[index][1], analysis.get("match_score", 0))
+    )
+    for (i, pre), analysis in zip(ready, analyses):
+        if isinstance(analysis, Exception):
+            logger.error(f"Resume comparison failed for {resumes[i][0]}: {str(analysis)}")
+            # Packed comparisons run outside a timed stage, so count the failure here
+            STAGE_ERRORS.inc(stage="compare")
+            results[i] = ScreeningError("compare", f"Failed to compare resume to job description: {str(analysis)}")
+        else:
+            results[i] = {**format_match_result(analysis), "prescore": {**pre.to_dict(), "skipped_llm": False}}
+    return results
+
+
+def rank_outcomes(outcomes: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split screening outcomes into ranked results and errors.
+
+    Args:
+        outcomes: Match results and error outcomes (with an "error" field)
+
+    Returns:
+        tuple: (results sorted by match_score with a "rank" field, errors)
+    """
+    results = [outcome for outcome in outcomes if "error" not in outcome]
+    errors = [outcome for outcome in outcomes if "error" in outcome]
+    results.sort(key=lambda result: result["match_score"], reverse=True)
+    for rank, result in enumerate(results, start=1):
+        result["rank"] = rank
+    return results, errors
+
+
+async def screen_batch(files: List[Tuple[str, bytes]], jd_text: str) -> Dict[str, Any]:
+    """
+    Screen many PDF resumes against one job description.
+
+    PDFs are parsed by the extraction engine and at most BATCH_CONCURRENCY
+    resumes are in the pipeline at once. With BATCH_PACKED_COMPARISON,
+    all resumes are extracted first and then compared several per prompt.
+    Candidates the local pre-scorer screens out are not sent to Gemini.
+    A failing file is reported in "errors" and does not affect the rest
+    of the batch.
+
+    Args:
+        files: (filename, PDF bytes) pairs
+        jd_text: Job description text to match against
+
+    Returns:
+        dict: Counts, results ranked by match_score and per-file errors;
+            short_circuited counts results that skipped Gemini
+    """
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    def error_outcome(filename: str, e: Exception) -> Dict[str, Any]:
+        if isinstance(e, ScreeningError):
+            return {"filename": filename, "stage": e.stage, "error": e.message}
+        logger.error(f"Unexpected error screening {filename}: {str(e)}")
+        return {"filename": filename, "stage": "unknown", "error": str(e)}
+
+    async def screen_one(filename: str, file_bytes: bytes) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                result = await screen_resume_bytes(file_bytes, jd_text, filename)
+                return {"filename": filename, **result}
+            except Exception as e:
+                return error_outcome(filename, e)
+
+    async def extract_one(filename: str, file_bytes: bytes) -> Any:
+        async with semaphore:
+            try:
+                return await get_resume_data(file_bytes, filename=filename)
+            except Exception as e:
+                return e
+
+    if BATCH_PACKED_COMPARISON:
+        extracted = await asyncio.gather(*(extract_one(name, data) for name, data in files))
+        outcomes: List[Dict[str, Any]] = [
+            error_outcome(files[i][0], result) if isinstance(result, Exception) else {}
+            for i, result in enumerate(extracted)
+        ]
+        ready = [i for i, result in enumerate(extracted) if not isinstance(result, Exception)]
+        compared = await compare_extracted([(files[i][0], extracted[i]) for i in ready], jd_text)
+        for i, result in zip(ready, compared):
+            filename = files[i][0]
+            if isinstance(result, Exception):
+                outcomes[i] = error_outcome(filename, result)
+            else:
+                outcomes[i] = {"filename": filename, **result}
+    else:
+        outcomes = await asyncio.gather(*(screen_one(name, data) for name, data in files))
+
+    results, errors = rank_outcomes(outcomes)
+    return {
+        "total": len(files),
+        "succeeded": len(results),
+        "failed": len(errors),
+        "short_circuited": sum(1 for result in results if result.get("prescore", {}).get("skipped_llm")),
+        "results": results,
+        "errors": errors,
+    }
+
+
+async def screen_shortlist(jd_text: str, top_k: int, compare: bool = True) -> Dict[str, Any]:
+    """
+    Shortlist stored candidates for a job description.
+
+    The top_k candidates most similar to the JD by embedding are
+    retrieved from the whole candidate store; only those go through
+    pre-scoring and the Gemini comparison.
+
+    Args:
+        jd_text: Job description text to match against
+        top_k: Number of candidates to retrieve
+        compare: Compare the retrieved candidates, or only retrieve them
+
+    Returns:
+        dict: Candidates searched, retrieval time, and the shortlist,
+            ranked by match_score when compared and by similarity
+            otherwise, plus per-candidate comparison errors
+    """
+    # NumPy is only loaded once retrieval is used
+    from core.embeddings import candidate_vectors
+
+    retrieval = await asyncio.to_thread(candidate_vectors.search, jd_text, top_k)
+    candidates = await asyncio.to_thread(candidate_store.get_many, [seq for seq, _ in retrieval["matches"]])
+    shortlist = []
+    for seq, score in retrieval["matches"]:
+        # The index may hold candidates the store no longer has, e.g. a vector
+        # file kept while the candidate database was replaced
+        candidate = candidates.get(seq)
+        if candidate is not None:
+            shortlist.append((candidate.pop("resume_data"), {**candidate, "similarity": round(score, 4)}))
+
+    if compare:
+        compared = await compare_extracted([(summary["id"], data) for data, summary in shortlist], jd_text)
+        outcomes = []
+        for (_, summary), result in zip(shortlist, compared):
+            if isinstance(result, ScreeningError):
+                outcomes.append({**summary, "stage": result.stage, "error": result.message})
+            else:
+                outcomes.append({**summary, **result})
+        results, errors = rank_outcomes(outcomes)
+    else:
+        results, errors = [summary for _, summary in shortlist], []
+    return {
+        "searched": retrieval["searched"],
+        "retrieved": len(shortlist),
+        "retrieval_ms": retrieval["took_ms"],
+        "results": results,
+        "errors": errors,
+    }
@@ -0,0 +1,342 @@
+"""
+Skill taxonomy and normalization.
+
+Gemini returns skills as free text ("ReactJS", "React.js", "react"). The
+taxonomy maps every known spelling to a canonical skill id with a
+category, so skills can be matched, deduplicated and counted locally.
+
+The taxonomy file is compiled once into two indexes:
+
+    aliases  hash map from a normalized spelling to a skill id, for skills
+             that are exactly a known name or alias
+    trie     token trie over every name and alias, for longer strings
+             that mention one or more skills ("React, Redux and Node")
+
+Short or ambiguous spellings ("Go", "R", "C", "TS") only match a skill
+exactly, so "Go-to-market", "R&D" or "Vitamin C" don't mention one. A
+mention found in a longer string must also stand on its own: one joined
+by "-", "&" or "/" to a word that is not a skill ("Objective-C",
+"TS/SCI") is part of that word, while "Python/Django" names two skills.
+"""
+import functools
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.metrics import counter
+
+# JSON taxonomy of skills, aliases and categories
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "skill_taxonomy.json"
+)
+
+# Field of resume_data holding the canonical skill ids
+SKILL_IDS_FIELD = "skill_ids"
+
+_TOKEN = re.compile(r"\.?[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+_SEPARATORS = re.compile(r"[\s_\-/]+")
+_JOINERS = "-&/"
+_END = "$"
+
+# Spellings that are common words or letters; they only match exactly
+EXACT_ONLY_SPELLINGS = frozenset({"go", "r", "c", "ts", "js", "py"})
+
+SKILL_NORMALIZATIONS = counter(
+    "skill_normalizations_total", "Extracted skills by how they were normalized (alias, scan or unmatched)", ["outcome"]
+)
+
+
+def normalize_key(text: str) -> str:
+    """
+    Reduce a skill spelling to its lookup key.
+
+    Case, spaces, hyphens, slashes and inner dots are ignored, so
+    "React.js", "react js" and "ReactJS" share the key "reactjs". A
+    leading dot is kept (".NET").
+
+    Args:
+        text: Skill spelling
+
+    Returns:
+        str: Lookup key
+    """
+    key = _SEPARATORS.sub("", text.strip().lower())
+    return key[:1] + key[1:].replace(".", "") if key.startswith(".") else key.replace(".", "")
+
+
+def _tokens(text: str) -> List[str]:
+    return [normalize_key(token) for token in _TOKEN.findall(text.lower())]
+
+
+def is_exact_only(key: str) -> bool:
+    """
+    Check whether a spelling is too short or ambiguous to scan text for.
+
+    Args:
+        key: Lookup key from normalize_key
+
+    Returns:
+        bool: True for keys of at most two letters and EXACT_ONLY_SPELLINGS
+    """
+    return (len(key) <= 2 and key.isalpha()) or key in EXACT_ONLY_SPELLINGS
+
+
+class SkillTaxonomy:
+    """
+    Compiled skill taxonomy.
+
+    Args:
+        data: Parsed taxonomy with "version", "categories" ({id: {"name",
+            "parent"}}) and "skills" ({id: {"name", "category",
+            "aliases"}})
+
+    Raises:
+        ValueError: If a skill or category refers to an unknown category
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.version = str(data.get("version", ""))
+        self.categories: Dict[str, Dict[str, Any]] = data.get("categories", {})
+        self.skills: Dict[str, Dict[str, Any]] = data.get("skills", {})
+        self._aliases: Dict[str, str] = {}
+        self._trie: Dict[str, Any] = {}
+
+        for category_id, category in self.categories.items():
+            parent = category.get("parent")
+            if parent is not None and parent not in self.categories:
+                raise ValueError(f"Category {category_id} has unknown parent {parent}")
+        for skill_id, skill in self.skills.items():
+            if skill.get("category") not in self.categories:
+                raise ValueError(f"Skill {skill_id} has unknown category {skill.get('category')}")
+            for spelling in [skill["name"], skill_id, *skill.get("aliases", [])]:
+                # The first skill to claim a spelling keeps it
+                key = normalize_key(spelling)
+                self._aliases.setdefault(key, skill_id)
+                if is_exact_only(key):
+                    continue
+                node = self._trie
+                for token in _tokens(spelling):
+                    node = node.setdefault(token, {})
+                if node is not self._trie:
+                    node.setdefault(_END, skill_id)
+
+    @classmethod
+    def load(cls, path: str) -> "SkillTaxonomy":
+        """
+        Load and compile a taxonomy file.
+
+        Args:
+            path: JSON taxonomy file
+
+        Returns:
+            SkillTaxonomy: Compiled taxonomy
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def lookup(self, text: str) -> Optional[str]:
+        """
+        Find the skill a string names exactly.
+
+        Args:
+            text: Skill name or alias
+
+        Returns:
+            str: Skill id, or None if the string is not a known spelling
+        """
+        return self._aliases.get(normalize_key(text))
+
+    def segment(self, text: str) -> List[Tuple[str, bool]]:
+        """
+        Split text into tokens, replacing each skill mention by its id.
+
+        The longest known name wins at each position, so "React Native"
+        is one skill, not React followed by an unknown word. A mention
+        joined by "-", "&" or "/" to a word that is not a skill is left
+        as plain words.
+
+        Args:
+            text: Free text
+
+        Returns:
+            list: (skill id, True) for skill mentions and (token key,
+                False) for other words, in text order
+        """
+        text = text.lower()
+        spans = [(normalize_key(m.group()), m.start(), m.end()) for m in _TOKEN.finditer(text)]
+        # (skill id or None, first token, end token) for each mention or word
+        matches: List[Tuple[Optional[str], int, int]] = []
+        position = 0
+        while position < len(spans):
+            node = self._trie
+            match, match_end = None, position + 1
+            for index in range(position, len(spans)):
+                node = node.get(spans[index][0])
+                if node is None:
+                    break
+                if _END in node:
+                    match, match_end = node[_END], index + 1
+            matches.append((match, position, match_end))
+            position = match_end
+
+        def joined_to_word(neighbour: int, gap_start: int, gap_end: int) -> bool:
+            # A single joiner between a mention and a non-skill word makes them one compound
+            return (0 <= neighbour < len(matches) and matches[neighbour][0] is None
+                    and gap_end - gap_start == 1 and text[gap_start] in _JOINERS)
+
+        segments: List[Tuple[str, bool]] = []
+        for i, (match, first, end) in enumerate(matches):
+            if match is not None and not (
+                (i > 0 and joined_to_word(i - 1, spans[first - 1][2], spans[first][1]))
+                or (end < len(spans) and joined_to_word(i + 1, spans[end - 1][2], spans[end][1]))
+            ):
+                segments.append((match, True))
+            else:
+                segments.extend((spans[index][0], False) for index in range(first, end))
+        return segments
+
+    def scan(self, text: str) -> List[str]:
+        """
+        Find every skill mentioned in a longer string.
+
+        Args:
+            text: Free text
+
+        Returns:
+            list: Skill ids in order of first mention, without duplicates
+        """
+        found: List[str] = []
+        for skill_id, is_skill in self.segment(text):
+            if is_skill and skill_id not in found:
+                found.append(skill_id)
+        return found
+
+    def normalize(self, skills: List[Any]) -> Tuple[List[str], List[str]]:
+        """
+        Map free-text skills to canonical skill ids.
+
+        Args:
+            skills: Skills as extracted from a resume
+
+        Returns:
+            tuple: (skill ids without duplicates, skills that matched
+                nothing in the taxonomy)
+        """
+        skill_ids: List[str] = []
+        unmatched: List[str] = []
+        for skill in skills:
+            text = str(skill)
+            exact = self.lookup(text)
+            if exact is not None:
+                SKILL_NORMALIZATIONS.inc(outcome="alias")
+                found = [exact]
+            else:
+                found = self.scan(text)
+                SKILL_NORMALIZATIONS.inc(outcome="scan" if found else "unmatched")
+                if not found:
+                    unmatched.append(text)
+            skill_ids.extend(skill_id for skill_id in found if skill_id not in skill_ids)
+        return skill_ids, unmatched
+
+    def category_path(self, skill_id: str) -> List[str]:
+        """
+        List a skill's category and its parent categories.
+
+        Args:
+            skill_id: Canonical skill id
+
+        Returns:
+            list: Category ids from the most specific to the root
+        """
+        path: List[str] = []
+        category_id = self.skills.get(skill_id, {}).get("category")
+        while category_id is not None and category_id not in path:
+            path.append(category_id)
+            category_id = self.categories[category_id].get("parent")
+        return path
+
+    def describe(self, skill_id: str) -> Dict[str, Any]:
+        """
+        Get a skill's display name and categories.
+
+        Args:
+            skill_id: Canonical skill id
+
+        Returns:
+            dict: Id, name and category path
+        """
+        return {
+            "id": skill_id,
+            "name": self.skills[skill_id]["name"],
+            "categories": self.category_path(skill_id),
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the size of the taxonomy.
+
+        Returns:
+            dict: Version and number of skills, spellings and categories
+        """
+        return {
+            "version": self.version,
+            "skills": len(self.skills),
+            "spellings": len(self._aliases),
+            "categories": len(self.categories),
+        }
+
+
+@functools.lru_cache(maxsize=1)
+def get_taxonomy() -> SkillTaxonomy:
+    """
+    Get the process-wide taxonomy, loading it on first use.
+
+    Returns:
+        SkillTaxonomy: Taxonomy from SKILL_TAXONOMY_PATH
+    """
+    return SkillTaxonomy.load(SKILL_TAXONOMY_PATH)
+
+
+def annotate_skills(resume_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Attach canonical skill ids to structured resume data.
+
+    Args:
+        resume_data: Structured resume data from extraction
+
+    Returns:
+        dict: Copy of resume_data with SKILL_IDS_FIELD set
+    """
+    skills = resume_data.get("skills") or []
+    skill_ids, _ = get_taxonomy().normalize(skills if isinstance(skills, list) else [skills])
+    return {**resume_data, SKILL_IDS_FIELD: skill_ids}
+
+
+def without_skill_ids(resume_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drop the canonical skill ids, e.g. before writing resume data into a prompt.
+
+    Args:
+        resume_data: Structured resume data
+
+    Returns:
+        dict: resume_data without SKILL_IDS_FIELD
+    """
+    return {field: value for field, value in resume_data.items() if field != SKILL_IDS_FIELD}
+
+
+def get_stats() -> Dict[str, Any]:
+    """
+    Get taxonomy size and normalization counters.
+
+    Returns:
+        dict: Taxonomy stats and normalized skills by outcome
+    """
+    return {
+        **get_taxonomy().get_stats(),
+        "normalized": {
+            outcome: int(SKILL_NORMALIZATIONS.value(outcome=outcome))
+            for outcome in ("alias", "scan", "unmatched")
+        },
+    }
@@ -0,0 +1,207 @@
+"""
+Clean-up of extracted PDF text before it is sent to Gemini.
+
+pypdf output contains page headers and footers repeated on every page,
+words hyphenated across line breaks and long whitespace runs. Removing
+them shortens the extraction prompt without losing resume content.
+Hyphenated compounds such as "self-motivated" and paragraph breaks are
+kept.
+"""
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List
+
+from core.tokens import estimate_tokens
+
+# Lines at the top and bottom of each page checked for repeated headers/footers
+EDGE_LINES = 2
+# Share of pages a line must repeat on to count as a header/footer
+REPEAT_RATIO = 0.6
+
+_HYPHEN_BREAK = re.compile(r"(\w*[a-z])-\n[ \t]*([a-z]\w*)")
+_WORD = re.compile(r"[a-z]{2,}")
+_SPACE_RUN = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_DIGITS = re.compile(r"\d+")
+
+# Second halves of compounds common in resumes, kept hyphenated at a line break
+# even when the word appears nowhere else in the document
+COMPOUND_WORDS = frozenset({
+    "based", "driven", "oriented", "motivated", "focused", "facing", "level", "time", "end", "stack",
+    "source", "scale", "term", "class", "house", "solving", "making", "world", "date", "edge", "free",
+    "specific", "friendly", "sensitive", "critical", "native", "first", "service", "depth", "team",
+    "hand", "line", "site", "learning", "written", "rounded", "paced", "starter", "store", "commerce",
+})
+
+_lock = threading.Lock()
+_totals = {
+    "documents": 0,
+    "chars_in": 0,
+    "chars_out": 0,
+    "tokens_in": 0,
+    "tokens_out": 0,
+}
+
+
+@dataclass
+class NormalizedText:
+    """
+    Normalized document text and what normalization saved.
+
+    Attributes:
+        text: Normalized text
+        chars_before: Length of the raw joined page text
+        chars_after: Length of the normalized text
+        tokens_before: Estimated tokens of the raw text
+        tokens_after: Estimated tokens of the normalized text
+        repeated_lines_removed: Header/footer lines dropped
+    """
+    text: str
+    chars_before: int
+    chars_after: int
+    tokens_before: int
+    tokens_after: int
+    repeated_lines_removed: int
+
+    @property
+    def chars_saved(self) -> int:
+        return self.chars_before - self.chars_after
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def _line_signature(line: str) -> str:
+    # Page numbers differ from page to page, so compare lines with digits masked
+    return _DIGITS.sub("#", " ".join(line.lower().split()))
+
+
+def _edge_indexes(lines: List[str]) -> List[int]:
+    # First and last EDGE_LINES non-blank lines of a page
+    content = [index for index, line in enumerate(lines) if line]
+    return content[:EDGE_LINES] + content[-EDGE_LINES:]
+
+
+def _remove_repeated_edges(pages: List[List[str]]) -> int:
+    """Drop header/footer lines repeated across pages, keeping the first occurrence."""
+    if len(pages) < 2:
+        return 0
+
+    counts: Dict[str, int] = {}
+    for lines in pages:
+        edge = {_line_signature(lines[index]) for index in _edge_indexes(lines)}
+        for signature in edge:
+            if signature:
+                counts[signature] = counts.get(signature, 0) + 1
+
+    threshold = max(2, int(len(pages) * REPEAT_RATIO + 0.5))
+    repeated = {signature for signature, count in counts.items() if count >= threshold}
+    if not repeated:
+        return 0
+
+    removed = 0
+    seen = set()
+    for page_index, lines in enumerate(pages):
+        edge_indexes = set(_edge_indexes(lines))
+        keep = []
+        for index, line in enumerate(lines):
+            signature = _line_signature(line)
+            if index in edge_indexes and signature in repeated:
+                if signature in seen:
+                    removed += 1
+                    continue
+                seen.add(signature)
+            keep.append(line)
+        pages[page_index] = keep
+    return removed
+
+
+def _page_lines(text: str) -> List[str]:
+    # Stripped lines of a page, with runs of blank lines collapsed to one
+    lines: List[str] = []
+    for line in _SPACE_RUN.sub(" ", text).splitlines():
+        line = line.strip()
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return lines
+
+
+def _rejoin_hyphenated(text: str) -> str:
+    """
+    Rejoin words split by a hyphen at a line end.
+
+    A hyphen is kept when the continuation is a word of its own, found
+    elsewhere in the document or in COMPOUND_WORDS, unless the joined
+    word itself appears in the document.
+    """
+    # Words of the document, not counting the halves of split words
+    vocabulary = set(_WORD.findall(_HYPHEN_BREAK.sub(" ", text).lower()))
+
+    def rejoin(match: "re.Match[str]") -> str:
+        head, tail = match.group(1), match.group(2)
+        joined = (head + tail).lower()
+        continuation = tail.lower()
+        if joined not in vocabulary and (continuation in vocabulary or continuation in COMPOUND_WORDS):
+            return f"{head}-{tail}"
+        return head + tail
+
+    return _HYPHEN_BREAK.sub(rejoin, text)
+
+
+def normalize_page_texts(page_texts: List[str]) -> NormalizedText:
+    """
+    Join page texts and normalize them for the LLM prompt.
+
+    Removes headers and footers repeated across pages, rejoins words
+    hyphenated at line ends (keeping the hyphen of compounds), collapses
+    whitespace runs and limits blank lines to one. Pages are assembled
+    with a single join.
+
+    Args:
+        page_texts: Extracted text of each page
+
+    Returns:
+        NormalizedText: Normalized text with before/after sizes
+    """
+    raw_text = "\n".join(text for text in page_texts if text).strip()
+
+    pages = [_page_lines(text) for text in page_texts if text]
+    removed = _remove_repeated_edges(pages)
+
+    text = "\n\n".join(page for page in ("\n".join(lines).strip() for lines in pages) if page)
+    text = _rejoin_hyphenated(text)
+    text = _BLANK_LINES.sub("\n\n", text).strip()
+
+    result = NormalizedText(
+        text=text,
+        chars_before=len(raw_text),
+        chars_after=len(text),
+        tokens_before=estimate_tokens(raw_text),
+        tokens_after=estimate_tokens(text),
+        repeated_lines_removed=removed
+    )
+
+    with _lock:
+        _totals["documents"] += 1
+        _totals["chars_in"] += result.chars_before
+        _totals["chars_out"] += result.chars_after
+        _totals["tokens_in"] += result.tokens_before
+        _totals["tokens_out"] += result.tokens_after
+
+    return result
+
+
+def get_stats() -> Dict[str, int]:
+    """
+    Get cumulative normalization savings.
+
+    Returns:
+        dict: Documents normalized and characters/tokens before and after
+    """
+    with _lock:
+        stats = dict(_totals)
+    stats["chars_saved"] = stats["chars_in"] - stats["chars_out"]
+    stats["tokens_saved"] = stats["tokens_in"] - stats["tokens_out"]
+    return stats
@@ -0,0 +1,180 @@
+"""
+Per-request stage timing.
+
+Pipeline stages may overlap, so each stage is recorded as an interval
+from the start of the request. The critical path is the chain of stages
+that determined the total latency.
+
+Every stage also feeds the pipeline_stage_seconds histogram and, when it
+raises, pipeline_stage_errors_total. RequestMetricsMiddleware starts the
+timings of each HTTP request, counts requests in flight and their
+latency per route, and reports the stages finished before the response
+headers in a Server-Timing header.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from starlette.routing import BaseRoute, Match
+
+from core.metrics import counter, gauge, histogram
+
+STAGE_SECONDS = histogram("pipeline_stage_seconds", "Duration of screening pipeline stages", ["stage"])
+STAGE_ERRORS = counter("pipeline_stage_errors_total", "Screening pipeline stages that failed", ["stage"])
+HTTP_REQUESTS_IN_FLIGHT = gauge("http_requests_in_flight", "HTTP requests being handled", ["route"])
+HTTP_REQUEST_SECONDS = histogram(
+    "http_request_seconds", "HTTP request latency until the response is complete", ["method", "route", "status"]
+)
+
+
+class StageTimings:
+    """
+    Start and end offsets of the stages of one request, in milliseconds.
+    """
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self.stages: Dict[str, Tuple[float, float]] = {}
+
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the request started."""
+        return (time.perf_counter() - self._started) * 1000
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as stage name; works around awaits too."""
+        start = self.elapsed_ms()
+        try:
+            yield
+        except Exception as e:
+            # A ScreeningError knows its stage better, e.g. "validate" raised while parsing
+            STAGE_ERRORS.inc(stage=getattr(e, "stage", name))
+            raise
+        finally:
+            end = self.elapsed_ms()
+            self.stages[name] = (start, end)
+            STAGE_SECONDS.observe((end - start) / 1000, stage=name)
+
+    def critical_path(self) -> List[str]:
+        """
+        Find the chain of stages that determined the total latency.
+
+        Starting from the stage that ended last, repeatedly step back to
+        the stage that ended latest before the current one started.
+
+        Returns:
+            list: Stage names in execution order
+        """
+        if not self.stages:
+            return []
+        name = max(self.stages, key=lambda stage: self.stages[stage][1])
+        path = [name]
+        while True:
+            start = self.stages[name][0]
+            before = [
+                stage for stage, (_, end) in self.stages.items()
+                if stage not in path and end <= start
+            ]
+            if not before:
+                break
+            name = max(before, key=lambda stage: self.stages[stage][1])
+            path.append(name)
+        return list(reversed(path))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the timings for a response or log line.
+
+        Returns:
+            dict: Per-stage start/end/duration in ms, the total and the
+                critical path
+        """
+        return {
+            "stages": {
+                name: {"start_ms": round(start, 1), "end_ms": round(end, 1), "ms": round(end - start, 1)}
+                for name, (start, end) in sorted(self.stages.items(), key=lambda item: item[1][0])
+            },
+            "total_ms": round(self.elapsed_ms(), 1),
+            "critical_path": self.critical_path(),
+        }
+
+    def server_timing(self) -> str:
+        """
+        Render the finished stages as a Server-Timing header value.
+
+        Returns:
+            str: "stage;dur=ms" entries in start order, then the total so far
+        """
+        entries = [
+            f"{name};dur={end - start:.1f}"
+            for name, (start, end) in sorted(self.stages.items(), key=lambda item: item[1][0])
+        ]
+        entries.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(entries)
+
+
+_request_timings: ContextVar[Optional[StageTimings]] = ContextVar("request_timings", default=None)
+
+
+def request_timings() -> StageTimings:
+    """
+    Get the stage timings of the current HTTP request.
+
+    Returns:
+        StageTimings: Timings started by RequestMetricsMiddleware, or new
+            timings outside a request
+    """
+    return _request_timings.get() or StageTimings()
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording request metrics and the Server-Timing header.
+
+    Requests are labelled with the path template of the route they match
+    (e.g. "/jobs/{job_id}"), or "other", so ids do not create new series.
+
+    Args:
+        app: ASGI application to wrap
+        routes: Routes of the application, matched to label requests
+    """
+
+    def __init__(self, app, routes: Sequence[BaseRoute] = ()):
+        self.app = app
+        self.routes = routes
+
+    def _route(self, scope) -> str:
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", "other")
+        return "other"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route(scope)
+        timings = StageTimings()
+        token = _request_timings.set(timings)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc(route=route)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(route=route)
+            HTTP_REQUEST_SECONDS.observe(timings.elapsed_ms() / 1000, method=scope["method"], route=route,
+                                         status=str(status))
+            _request_timings.reset(token)
@@ -0,0 +1,211 @@
+"""
+Token estimation and budgeting for Gemini prompts.
+
+Long resumes and pasted job descriptions are split into sections, ranked
+by how much they matter for screening, and trimmed to a token budget so a
+30-page CV or a JD full of boilerplate does not produce a huge prompt.
+"""
+import os
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
+
+# Average characters per token for English text with Gemini's tokenizer
+CHARS_PER_TOKEN = 4
+
+# Token budgets for the variable parts of the prompts
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "6000"))
+JD_TOKEN_BUDGET = int(os.getenv("JD_TOKEN_BUDGET", "2000"))
+
+# Section headings and how much they matter, highest first
+RESUME_SECTION_PRIORITY = [
+    (("skill", "technical", "technologies", "competenc", "expertise"), 10),
+    (("experience", "employment", "work history", "career", "professional"), 9),
+    (("summary", "profile", "objective", "about"), 8),
+    (("education", "degree", "academic", "qualification"), 8),
+    (("certif", "licens", "training", "course"), 6),
+    (("project", "achievement", "accomplishment", "award"), 6),
+    (("publication", "research", "patent"), 4),
+    (("language",), 4),
+    (("volunteer", "leadership", "activities", "affiliation", "membership"), 3),
+    (("interest", "hobb", "reference", "personal", "additional information"), 1),
+]
+
+JD_SECTION_PRIORITY = [
+    (("requirement", "qualification", "must have", "required", "skills", "what you bring", "you have"), 10),
+    (("responsibilit", "what you will do", "what you'll do", "duties", "role", "the job"), 8),
+    (("preferred", "nice to have", "bonus", "plus"), 6),
+    (("experience", "education"), 8),
+    (("about the team", "team"), 3),
+    (("about us", "about the company", "who we are", "company", "culture", "mission"), 1),
+    (("benefit", "perks", "we offer", "compensation", "salary", "equal opportunity", "eeo", "how to apply", "apply"), 0),
+]
+
+# Priority for text before the first heading and sections with unknown headings
+DEFAULT_SECTION_PRIORITY = 5
+
+_HEADING_MAX_WORDS = 6
+_HEADING_RE = re.compile(r"^[A-Za-z][A-Za-z &/,'()-]*:?$")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate how many tokens a piece of text will use.
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        int: Approximate token count
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass
+class BudgetResult:
+    """
+    Text trimmed to a token budget.
+
+    Attributes:
+        text: Text that fits the budget
+        tokens_before: Estimated tokens of the original text
+        tokens_after: Estimated tokens of the returned text
+        sections_dropped: Headings of the sections that were removed
+        truncated: True if any text was removed
+    """
+    text: str
+    tokens_before: int
+    tokens_after: int
+    sections_dropped: List[str]
+    truncated: bool
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped or len(stripped.split()) > _HEADING_MAX_WORDS:
+        return False
+    if not _HEADING_RE.match(stripped):
+        return False
+    return stripped.isupper() or stripped.endswith(":")
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """
+    Split text into sections at heading lines.
+
+    A heading is a short line in capitals or ending with a colon, e.g.
+    "EXPERIENCE" or "Requirements:".
+
+    Args:
+        text: Resume or job description text
+
+    Returns:
+        list: (heading, section text) pairs in document order; text before
+            the first heading has an empty heading
+    """
+    sections: List[Tuple[str, List[str]]] = [("", [])]
+    for line in text.splitlines():
+        if _is_heading(line):
+            sections.append((line.strip().rstrip(":"), [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(heading, "\n".join(lines)) for heading, lines in sections if "".join(lines).strip()]
+
+
+def section_priority(heading: str, priorities: List[Tuple[Tuple[str, ...], int]]) -> int:
+    """
+    Look up how important a section is from its heading.
+
+    Args:
+        heading: Section heading
+        priorities: (keywords, priority) pairs; the first match wins
+
+    Returns:
+        int: Priority, higher is more important
+    """
+    lowered = heading.lower()
+    if not lowered:
+        return DEFAULT_SECTION_PRIORITY
+    for keywords, priority in priorities:
+        if any(keyword in lowered for keyword in keywords):
+            return priority
+    return DEFAULT_SECTION_PRIORITY
+
+
+def fit_to_budget(text: str, budget: int, rank: Callable[[str], int]) -> BudgetResult:
+    """
+    Trim text to a token budget, dropping the least relevant sections first.
+
+    Sections are removed lowest priority first (later sections first among
+    equals) until the rest fits; kept sections stay in document order and
+    the opening section is always kept. If what remains is still too long
+    it is cut at a line boundary.
+
+    Args:
+        text: Resume or job description text
+        budget: Maximum estimated tokens
+        rank: Returns the priority of a section from its heading
+
+    Returns:
+        BudgetResult: Text that fits the budget and what was removed
+    """
+    tokens_before = estimate_tokens(text)
+    if tokens_before <= budget:
+        return BudgetResult(text, tokens_before, tokens_before, [], False)
+
+    sections = split_sections(text)
+    costs = [estimate_tokens(body) + 1 for _, body in sections]
+    # The opening section holds the name/contact details or job title, so keep it
+    order = sorted(range(1, len(sections)), key=lambda i: (rank(sections[i][0]), -i))
+
+    kept = set(range(len(sections)))
+    total = sum(costs)
+    dropped = []
+    for index in order:
+        if total <= budget:
+            break
+        kept.remove(index)
+        total -= costs[index]
+        dropped.append(sections[index][0] or "(untitled)")
+
+    result_text = "\n".join(sections[i][1] for i in sorted(kept))
+    if estimate_tokens(result_text) > budget:
+        cut = result_text[:budget * CHARS_PER_TOKEN]
+        newline = cut.rfind("\n")
+        result_text = cut[:newline] if newline > len(cut) // 2 else cut
+
+    return BudgetResult(
+        text=result_text,
+        tokens_before=tokens_before,
+        tokens_after=estimate_tokens(result_text),
+        sections_dropped=dropped,
+        truncated=True
+    )
+
+
+def fit_resume_text(resume_text: str, budget: int = RESUME_TOKEN_BUDGET) -> BudgetResult:
+    """
+    Trim resume text to the resume token budget.
+
+    Args:
+        resume_text: Normalized resume text
+        budget: Maximum estimated tokens
+
+    Returns:
+        BudgetResult: Trimmed resume text
+    """
+    return fit_to_budget(resume_text, budget, lambda heading: section_priority(heading, RESUME_SECTION_PRIORITY))
+
+
+def fit_jd_text(jd_text: str, budget: int = JD_TOKEN_BUDGET) -> BudgetResult:
+    """
+    Trim a job description to the JD token budget.
+
+    Args:
+        jd_text: Job description text
+        budget: Maximum estimated tokens
+
+    Returns:
+        BudgetResult: Trimmed job description
+    """
+    return fit_to_budget(jd_text, budget, lambda heading: section_priority(heading, JD_SECTION_PRIORITY))
@@ -0,0 +1,193 @@
+"""
+Size-limited upload handling.
+
+Requests are rejected as soon as they exceed the configured size, either
+from the Content-Length header or while the body is streamed, so an
+oversized upload is never fully buffered. Uploaded files are then read in
+chunks straight into one buffer, with the file type checked from the
+first chunk.
+"""
+import json
+import os
+from typing import Dict, Optional
+
+from fastapi import HTTPException, UploadFile
+
+# Maximum size of a single uploaded resume
+MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", "10"))
+# Maximum size of a whole /screen-batch request
+MAX_BATCH_UPLOAD_MB = float(os.getenv("MAX_BATCH_UPLOAD_MB", "200"))
+
+MAX_UPLOAD_BYTES = int(MAX_UPLOAD_MB * 1024 * 1024)
+MAX_BATCH_UPLOAD_BYTES = int(MAX_BATCH_UPLOAD_MB * 1024 * 1024)
+
+# Bytes read from an upload at a time
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# A PDF header may be preceded by up to 1024 bytes of junk
+PDF_MAGIC = b"%PDF-"
+PDF_MAGIC_WINDOW = 1024
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+class UploadError(Exception):
+    """
+    An uploaded file was rejected.
+
+    Args:
+        message: Client-facing error message
+        status_code: HTTP status code to report
+    """
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+async def read_upload(upload: UploadFile, max_bytes: int, magic: Optional[bytes] = None,
+                      magic_window: int = 0) -> bytearray:
+    """
+    Read an uploaded file in chunks, enforcing a size limit and file signature.
+
+    Chunks are copied into a single buffer, preallocated when the upload
+    size is known, so the file is held in memory once rather than as a
+    list of chunks plus their joined copy.
+
+    Args:
+        upload: Uploaded file
+        max_bytes: Maximum allowed file size
+        magic: Signature the file must contain, or None to skip the check
+        magic_window: Number of leading bytes the signature may appear in;
+            0 means it must be at the very start
+
+    Returns:
+        bytearray: File contents
+
+    Raises:
+        UploadError: If the file is too large or has the wrong signature
+    """
+    too_large = UploadError(f"File exceeds the maximum size of {max_bytes // (1024 * 1024)} MB", 413)
+    if upload.size is not None and upload.size > max_bytes:
+        raise too_large
+
+    buffer = bytearray(upload.size or 0)
+    total = 0
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if not total and magic is not None:
+            head = chunk[:magic_window] if magic_window else chunk[:len(magic)]
+            if magic not in head:
+                raise UploadError("File content does not match its type")
+        if total + len(chunk) > max_bytes:
+            raise too_large
+        # Fills the preallocated space, and grows the buffer past it
+        buffer[total:total + len(chunk)] = chunk
+        total += len(chunk)
+
+    if not total and magic is not None:
+        raise UploadError("File is empty")
+    del buffer[total:]
+    return buffer
+
+
+async def read_pdf_upload(upload: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> bytearray:
+    """
+    Read an uploaded PDF, checking the %PDF header and size limit.
+
+    Args:
+        upload: Uploaded PDF file
+        max_bytes: Maximum allowed file size
+
+    Returns:
+        bytearray: PDF contents
+
+    Raises:
+        UploadError: If the file is too large or not a PDF
+    """
+    try:
+        return await read_upload(upload, max_bytes, PDF_MAGIC, PDF_MAGIC_WINDOW)
+    except UploadError as e:
+        if e.status_code == 400:
+            raise UploadError("Invalid PDF file or file is corrupted")
+        raise
+
+
+async def read_zip_upload(upload: UploadFile, max_bytes: int = MAX_BATCH_UPLOAD_BYTES) -> bytearray:
+    """
+    Read an uploaded zip archive, checking its signature and size limit.
+
+    Args:
+        upload: Uploaded zip file
+        max_bytes: Maximum allowed file size
+
+    Returns:
+        bytearray: Archive contents
+
+    Raises:
+        UploadError: If the file is too large or not a zip archive
+    """
+    return await read_upload(upload, max_bytes, ZIP_MAGIC)
+
+
+class BodySizeLimitMiddleware:
+    """
+    ASGI middleware that rejects request bodies over a size limit.
+
+    The Content-Length header is checked before the body is read; bodies
+    without one are counted as they stream in and the request fails with
+    413 as soon as the limit is crossed.
+
+    Args:
+        app: ASGI application
+        default_limit: Limit in bytes for paths not in path_limits
+        path_limits: Per-path limits in bytes
+    """
+
+    def __init__(self, app, default_limit: int, path_limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.default_limit = default_limit
+        self.path_limits = path_limits or {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.path_limits.get(scope["path"], self.default_limit)
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > limit:
+                await self._reject(send, limit)
+                return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Request body exceeds the maximum size of {limit // (1024 * 1024)} MB"
+                    )
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def _reject(self, send, limit: int):
+        body = json.dumps({
+            "detail": f"Request body exceeds the maximum size of {limit // (1024 * 1024)} MB"
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,16 +1,63 @@
 """
 FastAPI application for Intelligent Resume Screener.
 """
-from fastapi import FastAPI, File, Form, UploadFile, HTTPException
+from fastapi import FastAPI, File, Form, Query, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+import asyncio
+import json
 import logging
 import os
-from typing import Dict, Any
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Any, List, Optional
 from dotenv import load_dotenv
 
-from core.parser import parse_pdf_to_text, validate_pdf_file
-from core.llm_extractor import extract_resume_data, compare_resume_to_jd, test_gemini_connection
+from core.parser import pdf_result_to_text, extract_pdfs_from_zip
+from core.candidates import (
+    CANDIDATE_SEARCH_MAX_LIMIT,
+    candidate_store,
+    query_terms,
+    save_candidate,
+)
+from core.cache import (
+    resume_data_cache,
+    resume_cache_key,
+    match_result_cache,
+    match_single_flight,
+    invalidate_caches,
+)
+from core.llm_client import (
+    extract_resume_data_async,
+    shutdown_executor,
+    get_stats as get_llm_client_stats,
+)
+from core.llm_registry import get_stats as get_llm_registry_stats
+from core.pdf_engine import PDFExtractionError, extract_pdf, shutdown_pool, get_stats as get_pdf_engine_stats
+from core.health import health_prober
+from core.jd_prep import get_stats as get_jd_prep_stats
+from core.jd_registry import jd_registry, register_job_description
+from core.metrics import render_prometheus
+from core.prescore import get_stats as get_prescore_stats
+from core.skills import annotate_skills, get_taxonomy, get_stats as get_skill_stats
+from core.text_normalizer import get_stats as get_normalization_stats
+from core.timings import RequestMetricsMiddleware, request_timings
+from core.upload import (
+    BodySizeLimitMiddleware,
+    UploadError,
+    read_pdf_upload,
+    read_zip_upload,
+    MAX_UPLOAD_BYTES,
+    MAX_BATCH_UPLOAD_BYTES,
+)
+from core.jobs import QueueFullError, job_queue
+from core.screening import (
+    SHORTLIST_MAX_TOP_K,
+    ScreeningError,
+    screen_resume_bytes,
+    screen_shortlist,
+    stream_screening,
+    screen_batch as run_screen_batch,
+)
 
 # Load environment variables
 load_dotenv()
@@ -19,16 +66,45 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Run the background services for the lifetime of the app.
+
+    Starts the job workers and the health prober, whose first Gemini
+    probe runs in the background; on shutdown stops them and releases
+    the LLM thread pool and PDF extraction pool.
+    """
+    job_queue.start()
+    health_prober.start()
+    try:
+        yield
+    finally:
+        await job_queue.stop()
+        await health_prober.stop()
+        shutdown_executor()
+        shutdown_pool()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Intelligent Resume Screener",
     description="AI-powered resume screening and job matching application",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Get environment variables
 ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000,https://*.vercel.app").split(",")
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "200"))
+
+# Reject oversized uploads before the body is buffered; allow 1 MB for form fields
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    default_limit=MAX_UPLOAD_BYTES + 1024 * 1024,
+    path_limits={"/screen-batch": MAX_BATCH_UPLOAD_BYTES + 1024 * 1024}
+)
 
 # Configure CORS for production
 if ENVIRONMENT == "production":
@@ -39,6 +115,7 @@ if ENVIRONMENT == "production":
         allow_credentials=False,
         allow_methods=["GET", "POST", "OPTIONS"],
         allow_headers=["*"],
+        expose_headers=["Server-Timing"],
     )
 else:
     # In development, use specific origins
@@ -48,8 +125,12 @@ else:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Server-Timing"],
     )
 
+# Outermost, so rejected uploads and CORS preflights are counted too
+app.add_middleware(RequestMetricsMiddleware, routes=app.routes)
+
 
 @app.get("/")
 async def root():
@@ -59,25 +140,213 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Detailed health check including AI service status."""
+    """
+    Detailed health check including AI service status.
+    
+    Answers from the background prober's last result; no Gemini call is
+    made per request. The status is "healthy" while Gemini is reachable,
+    "degraded" once a check failed and "unknown" before the first check.
+    """
+    health_prober.start()
+    state = health_prober.state()
+    return {"status": health_prober.status(), "gemini_ai": state["gemini"], "probe": state}
+
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is serving requests."""
+    return health_prober.live()
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 503 until Gemini has been reachable recently."""
+    health_prober.start()
+    state = health_prober.state()
+    if not health_prober.ready():
+        return JSONResponse(status_code=503, content={"status": "not_ready", **state})
+    return {"status": "ready", **state}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics for this worker process."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the resume data, match result and prepared JD caches."""
+    return {
+        "resume_data": resume_data_cache.get_stats(),
+        "match": {
+            **match_result_cache.get_stats(),
+            "in_flight": match_single_flight.in_flight(),
+            "shared_calls": match_single_flight.shared,
+        },
+        "prepared_jd": get_jd_prep_stats(),
+    }
+
+
+@app.get("/llm/stats")
+async def llm_stats():
+    """LLM thread pool usage, shared model registry and connection pool utilization."""
+    return {**get_llm_client_stats(), "registry": get_llm_registry_stats()}
+
+
+@app.get("/pdf/stats")
+async def pdf_stats():
+    """PDF extraction latency and error counters, and text normalization savings."""
+    return {**get_pdf_engine_stats(), "normalization": get_normalization_stats()}
+
+
+@app.get("/prescore/stats")
+async def prescore_stats():
+    """Share of screenings short-circuited by local pre-scoring and its agreement with Gemini."""
+    return get_prescore_stats()
+
+
+@app.get("/skills/stats")
+async def skill_stats():
+    """Skill taxonomy size and how extracted skills were normalized."""
+    return get_skill_stats()
+
+
+@app.get("/skills/normalize")
+async def normalize_skills(skill: List[str] = Query(..., description="Free-text skill, repeatable")) -> Dict[str, Any]:
+    """
+    Map free-text skills to canonical taxonomy skills.
+    
+    Args:
+        skill: Skills as written in a resume or job description
+        
+    Returns:
+        dict: Canonical skills with their categories, and unmatched input
+    """
+    taxonomy = get_taxonomy()
+    skill_ids, unmatched = taxonomy.normalize(skill)
+    return {"skills": [taxonomy.describe(skill_id) for skill_id in skill_ids], "unmatched": unmatched}
+
+
+@app.post("/cache/invalidate")
+async def cache_invalidate(target: str = "all"):
+    """
+    Drop cached results after a prompt template or model change.
+    
+    Args:
+        target: "resume_data", "match" or "all"
+    """
     try:
-        gemini_status = test_gemini_connection()
-        return {
-            "status": "healthy",
-            "gemini_ai": "connected" if gemini_status else "disconnected"
-        }
+        invalidate_caches(target)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"invalidated": target}
+
+
+def resolve_jd_text(jd_text: Optional[str], jd_id: Optional[str]) -> str:
+    """
+    Get the job description text a screening should match against.
+    
+    A registered job description is matched through its compact
+    requirements text rather than the full posting.
+    
+    Args:
+        jd_text: Job description text from the request
+        jd_id: Registered job description id from the request
+        
+    Returns:
+        str: Text to use as the job description
+        
+    Raises:
+        HTTPException: If jd_id is unknown or jd_text is missing or too short
+    """
+    if jd_id:
+        record = jd_registry.get(jd_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Job description not found")
+        return record["compact_text"]
+    if not jd_text or len(jd_text.strip()) < 10:
+        raise HTTPException(
+            status_code=400,
+            detail="Job description must be at least 10 characters long"
+        )
+    return jd_text
+
+
+@app.post("/job-descriptions")
+@app.post("/jobs-descriptions", include_in_schema=False)
+async def create_job_description(
+    jd_text: str = Form(..., description="Job description text"),
+    jd_id: Optional[str] = Form(None, description="Existing job description id to add a version to")
+) -> Dict[str, Any]:
+    """
+    Register a job description so its requirements are extracted once.
+    
+    Registering text that is already registered returns the existing
+    record. Registering changed text under an existing id adds a version.
+    Screening endpoints accept the returned id as jd_id.
+    
+    Args:
+        jd_text: Job description text
+        jd_id: Optional id of the record to version
+        
+    Returns:
+        dict: Job description record and whether it was created
+        
+    Raises:
+        HTTPException: If the text is too short, the id is unknown or
+            extraction fails
+    """
+    if not jd_text or len(jd_text.strip()) < 10:
+        raise HTTPException(
+            status_code=400,
+            detail="Job description must be at least 10 characters long"
+        )
+    try:
+        record, created = await register_job_description(jd_text, jd_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Job description not found")
     except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        return JSONResponse(
-            status_code=503,
-            content={"status": "unhealthy", "error": str(e)}
+        logger.error(f"Error extracting job description requirements: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to extract job description requirements: {str(e)}"
         )
+    return {**record, "created": created}
+
+
+@app.get("/job-descriptions")
+async def list_job_descriptions() -> Dict[str, Any]:
+    """Latest version of every registered job description."""
+    return {"job_descriptions": jd_registry.list_latest()}
+
+
+@app.get("/job-descriptions/{jd_id}")
+async def get_job_description(jd_id: str, version: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Get a registered job description.
+    
+    Args:
+        jd_id: Job description id
+        version: Version number, the latest if omitted
+        
+    Returns:
+        dict: Job description record
+        
+    Raises:
+        HTTPException: If the id or version is unknown
+    """
+    record = jd_registry.get(jd_id, version)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job description not found")
+    return record
 
 
 @app.post("/screen-resume")
 async def screen_resume(
     resume_file: UploadFile = File(..., description="PDF resume file"),
-    jd_text: str = Form(..., description="Job description text")
+    jd_text: Optional[str] = Form(None, description="Job description text"),
+    jd_id: Optional[str] = Form(None, description="Id of a registered job description, used instead of jd_text")
 ) -> Dict[str, Any]:
     """
     Screen a resume against a job description.
@@ -85,6 +354,7 @@ async def screen_resume(
     Args:
         resume_file: Uploaded PDF resume file
         jd_text: Job description text to match against
+        jd_id: Registered job description id, instead of jd_text
         
     Returns:
         dict: Match score and detailed analysis
@@ -100,70 +370,328 @@ async def screen_resume(
                 detail="Only PDF files are supported"
             )
         
-        # Read file bytes
-        file_bytes = await resume_file.read()
-        
-        # Validate PDF file
-        if not validate_pdf_file(file_bytes):
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid PDF file or file is corrupted"
-            )
-        
-        # Validate job description
-        if not jd_text or len(jd_text.strip()) < 10:
-            raise HTTPException(
-                status_code=400,
-                detail="Job description must be at least 10 characters long"
-            )
+        timings = request_timings()
+        with timings.stage("validate"):
+            # Read file bytes
+            try:
+                file_bytes = await read_pdf_upload(resume_file)
+            except UploadError as e:
+                raise HTTPException(status_code=e.status_code, detail=e.message)
+            
+            # Validate job description or look up the registered one
+            jd_text = resolve_jd_text(jd_text, jd_id)
         
         logger.info(f"Processing resume: {resume_file.filename}")
         
-        # Step 1: Extract text from PDF
         try:
-            resume_text = parse_pdf_to_text(file_bytes)
-            logger.info("Successfully extracted text from PDF")
-        except Exception as e:
-            logger.error(f"PDF parsing failed: {str(e)}")
-            raise HTTPException(
-                status_code=422,
-                detail=f"Failed to extract text from PDF: {str(e)}"
-            )
+            return await screen_resume_bytes(file_bytes, jd_text, resume_file.filename, timings)
+        except ScreeningError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
         
-        # Step 2: Extract structured data from resume
-        try:
-            resume_data = extract_resume_data(resume_text)
-            logger.info("Successfully extracted resume data using AI")
-        except Exception as e:
-            logger.error(f"Resume data extraction failed: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to extract resume data: {str(e)}"
-            )
+    except HTTPException:
+        # Re-raise HTTP exceptions as is
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in screen_resume: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
+@app.post("/screen-resume/stream")
+async def screen_resume_stream(
+    resume_file: UploadFile = File(..., description="PDF resume file"),
+    jd_text: Optional[str] = Form(None, description="Job description text"),
+    jd_id: Optional[str] = Form(None, description="Id of a registered job description, used instead of jd_text")
+) -> StreamingResponse:
+    """
+    Screen a resume against a job description, streaming progress as
+    Server-Sent Events.
+    
+    Emits "stage" events as parsing, extraction and comparison finish,
+    "resume_data" as soon as the resume is extracted, "match_delta" events
+    while Gemini writes the analysis and a final "result" with the same
+    body /screen-resume returns. Failures after the stream has started
+    are sent as an "error" event.
+    
+    Args:
+        resume_file: Uploaded PDF resume file
+        jd_text: Job description text to match against
+        jd_id: Registered job description id, instead of jd_text
         
-        # Step 3: Compare resume to job description
-        try:
-            match_analysis = compare_resume_to_jd(resume_data, jd_text)
-            logger.info(f"Match analysis completed with score: {match_analysis.get('match_score', 0)}")
-        except Exception as e:
-            logger.error(f"Resume comparison failed: {str(e)}")
+    Returns:
+        StreamingResponse: text/event-stream of screening events
+        
+    Raises:
+        HTTPException: If the upload or job description is invalid
+    """
+    if not resume_file.filename.lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=400,
+            detail="Only PDF files are supported"
+        )
+    
+    try:
+        file_bytes = await read_pdf_upload(resume_file)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    
+    jd_text = resolve_jd_text(jd_text, jd_id)
+    
+    logger.info(f"Streaming screening of resume: {resume_file.filename}")
+    
+    async def events():
+        async for event, data in stream_screening(file_bytes, jd_text, resume_file.filename):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Stop proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/jobs/screen", status_code=202)
+async def submit_screen_job(
+    resume_file: UploadFile = File(..., description="PDF resume file"),
+    jd_text: Optional[str] = Form(None, description="Job description text"),
+    jd_id: Optional[str] = Form(None, description="Id of a registered job description, used instead of jd_text"),
+    webhook_url: Optional[str] = Form(None, description="URL the finished job is POSTed to")
+) -> Dict[str, Any]:
+    """
+    Queue a resume screening and return its job id immediately.
+    
+    Poll GET /jobs/{job_id} for the result, or pass webhook_url to have
+    the finished job POSTed to it.
+    
+    Args:
+        resume_file: Uploaded PDF resume file
+        jd_text: Job description text to match against
+        jd_id: Registered job description id, instead of jd_text
+        webhook_url: Optional http(s) URL notified when the job finishes
+        
+    Returns:
+        dict: Job id, status and polling URL
+        
+    Raises:
+        HTTPException: If the input is invalid or the queue is full
+    """
+    if not resume_file.filename.lower().endswith('.pdf'):
+        raise HTTPException(
+            status_code=400,
+            detail="Only PDF files are supported"
+        )
+    
+    try:
+        file_bytes = await read_pdf_upload(resume_file)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    
+    jd_text = resolve_jd_text(jd_text, jd_id)
+    
+    try:
+        job = await job_queue.submit(
+            "screen",
+            {"jd_text": jd_text, "filename": resume_file.filename},
+            file_bytes,
+            webhook_url=webhook_url
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    logger.info(f"Queued screening job {job['id']} for resume: {resume_file.filename}")
+    return {"job_id": job["id"], "status": job["status"], "status_url": f"/jobs/{job['id']}"}
+
+
+@app.get("/jobs/stats")
+async def job_stats():
+    """Job queue depth, running jobs and stored jobs by status."""
+    return job_queue.get_stats()
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> Dict[str, Any]:
+    """
+    Get the status of a queued screening, with its result once finished.
+    
+    Args:
+        job_id: Id returned by POST /jobs/screen
+        
+    Returns:
+        dict: Job status, timestamps and result or error
+        
+    Raises:
+        HTTPException: If the job is unknown or has expired
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/candidates/search")
+async def search_candidates(
+    skill: List[str] = Query([], description="Required skill, repeatable; free text is normalized"),
+    category: List[str] = Query([], description="Required skill category id, repeatable"),
+    role: List[str] = Query([], description="Words every match must have in a previous role, repeatable"),
+    education: List[str] = Query([], description="Words every match must have in its education, repeatable"),
+    min_years: Optional[float] = Query(None, ge=0, description="Minimum years of experience"),
+    max_years: Optional[float] = Query(None, ge=0, description="Maximum years of experience"),
+    limit: int = Query(50, ge=1, le=CANDIDATE_SEARCH_MAX_LIMIT),
+    offset: int = Query(0, ge=0)
+) -> Dict[str, Any]:
+    """
+    Search previously extracted candidates.
+    
+    Every filter must match. Results are ordered by years of experience,
+    most experienced first.
+    
+    Returns:
+        dict: Total matches, one page of candidates and the search time
+    """
+    required = query_terms(skill, category, role, education)
+    return await asyncio.to_thread(candidate_store.search, required, min_years, max_years, limit, offset)
+
+
+@app.post("/candidates/shortlist")
+async def shortlist_candidates(
+    jd_text: Optional[str] = Form(None, description="Job description text"),
+    jd_id: Optional[str] = Form(None, description="Id of a registered job description, used instead of jd_text"),
+    top_k: int = Form(20, ge=1, le=SHORTLIST_MAX_TOP_K, description="Candidates to retrieve"),
+    compare: bool = Form(True, description="Compare the retrieved candidates with the job description")
+) -> Dict[str, Any]:
+    """
+    Shortlist stored candidates for a job description.
+    
+    The whole candidate store is searched by embedding similarity and
+    only the top_k closest candidates are compared by Gemini.
+    
+    Args:
+        jd_text: Job description text to match against
+        jd_id: Registered job description id, instead of jd_text
+        top_k: Number of candidates to retrieve
+        compare: False to return the retrieved candidates without comparing them
+        
+    Returns:
+        dict: Shortlist ranked by match score (by similarity without
+            comparison), plus per-candidate errors
+        
+    Raises:
+        HTTPException: If the job description is missing or unknown
+    """
+    jd_text = resolve_jd_text(jd_text, jd_id)
+    try:
+        return await screen_shortlist(jd_text, top_k, compare)
+    except Exception as e:
+        logger.error(f"Unexpected error in shortlist_candidates: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@app.get("/candidates/stats")
+async def candidate_stats():
+    """Stored candidates, inverted index size and embedding index size."""
+    from core.embeddings import candidate_vectors
+
+    return {**candidate_store.get_stats(), "embeddings": candidate_vectors.get_stats()}
+
+
+@app.get("/candidates/{candidate_id}")
+async def get_candidate(candidate_id: str) -> Dict[str, Any]:
+    """
+    Get a stored candidate with the full extracted resume data.
+    
+    Args:
+        candidate_id: Id from a search result
+        
+    Returns:
+        dict: Candidate summary and resume data
+        
+    Raises:
+        HTTPException: If the candidate is unknown
+    """
+    candidate = candidate_store.get(candidate_id)
+    if candidate is None:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    return candidate
+
+
+@app.post("/screen-batch")
+async def screen_batch(
+    resume_files: List[UploadFile] = File(..., description="PDF resume files or zip archives of PDFs"),
+    jd_text: Optional[str] = Form(None, description="Job description text"),
+    jd_id: Optional[str] = Form(None, description="Id of a registered job description, used instead of jd_text")
+) -> Dict[str, Any]:
+    """
+    Screen many resumes against one job description.
+    
+    Args:
+        resume_files: Uploaded PDF files and/or zip archives containing PDFs
+        jd_text: Job description text to match against
+        jd_id: Registered job description id, instead of jd_text
+        
+    Returns:
+        dict: Results ranked by match score, plus per-file errors
+        
+    Raises:
+        HTTPException: If the request itself is invalid
+    """
+    try:
+        # Validate job description or look up the registered one
+        jd_text = resolve_jd_text(jd_text, jd_id)
+        
+        # Collect PDFs, expanding zip archives
+        files = []
+        rejected = []
+        for upload in resume_files:
+            filename = upload.filename or "unnamed"
+            if filename.lower().endswith('.zip'):
+                try:
+                    archive_bytes = await read_zip_upload(upload)
+                    files.extend(extract_pdfs_from_zip(
+                        archive_bytes,
+                        max_files=BATCH_MAX_FILES,
+                        max_file_size=MAX_UPLOAD_BYTES,
+                        # Archives share the batch budget with the PDFs before them
+                        max_total_size=MAX_BATCH_UPLOAD_BYTES - sum(len(data) for _, data in files)
+                    ))
+                except (UploadError, ValueError) as e:
+                    raise HTTPException(status_code=400, detail=f"{filename}: {str(e)}")
+            elif filename.lower().endswith('.pdf'):
+                try:
+                    files.append((filename, await read_pdf_upload(upload)))
+                except UploadError as e:
+                    rejected.append({"filename": filename, "stage": "validate", "error": e.message})
+            else:
+                rejected.append({
+                    "filename": filename,
+                    "stage": "validate",
+                    "error": "Only PDF files are supported"
+                })
+        
+        if len(files) > BATCH_MAX_FILES:
             raise HTTPException(
-                status_code=500,
-                detail=f"Failed to compare resume to job description: {str(e)}"
+                status_code=400,
+                detail=f"A batch can contain at most {BATCH_MAX_FILES} resumes"
             )
+        if not files:
+            raise HTTPException(status_code=400, detail="No PDF files provided")
         
-        # Return the required format
-        return {
-            "match_score": match_analysis.get("match_score", 0),
-            "match_summary": match_analysis.get("match_summary", "No summary available"),
-            "detailed_analysis": match_analysis  # Include full analysis for debugging
-        }
+        logger.info(f"Processing batch of {len(files)} resumes")
+        
+        batch = await run_screen_batch(files, jd_text)
+        batch["total"] += len(rejected)
+        batch["failed"] += len(rejected)
+        batch["errors"].extend(rejected)
+        return batch
         
     except HTTPException:
-        # Re-raise HTTP exceptions as is
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in screen_resume: {str(e)}")
+        logger.error(f"Unexpected error in screen_batch: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
@@ -192,16 +720,34 @@ async def extract_resume_only(
             )
         
         # Read and validate file
-        file_bytes = await resume_file.read()
-        if not validate_pdf_file(file_bytes):
+        try:
+            file_bytes = await read_pdf_upload(resume_file)
+        except UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.message)
+
+        # Reuse structured data if this exact PDF was extracted before
+        cache_key = resume_cache_key(file_bytes)
+        resume_data = resume_data_cache.get(cache_key)
+        if resume_data is not None:
+            logger.info("Using cached resume data")
+            resume_data = annotate_skills(resume_data)
+
+        try:
+            parse_result = await extract_pdf(file_bytes)
+        except PDFExtractionError as e:
+            raise HTTPException(status_code=422, detail=f"Failed to extract text from PDF: {str(e)}")
+        if not parse_result.is_valid:
             raise HTTPException(
                 status_code=400,
                 detail="Invalid PDF file or file is corrupted"
             )
         
-        # Extract text and data
-        resume_text = parse_pdf_to_text(file_bytes)
-        resume_data = extract_resume_data(resume_text)
+        # Extract text and data; the text is still parsed for the preview
+        resume_text = pdf_result_to_text(parse_result)
+        if resume_data is None:
+            resume_data = await extract_resume_data_async(resume_text)
+            resume_data_cache.set(cache_key, resume_data)
+        await save_candidate(file_bytes, resume_data, resume_file.filename)
         
         return {
             "extracted_data": resume_data,
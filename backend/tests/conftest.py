@@ -0,0 +1,110 @@
+"""
+Shared fixtures for the backend tests.
+
+Tests run without a Gemini key or network: LLM calls are answered by a
+fake installed over core.llm_extractor.generate_content, and every store
+and cache is kept in memory.
+"""
+import json
+import os
+import sys
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Settings are read at import time, so they are fixed before any core module loads
+for name in ("EMBEDDING_INDEX_PATH", "RESUME_CACHE_DB", "MATCH_CACHE_DB", "JOBS_DB", "JD_REGISTRY_DB"):
+    os.environ[name] = ""
+os.environ["CANDIDATES_DB"] = ":memory:"
+os.environ["LLM_BACKEND"] = "gemini"
+os.environ["PRESCORE_THRESHOLD"] = "0"
+os.environ.pop("GEMINI_API_KEY", None)
+
+SAMPLE_RESUME = {
+    "skills": ["Python", "Docker", "PostgreSQL"],
+    "experience_years": 6,
+    "education": ["BSc Computer Science"],
+    "previous_roles": ["Backend Engineer"],
+    "key_achievements": ["Cut API latency by 40%"],
+    "contact_info": {"name": "Ada Example", "email": "ada@example.com", "phone": None},
+}
+SAMPLE_MATCH = {"match_score": 72, "match_summary": "Good backend fit"}
+SAMPLE_JD = "Backend Engineer\n\nRequirements:\n- Python\n- PostgreSQL\n- 3+ years of experience"
+
+
+class FakeLLM:
+    """
+    Stand-in for llm_registry.generate_content answering by call name.
+
+    A reply is a value serialized to JSON, a string sent as it is, a
+    callable of the prompt returning either, or an exception to raise.
+    """
+
+    def __init__(self):
+        self.replies: Dict[str, Any] = {
+            "extract": SAMPLE_RESUME,
+            "compare": SAMPLE_MATCH,
+            "compare_stream": SAMPLE_MATCH,
+            "extract_jd": {"title": "Backend Engineer", "seniority": "senior", "required_skills": ["Python"],
+                           "preferred_skills": [], "min_experience_years": 3, "education": [],
+                           "responsibilities": []},
+            "health": "OK",
+        }
+        self.calls: List[str] = []
+        self.prompts: List[str] = []
+
+    def reply_text(self, call: str, prompt: str) -> str:
+        reply = self.replies.get(call, "")
+        if isinstance(reply, BaseException):
+            raise reply
+        if callable(reply):
+            reply = reply(prompt)
+        return reply if isinstance(reply, str) else json.dumps(reply)
+
+    def generate(self, prompt: str, generation_config: Any = None, call: str = "", **kwargs: Any) -> Any:
+        self.calls.append(call)
+        self.prompts.append(prompt)
+        return SimpleNamespace(text=self.reply_text(call, prompt), usage_metadata=None)
+
+    def stream(self, prompt: str, generation_config: Any = None, call: str = "") -> Any:
+        self.calls.append(call)
+        self.prompts.append(prompt)
+        text = self.reply_text(call, prompt)
+        for start in range(0, len(text), 16):
+            yield SimpleNamespace(text=text[start:start + 16], usage_metadata=None)
+
+
+@pytest.fixture
+def fake_llm(monkeypatch) -> FakeLLM:
+    """Answer every LLM call locally; set fake_llm.replies[call] to change a reply."""
+    import core.llm_extractor as llm_extractor
+
+    llm = FakeLLM()
+    monkeypatch.setattr(llm_extractor, "generate_content", llm.generate)
+    monkeypatch.setattr(llm_extractor, "stream_content", llm.stream)
+    return llm
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty result caches."""
+    from core.cache import match_result_cache, resume_data_cache
+
+    resume_data_cache.clear()
+    match_result_cache.clear()
+    yield
+
+
+@pytest.fixture
+def make_pdf() -> Callable[..., bytes]:
+    """Build a text PDF from lines, one list of lines per page."""
+    from benchmarks.bench_pipeline import synthetic_pdf
+
+    def make(*pages: List[str]) -> bytes:
+        return synthetic_pdf([list(page) for page in pages] or [["Empty"]])
+
+    return make
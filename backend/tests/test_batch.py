@@ -0,0 +1,105 @@
+import asyncio
+import io
+import re
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core import screening
+from core.parser import extract_pdfs_from_zip
+from tests.conftest import SAMPLE_JD, SAMPLE_RESUME
+
+
+def _zip(entries, compression=zipfile.ZIP_STORED):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def scored_llm(fake_llm):
+    """Score each candidate by the number in its 'Candidate N' line."""
+    def extract(prompt):
+        number = re.search(r"Candidate (\d+)", prompt).group(1)
+        return {**SAMPLE_RESUME, "key_achievements": [f"Candidate {number}"]}
+
+    def compare(prompt):
+        number = int(re.search(r"Candidate (\d+)", prompt).group(1))
+        return {"match_score": 10 * number, "match_summary": f"Candidate {number}"}
+
+    fake_llm.replies["extract"] = extract
+    fake_llm.replies["compare"] = compare
+    return fake_llm
+
+
+def test_extract_pdfs_from_zip_skips_other_entries():
+    archive = _zip([("a/one.pdf", b"%PDF-1"), ("notes.txt", b"x"), ("__MACOSX/._one.pdf", b"x"),
+                    ("fake.pdf", b"MZ not a pdf")])
+    assert extract_pdfs_from_zip(archive) == [("one.pdf", b"%PDF-1")]
+
+
+def test_extract_pdfs_from_zip_limits():
+    with pytest.raises(ValueError, match="Invalid zip"):
+        extract_pdfs_from_zip(b"not a zip")
+    with pytest.raises(ValueError, match="more than 1"):
+        extract_pdfs_from_zip(_zip([("a.pdf", b"%PDF"), ("b.pdf", b"%PDF")]), max_files=1)
+    with pytest.raises(ValueError, match="maximum file size"):
+        extract_pdfs_from_zip(_zip([("a.pdf", b"%PDF" * 10)]), max_file_size=8)
+
+
+def test_extract_pdfs_from_zip_bounds_the_decompressed_total():
+    # A few kilobytes that inflate to 40 MB, each entry under the per-file limit
+    bomb = b"%PDF-1.7" + b"\0" * (10 * 1024 * 1024)
+    archive = _zip([(f"{i}.pdf", bomb) for i in range(4)], zipfile.ZIP_DEFLATED)
+    assert len(archive) < 100 * 1024
+    with pytest.raises(ValueError, match="maximum total uncompressed size"):
+        extract_pdfs_from_zip(archive, max_total_size=25 * 1024 * 1024)
+    assert len(extract_pdfs_from_zip(archive, max_total_size=50 * 1024 * 1024)) == 4
+
+
+def test_screen_batch_ranks_results_and_isolates_failures(scored_llm, make_pdf, monkeypatch):
+    monkeypatch.setattr(screening, "BATCH_PACKED_COMPARISON", False)
+    files = [
+        ("one.pdf", make_pdf(["Candidate 1", "Python developer"])),
+        ("broken.pdf", b"%PDF-1.4 truncated"),
+        ("three.pdf", make_pdf(["Candidate 3", "Python developer"])),
+    ]
+    batch = asyncio.run(screening.screen_batch(files, SAMPLE_JD))
+    assert (batch["total"], batch["succeeded"], batch["failed"]) == (3, 2, 1)
+    assert [(r["filename"], r["rank"], r["match_score"]) for r in batch["results"]] == [
+        ("three.pdf", 1, 30), ("one.pdf", 2, 10)
+    ]
+    assert batch["errors"][0]["filename"] == "broken.pdf"
+    assert batch["errors"][0]["stage"] in ("validate", "parse")
+
+
+def test_screen_batch_endpoint_expands_zips_and_rejects_other_files(scored_llm, make_pdf, monkeypatch):
+    from main import app
+
+    monkeypatch.setattr(screening, "BATCH_PACKED_COMPARISON", False)
+    archive = _zip([("two.pdf", make_pdf(["Candidate 2"])), ("four.pdf", make_pdf(["Candidate 4"]))])
+    response = TestClient(app).post(
+        "/screen-batch",
+        data={"jd_text": SAMPLE_JD},
+        files=[
+            ("resume_files", ("bundle.zip", archive, "application/zip")),
+            ("resume_files", ("notes.txt", b"hello", "text/plain")),
+        ],
+    )
+    assert response.status_code == 200
+    batch = response.json()
+    assert [r["filename"] for r in batch["results"]] == ["four.pdf", "two.pdf"]
+    assert batch["errors"] == [{"filename": "notes.txt", "stage": "validate", "error": "Only PDF files are supported"}]
+    assert batch["total"] == 3
+
+
+def test_screen_batch_endpoint_requires_pdfs():
+    from main import app
+
+    response = TestClient(app).post(
+        "/screen-batch", data={"jd_text": SAMPLE_JD}, files=[("resume_files", ("bad.zip", b"nope", "application/zip"))]
+    )
+    assert response.status_code == 400
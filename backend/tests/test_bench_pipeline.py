@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from benchmarks.bench_pipeline import (
+    REGRESSION_MIN_MS,
+    compare_to_baseline,
+    percentile,
+    summarize,
+    synthetic_jd,
+    synthetic_resume_pdf,
+)
+from core.jd_prep import prepare_jd
+from core.parser import parse_pdf_to_text
+
+
+@pytest.mark.parametrize("values, q, expected", [
+    ([7], 99, 7),
+    ([1, 2, 3, 4], 0, 1),
+    ([1, 2, 3, 4], 100, 4),
+    ([4, 1, 3, 2], 50, 2.5),
+    (list(range(1, 101)), 95, 95.05),
+    ([10, 20], 25, 12.5),
+])
+def test_percentile_interpolates(values, q, expected):
+    assert percentile(values, q) == pytest.approx(expected)
+
+
+def test_percentile_of_nothing():
+    assert percentile([], 95) is None
+
+
+def test_summarize():
+    assert summarize([]) == {"count": 0}
+    summary = summarize([10, 20, 30, 40])
+    assert summary["count"] == 4 and summary["mean_ms"] == 25 and summary["max_ms"] == 40
+    assert summary["p50_ms"] == 25 and summary["p99_ms"] == 39.7
+
+
+def _phase(p95, rps, stages=None):
+    return {"latency": {"p95_ms": p95}, "requests_per_s": rps,
+            "stages": {stage: {"p95_ms": value} for stage, value in (stages or {}).items()}}
+
+
+def test_compare_to_baseline_flags_regressions():
+    baseline = {"phases": {"cold": _phase(100, 50, {"parse": 40, "compare": 300})}}
+    current = {"phases": {"cold": _phase(130, 40, {"parse": 41, "compare": 400}), "warm": _phase(10, 500)}}
+    assert compare_to_baseline(current, baseline, 0.1) == [
+        "cold p95 100 -> 130 ms",
+        "cold compare p95 300.0 -> 400.0 ms",
+        "cold throughput 50.0 -> 40.0 req/s",
+    ]
+
+
+def test_compare_to_baseline_ignores_noise():
+    baseline = {"phases": {"cold": _phase(100, 50, {"prescore": 1})}}
+    # Within tolerance, or slower by less than REGRESSION_MIN_MS
+    current = {"phases": {"cold": _phase(105, 47, {"prescore": 1 + REGRESSION_MIN_MS / 2, "jd_prepare": 9})}}
+    assert compare_to_baseline(current, baseline, 0.1) == []
+    assert compare_to_baseline(current, {}, 0.1) == []
+
+
+def test_synthetic_inputs_are_reproducible():
+    skills = ["Python", "Kubernetes", "AWS", "Terraform", "React", "SQL", "Docker", "Go", "Java", "Rust",
+              "Excel", "Figma", "Kafka", "Spark", "Redis"]
+    first = synthetic_resume_pdf(random.Random(1), skills, 2, 3)
+    assert first == synthetic_resume_pdf(random.Random(1), skills, 2, 3)
+    text = parse_pdf_to_text(first)
+    assert "Candidate 00003" in text and "EXPERIENCE" in text
+
+    short, long = (synthetic_jd(random.Random(2), skills, size) for size in ("short", "long"))
+    assert long.startswith(short.split("\n\n")[0])
+    assert prepare_jd(long).budgeted.truncated and not prepare_jd(short).budgeted.truncated
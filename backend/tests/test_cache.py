@@ -0,0 +1,90 @@
+import time
+
+from fastapi.testclient import TestClient
+
+from core import cache
+from core.cache import MemoryCache, SQLiteCache, TieredCache, match_cache_key, resume_cache_key
+from main import app
+from tests.conftest import SAMPLE_JD, SAMPLE_RESUME
+
+
+def test_memory_cache_evicts_least_recently_used():
+    memory = MemoryCache(max_entries=2)
+    memory.set("a", 1)
+    memory.set("b", 2)
+    assert memory.get("a") == 1
+    memory.set("c", 3)
+    assert memory.get("b") is None
+    assert memory.get("a") == 1 and memory.get("c") == 3
+    assert memory.stats.evictions == 1
+
+
+def test_memory_cache_expires_entries():
+    memory = MemoryCache(ttl=0.05)
+    memory.set("a", {"x": 1})
+    assert memory.get("a") == {"x": 1}
+    time.sleep(0.06)
+    assert memory.get("a") is None
+
+
+def test_memory_cache_returns_copies():
+    memory = MemoryCache()
+    memory.set("a", {"skills": ["Python"]})
+    memory.get("a")["skills"].append("Go")
+    assert memory.get("a") == {"skills": ["Python"]}
+
+
+def test_sqlite_cache_persists_and_trims(tmp_path):
+    path = str(tmp_path / "cache.db")
+    disk = SQLiteCache(path, max_entries=2)
+    for key in ("a", "b", "c"):
+        disk.set(key, {"key": key})
+    assert len(disk) == 2
+    assert SQLiteCache(path).get("c") == {"key": "c"}
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.db"))
+    disk.set("a", [1, 2])
+    tiered = TieredCache(MemoryCache(), disk, name="test")
+    assert tiered.get("a") == [1, 2]
+    assert tiered.memory.get("a") == [1, 2]
+    assert tiered.get("missing") is None
+    stats = tiered.get_stats()
+    assert stats["disk"]["hits"] == 1 and stats["disk"]["misses"] == 1
+
+
+def test_resume_key_depends_on_backend_and_preprocessing(monkeypatch):
+    key = resume_cache_key(b"%PDF-1.4 resume")
+    assert resume_cache_key(b"%PDF-1.4 resume") == key
+    assert resume_cache_key(b"%PDF-1.4 other") != key
+    monkeypatch.setattr(cache, "LLM_BACKEND", "stub")
+    assert resume_cache_key(b"%PDF-1.4 resume") != key
+    monkeypatch.undo()
+    monkeypatch.setattr(cache, "RESUME_TOKEN_BUDGET", 123)
+    assert resume_cache_key(b"%PDF-1.4 resume") != key
+    monkeypatch.undo()
+    monkeypatch.setattr(cache, "PREPROCESSING_VERSION", cache.PREPROCESSING_VERSION + 1)
+    assert resume_cache_key(b"%PDF-1.4 resume") != key
+
+
+def test_match_key_ignores_skill_ids_and_tracks_settings(monkeypatch):
+    key = match_cache_key(SAMPLE_RESUME, SAMPLE_JD)
+    assert match_cache_key(dict(SAMPLE_RESUME, skill_ids=["python"]), SAMPLE_JD) == key
+    assert match_cache_key(SAMPLE_RESUME, SAMPLE_JD + "\n- Kubernetes") != key
+    monkeypatch.setattr(cache, "LLM_BACKEND", "stub")
+    assert match_cache_key(SAMPLE_RESUME, SAMPLE_JD) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(cache, "JD_TOKEN_BUDGET", 10)
+    assert match_cache_key(SAMPLE_RESUME, SAMPLE_JD) != key
+
+
+def test_extract_resume_reuses_cached_data(fake_llm, make_pdf):
+    client = TestClient(app)
+    files = {"resume_file": ("r.pdf", make_pdf(["Ada Example", "Python"]), "application/pdf")}
+    first = client.post("/extract-resume", files=files)
+    second = client.post("/extract-resume", files=files)
+    assert first.status_code == second.status_code == 200
+    assert second.json()["extracted_data"]["skills"] == SAMPLE_RESUME["skills"]
+    assert "Ada Example" in second.json()["raw_text_preview"]
+    assert fake_llm.calls == ["extract"]
@@ -0,0 +1,79 @@
+import threading
+
+from core import candidates
+from core.candidates import CandidateStore, candidate_id, query_terms
+from tests.conftest import SAMPLE_RESUME
+
+
+def _resume(i, years=5, skills=("Python", "Kubernetes")):
+    return {**SAMPLE_RESUME, "skills": list(skills), "experience_years": years,
+            "contact_info": {"name": f"Candidate {i}", "email": f"c{i}@example.com", "phone": None}}
+
+
+def test_memory_opt_out():
+    # The tests set CANDIDATES_DB=:memory: instead of using backend/candidates.db
+    assert candidates.CANDIDATES_DB == candidates.candidate_store.path == ":memory:"
+
+
+def test_file_store_survives_restart(tmp_path):
+    path = str(tmp_path / "candidates.db")
+    CandidateStore(path).save("a", _resume(1), "a.pdf")
+    assert CandidateStore(path).get("a")["filename"] == "a.pdf"
+
+
+def test_save_and_search():
+    store = CandidateStore()
+    assert store.save("a", _resume(1, years=3), "a.pdf")
+    assert store.save("b", _resume(2, years=8, skills=("Python",)))
+    assert not store.save("a", _resume(1, years=3))
+
+    result = store.search(query_terms(skills=["python"]))
+    assert [c["id"] for c in result["candidates"]] == ["b", "a"]
+    assert store.search(query_terms(skills=["k8s"]), min_years=2)["total"] == 1
+    assert store.search(set(), max_years=4)["candidates"][0]["filename"] == "a.pdf"
+    assert store.get("a")["resume_data"]["experience_years"] == 3
+
+
+def test_search_sees_updates():
+    store = CandidateStore()
+    store.save("a", _resume(1, skills=("Python",)))
+    assert store.search(query_terms(skills=["python"]))["total"] == 1
+    store.save("a", _resume(1, skills=("Go",)))
+    assert store.search(query_terms(skills=["python"]))["total"] == 0
+    assert store.search(query_terms(skills=["go"]))["total"] == 1
+
+
+def test_concurrent_saves_from_two_connections_get_distinct_versions(tmp_path):
+    path = str(tmp_path / "candidates.db")
+    stores = [CandidateStore(path), CandidateStore(path)]
+
+    def save(store, offset):
+        for i in range(offset, offset + 25):
+            store.save(candidate_id(str(i).encode()), _resume(i))
+
+    threads = [threading.Thread(target=save, args=(store, 100 * n)) for n, store in enumerate(stores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    versions = [row[0] for row in stores[0]._conn.execute("SELECT version FROM candidates")]
+    assert len(versions) == len(set(versions)) == 50
+    latest, changed = stores[1].changes(0)
+    assert latest == 50 and len(changed) == 50
+
+
+def test_large_lookups_are_chunked(monkeypatch):
+    monkeypatch.setattr(candidates, "_IN_CHUNK", 7)
+    store = CandidateStore()
+    for i in range(30):
+        store.save(str(i), _resume(i, years=i))
+    result = store.search(query_terms(skills=["python"]), limit=30)
+    assert result["total"] == 30
+    assert [c["experience_years"] for c in result["candidates"]] == list(range(29, -1, -1))
+    seqs = [seq for seq, _ in store.changes(0)[1]]
+    assert store.get_many(seqs[::-1]).keys() == set(seqs)
+    # Updates after the first load sync through the chunked postings lookup too
+    for i in range(30):
+        store.save(str(i), _resume(i, years=i, skills=("Go",)))
+    assert store.search(query_terms(skills=["go"]), limit=30)["total"] == 30
@@ -0,0 +1,124 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from core import embeddings, screening
+from core.candidates import CandidateStore
+from core.embeddings import CandidateVectorIndex, HashingEmbedder, resume_document
+from tests.conftest import SAMPLE_RESUME
+
+JD = "Cloud Engineer\n\nRequirements:\n- Kubernetes and AWS\n- Terraform"
+
+
+class CountingEmbedder(HashingEmbedder):
+    """Hashing embedder that counts the texts it embeds."""
+
+    def __init__(self, dim=64):
+        super().__init__(dim)
+        self.embedded = 0
+
+    def embed(self, texts):
+        self.embedded += len(texts)
+        return super().embed(texts)
+
+
+def _resume(skills, roles):
+    return {**SAMPLE_RESUME, "skills": skills, "previous_roles": roles, "key_achievements": []}
+
+
+@pytest.fixture
+def store():
+    store = CandidateStore()
+    store.save("cloud", _resume(["Kubernetes", "AWS", "Terraform"], ["Cloud Engineer"]))
+    store.save("gcp", _resume(["GCP", "Docker"], ["Platform Engineer"]))
+    store.save("teacher", _resume(["Lesson planning"], ["Teacher"]))
+    return store
+
+
+def _ids(store, result):
+    candidates = store.get_many([seq for seq, _ in result["matches"]])
+    return [candidates[seq]["id"] for seq, _ in result["matches"]]
+
+
+def test_hashing_embeddings_are_unit_length_and_deterministic():
+    embedder = HashingEmbedder(32)
+    vectors = embedder.embed(["Python and Kubernetes", "Python and Kubernetes", ""])
+    assert vectors.dtype == np.float32 and vectors.shape == (3, 32)
+    assert np.allclose(np.linalg.norm(vectors[:2], axis=1), 1.0)
+    assert np.array_equal(vectors[0], vectors[1])
+    assert not vectors[2].any()
+
+
+def test_resume_document_names_canonical_skills():
+    document = resume_document({**SAMPLE_RESUME, "skill_ids": ["kubernetes"]})
+    assert "Kubernetes" in document and "Backend Engineer" in document
+
+
+def test_search_ranks_related_candidates_first(store):
+    index = CandidateVectorIndex(store, embedder=CountingEmbedder())
+    result = index.search(JD, top_k=2)
+    assert result["searched"] == 3
+    assert _ids(store, result) == ["cloud", "gcp"]
+    similarities = [score for _, score in result["matches"]]
+    assert similarities == sorted(similarities, reverse=True)
+
+
+def test_index_follows_store_changes(store):
+    embedder = CountingEmbedder()
+    index = CandidateVectorIndex(store, embedder=embedder)
+    index.search(JD, top_k=1)
+    embedded = embedder.embedded
+    index.search(JD, top_k=1)
+    # Only the JD is embedded again when nothing changed
+    assert embedder.embedded == embedded + 1
+
+    store.save("teacher", _resume(["Kubernetes", "AWS", "Terraform", "Helm"], ["Cloud Engineer"]))
+    assert "teacher" in _ids(store, index.search(JD, top_k=2))
+    assert embedder.embedded == embedded + 3
+    assert index.get_stats()["embedded"] == 3
+
+
+def test_memory_mapped_index_survives_restart(store, tmp_path):
+    path = str(tmp_path / "vectors.f32")
+    CandidateVectorIndex(store, path, CountingEmbedder()).search(JD, top_k=3)
+
+    embedder = CountingEmbedder()
+    reopened = CandidateVectorIndex(store, path, embedder)
+    assert _ids(store, reopened.search(JD, top_k=1)) == ["cloud"]
+    assert embedder.embedded == 1
+    assert reopened.get_stats()["memory_mapped"]
+
+    # Another model cannot reuse the matrix, so every candidate is embedded again
+    other = CountingEmbedder(dim=32)
+    CandidateVectorIndex(store, path, other).search(JD, top_k=1)
+    assert other.embedded == 4
+
+
+def test_empty_store_returns_no_matches():
+    result = CandidateVectorIndex(CandidateStore(), embedder=CountingEmbedder()).search(JD, top_k=5)
+    assert result["matches"] == [] and result["searched"] == 0
+
+
+def test_shortlist_without_comparison(store, monkeypatch):
+    monkeypatch.setattr(screening, "candidate_store", store)
+    monkeypatch.setattr(embeddings, "candidate_vectors", CandidateVectorIndex(store, embedder=CountingEmbedder()))
+    result = asyncio.run(screening.screen_shortlist(JD, top_k=2, compare=False))
+    assert result["searched"] == 3 and result["retrieved"] == 2
+    assert [candidate["id"] for candidate in result["results"]] == ["cloud", "gcp"]
+    assert "resume_data" not in result["results"][0]
+
+
+def test_shortlist_skips_candidates_missing_from_the_store(store, monkeypatch):
+    index = CandidateVectorIndex(store, embedder=CountingEmbedder())
+    cloud_seq = index.search(JD, top_k=1)["matches"][0][0]
+    real_get_many = store.get_many
+    monkeypatch.setattr(store, "get_many", lambda seqs: {
+        seq: candidate for seq, candidate in real_get_many(seqs).items() if seq != cloud_seq
+    })
+    monkeypatch.setattr(screening, "candidate_store", store)
+    monkeypatch.setattr(embeddings, "candidate_vectors", index)
+    result = asyncio.run(screening.screen_shortlist(JD, top_k=2, compare=False))
+    assert result["retrieved"] == 1
+    assert [candidate["id"] for candidate in result["results"]] == ["gcp"]
+    assert result["results"][0]["similarity"] == round(index.search(JD, top_k=2)["matches"][1][1], 4)
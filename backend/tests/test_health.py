@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+from core.health import HealthProber
+
+
+def _prober(probe, last_traffic=lambda: 0.0, **kwargs):
+    return HealthProber(probe, last_traffic, **{"interval": 60, "timeout": 1, "max_age": 180, **kwargs})
+
+
+def test_start_probes_in_the_background():
+    async def hanging():
+        await asyncio.sleep(10)
+        return True
+
+    async def run():
+        prober = _prober(hanging, timeout=0.05)
+        prober.start()
+        # Starting does not wait for the probe; the status is unknown until it ends
+        status = prober.status()
+        await asyncio.sleep(0.2)
+        await prober.stop()
+        return status, prober
+
+    status, prober = asyncio.run(run())
+    assert status == "unknown"
+    assert prober.state()["gemini"] == "disconnected" and "timed out" in prober.state()["last_error"]
+    assert not prober.ready() and prober.status() == "degraded"
+
+
+def test_lifespan_starts_and_stops_the_background_services(monkeypatch):
+    events = []
+
+    async def probe():
+        events.append("probed")
+        return True
+
+    async def stop_jobs():
+        events.append("jobs stopped")
+
+    monkeypatch.setattr(main, "health_prober", _prober(probe))
+    monkeypatch.setattr(main.job_queue, "start", lambda: events.append("jobs started"))
+    monkeypatch.setattr(main.job_queue, "stop", stop_jobs)
+    monkeypatch.setattr(main, "shutdown_pool", lambda: events.append("pool shut down"))
+    with TestClient(main.app) as client:
+        assert events[0] == "jobs started"
+        # The first probe runs in the background once startup is done
+        for _ in range(50):
+            if client.get("/health").json()["status"] != "unknown":
+                break
+            time.sleep(0.01)
+        assert client.get("/health").json()["status"] == "healthy"
+    assert events == ["jobs started", "probed", "jobs stopped", "pool shut down"]
+
+
+def test_recent_traffic_skips_the_probe():
+    async def probe():
+        raise AssertionError("probe should be skipped")
+
+    prober = _prober(probe, last_traffic=time.time)
+    state = asyncio.run(prober.probe_once())
+    assert state["last_probe_source"] == "traffic" and prober.ready()
+
+
+def test_health_status_follows_the_prober(monkeypatch):
+    async def failing():
+        return False
+
+    prober = _prober(failing)
+    monkeypatch.setattr(prober, "start", lambda: None)
+    monkeypatch.setattr(main, "health_prober", prober)
+    client = TestClient(main.app)
+
+    assert client.get("/health").json()["status"] == "unknown"
+    asyncio.run(prober.probe_once())
+    body = client.get("/health").json()
+    assert body["status"] == "degraded" and body["gemini_ai"] == "disconnected"
+    assert client.get("/health/ready").status_code == 503
+
+    prober._record(True, time.time(), 1.0, "probe", None)
+    assert client.get("/health").json()["status"] == "healthy"
+    assert client.get("/health/ready").status_code == 200
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+from core import jd_prep, screening
+from core.jd_prep import extract_requirements, normalize_jd_text, prepare_jd
+from core.screening import screen_resume_bytes
+from tests.conftest import SAMPLE_JD
+
+JD = """Senior Backend Engineer
+ABOUT US
+We are a friendly team.
+REQUIREMENTS
+- Python
+- PostgreSQL
+* 5+ years of experience
+NICE TO HAVE
+1. Kubernetes
+BENEFITS
+- Free lunch
+"""
+
+
+def test_normalization_ignores_case_and_whitespace():
+    assert normalize_jd_text("  Python\n\nDeveloper\t") == "python developer"
+    assert prepare_jd("Python  Developer").digest == prepare_jd("python developer\n").digest
+
+
+def test_requirements_come_from_requirement_sections():
+    assert extract_requirements(JD) == ["Python", "PostgreSQL", "5+ years of experience", "Kubernetes"]
+
+
+def test_labeled_requirement_lines_count():
+    assert extract_requirements("Backend role\nRequired skills: Python, SQL\nPerks: snacks") == ["Python, SQL"]
+
+
+def test_bullets_are_used_without_requirement_sections():
+    assert extract_requirements("We want\n- Go\n- gRPC") == ["Go", "gRPC"]
+
+
+def test_prepared_jd_is_memoized():
+    jd_prep.prepare_jd.cache_clear()
+    first = prepare_jd(JD)
+    assert prepare_jd(JD) is first
+    assert jd_prep.get_stats()["hits"] == 1
+
+
+def test_jd_is_prepared_while_the_resume_is_processed(fake_llm, make_pdf, monkeypatch):
+    jd_prep.prepare_jd.cache_clear()
+    real_prepare = jd_prep.prepare_jd
+
+    def slow_prepare(jd_text):
+        time.sleep(0.1)
+        return real_prepare(jd_text)
+
+    real_extract = screening.extract_resume
+
+    async def slow_extract(resume_text, cache_key):
+        await asyncio.sleep(0.1)
+        return await real_extract(resume_text, cache_key)
+
+    monkeypatch.setattr(screening, "prepare_jd", slow_prepare)
+    monkeypatch.setattr(screening, "extract_resume", slow_extract)
+    result = asyncio.run(screen_resume_bytes(make_pdf(["Ada Example", "Python"]), SAMPLE_JD))
+    assert result["match_score"] == 72
+    stages = result["timings"]["stages"]
+    # Preparing the JD overlapped parsing and extraction instead of adding to them
+    assert stages["jd_prepare"]["start_ms"] < stages["extract"]["end_ms"]
+    assert stages["jd_prepare"]["end_ms"] <= stages["compare"]["start_ms"]
+    assert "jd_prepare" not in result["timings"]["critical_path"]
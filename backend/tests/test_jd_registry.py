@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import pytest
+
+from core import jd_registry as registry_module
+from core.jd_registry import JDRegistry, register_job_description, render_requirements
+from tests.conftest import SAMPLE_JD
+
+REQUIREMENTS = {"title": "Backend Engineer", "seniority": "senior", "required_skills": ["Python"],
+                "preferred_skills": [], "min_experience_years": 3, "education": [], "responsibilities": []}
+
+
+@pytest.fixture
+def registry(monkeypatch) -> JDRegistry:
+    """Register job descriptions in a fresh in-memory registry."""
+    fresh = JDRegistry(":memory:")
+    monkeypatch.setattr(registry_module, "jd_registry", fresh)
+    return fresh
+
+
+@pytest.mark.parametrize("years, line", [(3, "Minimum experience: 3 years"), ("2.5", "Minimum experience: 2.5 years"),
+                                         ("5+", None), ("3-5", None), (None, None)])
+def test_render_requirements_skips_non_numeric_years(years, line):
+    text = render_requirements({**REQUIREMENTS, "min_experience_years": years})
+    assert "Required skills: Python" in text
+    if line is None:
+        assert "Minimum experience" not in text
+    else:
+        assert line in text
+
+
+def test_add_versions_and_dedupes_by_text(registry):
+    record, created = registry.add(SAMPLE_JD, REQUIREMENTS)
+    assert created and record["version"] == 1
+
+    again, created = registry.add(SAMPLE_JD, REQUIREMENTS)
+    assert not created and again["id"] == record["id"]
+
+    updated, created = registry.add(SAMPLE_JD + "\n- Docker", REQUIREMENTS, record["id"])
+    assert created and updated["version"] == 2
+    assert registry.add(SAMPLE_JD + "\n- Docker", REQUIREMENTS, record["id"]) == (updated, False)
+    assert registry.get(record["id"])["version"] == 2
+    assert registry.get(record["id"], 1)["jd_hash"] == record["jd_hash"]
+    assert registry.find_by_hash(record["jd_hash"])["id"] == record["id"]
+
+
+def test_register_reuses_known_text(fake_llm, registry):
+    record, created = asyncio.run(register_job_description(SAMPLE_JD))
+    assert created
+    assert asyncio.run(register_job_description(SAMPLE_JD)) == (record, False)
+    assert fake_llm.calls == ["extract_jd"]
+
+
+def test_register_unknown_id_raises(fake_llm, registry):
+    with pytest.raises(KeyError):
+        asyncio.run(register_job_description(SAMPLE_JD, "missing"))
+    assert fake_llm.calls == []
+
+
+def test_concurrent_registrations_store_one_record(fake_llm, registry):
+    def slow_extract(prompt):
+        time.sleep(0.1)
+        return REQUIREMENTS
+
+    fake_llm.replies["extract_jd"] = slow_extract
+
+    async def main():
+        return await asyncio.gather(*(register_job_description(SAMPLE_JD) for _ in range(4)))
+
+    results = asyncio.run(main())
+    assert fake_llm.calls == ["extract_jd"]
+    assert sum(created for _, created in results) == 1
+    assert {record["id"] for record, _ in results} == {results[0][0]["id"]}
+    assert len(registry.list_latest()) == 1
+
+
+def test_concurrent_new_versions_get_one_version(fake_llm, registry):
+    record, _ = registry.add(SAMPLE_JD, REQUIREMENTS)
+    fake_llm.replies["extract_jd"] = lambda prompt: time.sleep(0.1) or REQUIREMENTS
+
+    async def main():
+        return await asyncio.gather(*(register_job_description(SAMPLE_JD + "\n- Go", record["id"]) for _ in range(3)))
+
+    results = asyncio.run(main())
+    assert sum(created for _, created in results) == 1
+    assert {stored["version"] for stored, _ in results} == {2}
+    assert registry.get(record["id"])["version"] == 2
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from core import jobs
+from core.jobs import JobQueue, MemoryJobStore, QueueFullError, SQLiteJobStore, check_webhook_url
+
+
+def _resolves_to(monkeypatch, address):
+    def fake_getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port or 0))]
+    monkeypatch.setattr(jobs.socket, "getaddrinfo", fake_getaddrinfo)
+
+
+async def _echo(params, data):
+    await asyncio.sleep(0)
+    if params.get("fail"):
+        raise RuntimeError("handler failed")
+    return {"size": len(data), **params}
+
+
+async def _wait_finished(queue, job_id):
+    for _ in range(200):
+        job = queue.get(job_id)
+        if job["status"] in ("succeeded", "failed") and (not job["webhook_url"] or job["webhook_status"] != "pending"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+@pytest.mark.parametrize("store_factory", [MemoryJobStore, lambda: SQLiteJobStore(":memory:")])
+def test_jobs_run_and_report_results(store_factory):
+    async def main():
+        queue = JobQueue(store_factory(), {"echo": _echo}, workers=2)
+        ok = await queue.submit("echo", {"n": 1}, b"abc")
+        failed = await queue.submit("echo", {"fail": True})
+        results = [await _wait_finished(queue, ok["id"]), await _wait_finished(queue, failed["id"])]
+        await queue.stop()
+        return queue, results
+
+    queue, (ok, failed) = asyncio.run(main())
+    assert ok["status"] == "succeeded" and ok["result"] == {"size": 3, "n": 1}
+    assert failed["status"] == "failed" and failed["error"]["stage"] == "unknown"
+    assert queue.store.payload(ok["id"]) is None
+    assert queue.queued_bytes() == 0
+
+
+def test_queue_bounds_jobs_and_bytes():
+    async def main():
+        queue = JobQueue(MemoryJobStore(), {"echo": _echo}, workers=0, max_size=3, max_bytes=10)
+        await queue.submit("echo", {}, b"x" * 6)
+        with pytest.raises(QueueFullError, match="MB of uploads"):
+            await queue.submit("echo", {}, b"x" * 5)
+        await queue.submit("echo", {}, b"x" * 4)
+        await queue.submit("echo", {})
+        with pytest.raises(QueueFullError, match="3 jobs"):
+            await queue.submit("echo", {})
+        assert queue.get_stats()["queued_bytes"] == 10
+        await queue.stop()
+
+    asyncio.run(main())
+
+
+def test_unfinished_jobs_resume_from_sqlite(tmp_path):
+    path = str(tmp_path / "jobs.db")
+
+    async def submit():
+        queue = JobQueue(SQLiteJobStore(path), {"echo": _echo}, workers=0)
+        job = await queue.submit("echo", {"n": 2}, b"pdf")
+        await queue.stop()
+        return job["id"]
+
+    async def resume(job_id):
+        queue = JobQueue(SQLiteJobStore(path), {"echo": _echo}, workers=1)
+        queue.start()
+        job = await _wait_finished(queue, job_id)
+        await queue.stop()
+        return job
+
+    job_id = asyncio.run(submit())
+    assert asyncio.run(resume(job_id))["result"] == {"size": 3, "n": 2}
+
+
+@pytest.mark.parametrize("address", ["127.0.0.1", "10.0.0.5", "169.254.169.254", "::1", "fe80::1", "0.0.0.0"])
+def test_webhooks_to_internal_addresses_are_refused(monkeypatch, address):
+    _resolves_to(monkeypatch, address)
+    with pytest.raises(ValueError, match="non-public"):
+        check_webhook_url("https://hooks.example.com/notify")
+
+
+def test_webhook_url_checks(monkeypatch):
+    _resolves_to(monkeypatch, "93.184.216.34")
+    check_webhook_url("https://hooks.example.com/notify")
+    with pytest.raises(ValueError, match="http or https"):
+        check_webhook_url("file:///etc/passwd")
+    monkeypatch.setattr(jobs, "JOB_WEBHOOK_ALLOWED_HOSTS", [".example.com"])
+    check_webhook_url("https://hooks.example.com/notify")
+    with pytest.raises(ValueError, match="not allowed"):
+        check_webhook_url("https://example.org/notify")
+
+
+def test_submit_rejects_internal_webhooks(monkeypatch):
+    _resolves_to(monkeypatch, "127.0.0.1")
+
+    async def main():
+        queue = JobQueue(MemoryJobStore(), {"echo": _echo}, workers=0)
+        with pytest.raises(ValueError):
+            await queue.submit("echo", {}, webhook_url="http://localhost:8000/admin")
+        await queue.stop()
+
+    asyncio.run(main())
+
+
+class _Receiver(BaseHTTPRequestHandler):
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == "/redirect":
+            self.send_response(307)
+            self.send_header("Location", "/hook")
+        else:
+            _Receiver.received.append((self.path, json.loads(body)))
+            self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def receiver(monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_WEBHOOK_ALLOW_PRIVATE", True)
+    monkeypatch.setattr(jobs, "JOB_WEBHOOK_RETRIES", 1)
+    _Receiver.received = []
+    server = HTTPServer(("127.0.0.1", 0), _Receiver)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_webhook_is_delivered_without_following_redirects(receiver):
+    async def main():
+        queue = JobQueue(MemoryJobStore(), {"echo": _echo}, workers=1)
+        delivered = await queue.submit("echo", {"n": 3}, webhook_url=receiver + "/hook")
+        redirected = await queue.submit("echo", {"n": 4}, webhook_url=receiver + "/redirect")
+        results = [await _wait_finished(queue, delivered["id"]), await _wait_finished(queue, redirected["id"])]
+        await queue.stop()
+        return results
+
+    delivered, redirected = asyncio.run(main())
+    assert delivered["webhook_status"] == "delivered"
+    assert redirected["webhook_status"] == "failed"
+    assert [(path, body["result"]["n"]) for path, body in _Receiver.received] == [("/hook", 3)]
@@ -0,0 +1,87 @@
+import pytest
+
+from core.json_repair import (
+    JSONRepairError,
+    parse_json_array_items,
+    parse_json_tolerant,
+    repair_json_text,
+    strip_code_fences,
+)
+from core.llm_extractor import compare_resume_to_jd, parse_match_reply
+from tests.conftest import SAMPLE_JD, SAMPLE_RESUME
+
+
+def test_strict_json_needs_no_repair():
+    assert parse_json_tolerant('{"a": 1}') == ({"a": 1}, False)
+
+
+def test_fences_and_prose_are_ignored():
+    assert strip_code_fences('```json\n{"a": 1}\n```') == '{"a": 1}'
+    assert parse_json_tolerant('Here you go:\n```json\n{"a": [1, 2]}\n```\nThanks') == ({"a": [1, 2]}, False)
+
+
+@pytest.mark.parametrize("reply, expected", [
+    ('{"a": 1, "b": [1, 2,],}', {"a": 1, "b": [1, 2]}),
+    ('{"summary": "line one\nline two"}', {"summary": "line one\nline two"}),
+    ('{"a": 1, "b": "cut off', {"a": 1, "b": "cut off"}),
+    ('{"a": 1, "b": {"c": [1, 2', {"a": 1, "b": {"c": [1, 2]}}),
+    ('{"a": 1, "dangling":', {"a": 1}),
+    ('{"a": 1, "dangling"', {"a": 1}),
+])
+def test_local_repairs(reply, expected):
+    assert parse_json_tolerant(reply) == (expected, True)
+
+
+def test_brackets_inside_strings_do_not_confuse_the_scan():
+    assert parse_json_tolerant('{"a": "}{][", "b": "\\"q\\""} trailing') == ({"a": "}{][", "b": '"q"'}, False)
+
+
+def test_unrepairable_reply_raises_with_fragment():
+    with pytest.raises(JSONRepairError) as excinfo:
+        parse_json_tolerant('prefix {"a": nope}')
+    assert excinfo.value.fragment == '{"a": nope}'
+    with pytest.raises(JSONRepairError, match="No JSON object"):
+        parse_json_tolerant("no json here")
+
+
+def test_repair_closes_open_brackets():
+    assert repair_json_text('[{"a": 1}, {"b": 2') == '[{"a": 1}, {"b": 2}]'
+
+
+def test_array_items_are_salvaged_one_by_one():
+    items, broken = parse_json_array_items('[{"id": 1}, {"id": oops}, {"id": 3,}, {"id": 4')
+    assert items == [{"id": 1}, {"id": 3}, {"id": 4}]
+    assert broken == ['{"id": oops}']
+
+
+def test_broken_reply_is_repaired_with_a_fragment_only_re_ask(fake_llm):
+    fake_llm.replies["compare"] = '{"match_score": 64, "match_summary": oops}'
+    fake_llm.replies["repair"] = '{"match_score": 64, "match_summary": "fixed"}'
+    result = compare_resume_to_jd(SAMPLE_RESUME, SAMPLE_JD)
+    assert result["match_summary"] == "fixed"
+    assert fake_llm.calls == ["compare", "repair"]
+    # The re-ask carries the broken fragment, not the resume or JD
+    assert "Backend Engineer" not in fake_llm.prompts[1]
+    assert "oops" in fake_llm.prompts[1]
+
+
+def test_truncated_reply_is_fixed_locally(fake_llm):
+    fake_llm.replies["compare"] = '{"match_score": 81, "match_summary": "Strong fit'
+    assert compare_resume_to_jd(SAMPLE_RESUME, SAMPLE_JD)["match_score"] == 81
+    assert fake_llm.calls == ["compare"]
+
+
+def test_truncated_reply_without_a_score_is_not_defaulted(fake_llm):
+    fake_llm.replies["compare"] = '{"match_summary": "Strong Py'
+    with pytest.raises(Exception, match="missing match_score"):
+        compare_resume_to_jd(SAMPLE_RESUME, SAMPLE_JD)
+
+
+def test_failed_repair_raises(fake_llm):
+    fake_llm.replies["repair"] = "still broken"
+    with pytest.raises(Exception, match="parse AI response"):
+        parse_match_reply('{"match_score": nope}')
+
+
+def test_scores_are_clamped():
+    assert parse_match_reply('{"match_score": 140}')["match_score"] == 100
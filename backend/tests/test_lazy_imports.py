@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.bench_cold_start import BACKEND_DIR, LAZY_MODULES, child_env, cold_start
+from core import llm_registry
+
+API_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "api")
+
+
+def _loaded_after(code, app_dir=BACKEND_DIR):
+    # Modules from LAZY_MODULES loaded by code, run in a fresh interpreter without GEMINI_API_KEY
+    script = f"import sys\n{code}\nprint(sorted(name for name in sys.modules if name in {LAZY_MODULES!r}))"
+    output = subprocess.run([sys.executable, "-c", script], cwd=app_dir, env=child_env(app_dir),
+                            capture_output=True, text=True, check=True).stdout
+    return output.strip().splitlines()[-1]
+
+
+def test_app_serves_without_heavy_imports_or_api_key():
+    run = cold_start(BACKEND_DIR)
+    assert run["lazy_loaded"] == []
+    assert run["root"][0] == 200 and run["health"][0] == 200
+
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(API_DIR, "main.py")), reason="no api/ copy")
+def test_serverless_copy_imports_lazily():
+    assert _loaded_after("import main", API_DIR) == "[]"
+
+
+def test_heavy_modules_load_on_first_use(make_pdf, tmp_path):
+    assert _loaded_after("import core.parser, core.pdf_engine, core.llm_registry") == "[]"
+    assert _loaded_after("import core.embeddings") == "['numpy']"
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(make_pdf(["Ada Example", "Python"]))
+    assert _loaded_after(f"from core.parser import parse_pdf; parse_pdf(open({str(path)!r}, 'rb').read())") == "['pypdf']"
+
+
+def test_missing_api_key_fails_on_first_call_not_import(monkeypatch):
+    monkeypatch.setattr(llm_registry, "_api_key", None)
+    monkeypatch.setattr(llm_registry, "_genai", None)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    with pytest.raises(ValueError, match="GEMINI_API_KEY"):
+        llm_registry.get_model()
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core import llm_client
+from tests.conftest import SAMPLE_JD, SAMPLE_MATCH, SAMPLE_RESUME
+
+
+def test_blocking_calls_run_off_the_event_loop():
+    loop_thread = []
+
+    def blocking(value):
+        loop_thread.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return value
+
+    async def main():
+        started = time.perf_counter()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while time.perf_counter() - started < 0.15:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        results = await asyncio.gather(*(llm_client.run_llm_call(blocking, i) for i in range(8)), ticker())
+        return results[:8], time.perf_counter() - started, ticks
+
+    results, elapsed, ticks = asyncio.run(main())
+    assert results == list(range(8))
+    # Eight 0.2s calls overlap on the pool, and the loop kept running meanwhile
+    assert elapsed < 0.8
+    assert ticks > 5
+    assert all(name.startswith("llm") for name in loop_thread)
+    assert llm_client.get_stats()["in_flight"] == 0
+
+
+def test_run_llm_call_propagates_errors():
+    def failing():
+        raise RuntimeError("quota exceeded")
+
+    with pytest.raises(RuntimeError, match="quota exceeded"):
+        asyncio.run(llm_client.run_llm_call(failing))
+    assert llm_client.get_stats()["in_flight"] == 0
+
+
+def test_stream_llm_call_yields_items_then_raises():
+    def produce():
+        yield "a"
+        yield "b"
+        raise ValueError("stream broke")
+
+    async def main():
+        items = []
+        with pytest.raises(ValueError, match="stream broke"):
+            async for item in llm_client.stream_llm_call(produce):
+                items.append(item)
+        return items
+
+    assert asyncio.run(main()) == ["a", "b"]
+
+
+def test_async_wrappers_use_the_llm(fake_llm):
+    assert asyncio.run(llm_client.extract_resume_data_async("Ada Example\nPython"))["skills"] == SAMPLE_RESUME["skills"]
+    result = asyncio.run(llm_client.compare_resume_to_jd_async(SAMPLE_RESUME, SAMPLE_JD))
+    assert result["match_score"] == SAMPLE_MATCH["match_score"]
+    assert fake_llm.calls == ["extract", "compare"]
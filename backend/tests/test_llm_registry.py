@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import pytest
+
+from core import llm_registry
+
+
+class FakeGenAI:
+    def __init__(self):
+        self.created = []
+
+    def GenerativeModel(self, model_name, generation_config=None):
+        model = SimpleNamespace(name=model_name, config=generation_config)
+        self.created.append(model)
+        return model
+
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    genai = FakeGenAI()
+    monkeypatch.setattr(llm_registry, "_models", {})
+    monkeypatch.setattr(llm_registry, "_load_client", lambda: genai)
+    monkeypatch.setattr(llm_registry, "_mount_http_pool", lambda: None)
+    return genai
+
+
+@pytest.fixture
+def echo_backend(monkeypatch):
+    class EchoBackend:
+        name = "echo"
+
+        def generate(self, prompt, generation_config, call, **kwargs):
+            if prompt == "fail":
+                raise RuntimeError("backend down")
+            return SimpleNamespace(text=prompt.upper())
+
+        def stream(self, prompt, generation_config, call):
+            for word in prompt.split():
+                yield SimpleNamespace(text=word)
+
+    monkeypatch.setattr(llm_registry, "_backend_factories", dict(llm_registry._backend_factories))
+    monkeypatch.setattr(llm_registry, "LLM_BACKEND", "echo")
+    monkeypatch.setattr(llm_registry, "_backend", None)
+    llm_registry.register_backend("echo", EchoBackend)
+
+
+def test_models_are_created_once_per_config(fake_genai):
+    first = llm_registry.get_model()
+    assert llm_registry.get_model() is first
+    json_model = llm_registry.get_model({"response_mime_type": "application/json"})
+    assert json_model is not first
+    assert llm_registry.get_model({"response_mime_type": "application/json"}) is json_model
+    assert len(fake_genai.created) == 2
+    assert json_model.config["response_mime_type"] == "application/json"
+
+
+def test_missing_api_key_is_reported(monkeypatch):
+    monkeypatch.setattr(llm_registry, "_models", {})
+    monkeypatch.setattr(llm_registry, "_genai", None)
+    monkeypatch.setattr(llm_registry, "_api_key", None)
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    with pytest.raises(ValueError, match="GEMINI_API_KEY"):
+        llm_registry.get_model()
+
+
+def test_unknown_backend_is_rejected(monkeypatch):
+    monkeypatch.setattr(llm_registry, "LLM_BACKEND", "nope")
+    monkeypatch.setattr(llm_registry, "_backend", None)
+    with pytest.raises(ValueError, match="Unknown LLM_BACKEND"):
+        llm_registry.get_backend()
+
+
+def test_calls_go_through_the_selected_backend(echo_backend):
+    calls = llm_registry.get_stats()["calls"]
+    assert llm_registry.generate_content("hello", call="extract").text == "HELLO"
+    assert [chunk.text for chunk in llm_registry.stream_content("a b c", call="compare_stream")] == ["a", "b", "c"]
+    stats = llm_registry.get_stats()
+    assert stats["backend"] == "echo"
+    assert stats["calls"] == calls + 2
+    assert stats["in_flight"] == 0
+
+
+def test_failed_calls_are_counted(echo_backend):
+    errors = llm_registry.get_stats()["errors"]
+    before = llm_registry.LLM_CALL_ERRORS.value(call="extract", error="RuntimeError")
+    with pytest.raises(RuntimeError):
+        llm_registry.generate_content("fail", call="extract")
+    assert llm_registry.get_stats()["errors"] == errors + 1
+    assert llm_registry.LLM_CALL_ERRORS.value(call="extract", error="RuntimeError") == before + 1
+    assert llm_registry.get_stats()["in_flight"] == 0
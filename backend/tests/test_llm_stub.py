@@ -0,0 +1,117 @@
+import json
+import random
+import time
+
+import pytest
+
+from core import llm_registry
+from core.llm_extractor import (
+    compare_resume_to_jd,
+    compare_resumes_to_jd_batch,
+    extract_jd_requirements,
+    extract_resume_data,
+    parse_match_reply,
+    stream_resume_to_jd_comparison,
+)
+from core.llm_stub import STREAM_CHUNKS, StubBackend, StubServiceUnavailable, fake_match, parse_latency
+from tests.conftest import SAMPLE_JD, SAMPLE_RESUME
+
+RESUME_TEXT = "Ada Example\nSenior Backend Engineer at Acme\nPython, Docker and PostgreSQL\nBSc, University of Leeds"
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Install a fast stub backend; call stub(**settings) to replace it."""
+    def install(**settings):
+        backend = StubBackend(**{"latency": "fixed:0", "seed": 7, **settings})
+        monkeypatch.setattr(llm_registry, "_backend", backend)
+        return backend
+
+    install()
+    return install
+
+
+@pytest.mark.parametrize("spec, low, high", [
+    ("fixed:0.5", 0.5, 0.5),
+    ("uniform:1,2", 1, 2),
+    ("normal:1,0.1", 0.2, 1.8),
+    ("lognormal:1,0.35", 0.1, 10),
+])
+def test_parse_latency(spec, low, high):
+    draw = parse_latency(spec)
+    rng = random.Random(1)
+    assert all(low <= draw(rng) <= high for _ in range(100))
+
+
+@pytest.mark.parametrize("spec", ["fixed", "uniform:1", "gamma:1,2", "normal:a,b", "lognormal:0,1"])
+def test_parse_latency_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        parse_latency(spec)
+
+
+def test_pipeline_calls_get_deterministic_replies(stub):
+    resume = extract_resume_data(RESUME_TEXT)
+    assert resume["skills"] == ["Python", "Docker", "PostgreSQL"]
+    assert resume["previous_roles"] == ["Senior Backend Engineer at Acme"]
+    assert extract_resume_data(RESUME_TEXT) == resume
+
+    match = compare_resume_to_jd(SAMPLE_RESUME, SAMPLE_JD)
+    assert match["skill_matches"] == ["Python", "PostgreSQL"] and match["skill_gaps"] == []
+    assert compare_resume_to_jd(SAMPLE_RESUME, SAMPLE_JD)["match_score"] == match["match_score"]
+    assert extract_jd_requirements(SAMPLE_JD)["required_skills"] == ["Python", "PostgreSQL"]
+
+    batch = compare_resumes_to_jd_batch([SAMPLE_RESUME, {**SAMPLE_RESUME, "skills": ["Excel"]}], SAMPLE_JD)
+    assert batch[0]["match_score"] > batch[1]["match_score"]
+
+
+def test_score_follows_shared_skills():
+    strong = fake_match(json.dumps(SAMPLE_RESUME), SAMPLE_JD)
+    weak = fake_match(json.dumps({**SAMPLE_RESUME, "skills": ["Excel"]}), SAMPLE_JD)
+    assert strong["match_score"] >= 90 > 40 > weak["match_score"] >= 30
+
+
+def test_injected_failures_raise(stub):
+    backend = stub(error_rate=1.0)
+    with pytest.raises(StubServiceUnavailable, match="503"):
+        backend.generate("prompt", None, "compare")
+    # The pipeline reports it like a Gemini error
+    with pytest.raises(Exception, match="503 Service Unavailable"):
+        compare_resume_to_jd(SAMPLE_RESUME, SAMPLE_JD)
+
+
+def test_malformed_replies_are_parsed_by_the_tolerant_parser(stub):
+    stub(malformed_rate=1.0)
+    assert compare_resume_to_jd(SAMPLE_RESUME, SAMPLE_JD)["skill_matches"] == ["Python", "PostgreSQL"]
+
+
+def test_per_call_overrides(stub):
+    stub(overrides={"extract_jd": {"reply": {"title": "Canned", "seniority": "junior", "required_skills": [],
+                                             "preferred_skills": [], "min_experience_years": 1, "education": [],
+                                             "responsibilities": []}},
+                    "compare": {"error_rate": 1.0}})
+    assert extract_jd_requirements(SAMPLE_JD)["title"] == "Canned"
+    with pytest.raises(Exception, match="simulated compare failure"):
+        compare_resume_to_jd(SAMPLE_RESUME, SAMPLE_JD)
+    assert extract_resume_data(RESUME_TEXT)["skills"]
+
+
+def test_stream_spreads_chunks_over_the_latency(stub):
+    backend = stub(latency="fixed:0.2")
+    started = time.perf_counter()
+    chunks = list(backend.stream("Resume Data: {}\nJob Description: Python\nProvide your analysis", None,
+                                 "compare_stream"))
+    elapsed = time.perf_counter() - started
+    assert len(chunks) == STREAM_CHUNKS
+    assert 0.18 <= elapsed < 1
+    assert all(chunk.usage_metadata is None for chunk in chunks[:-1])
+    assert chunks[-1].usage_metadata.candidates_token_count > 0
+
+    stub()
+    reply = "".join(stream_resume_to_jd_comparison(SAMPLE_RESUME, SAMPLE_JD))
+    assert parse_match_reply(reply)["skill_matches"] == ["Python", "PostgreSQL"]
+
+
+def test_seeded_stubs_draw_the_same_latencies():
+    first, second = (StubBackend(latency="uniform:0,1", error_rate=0.5, seed=3) for _ in range(2))
+    settings = first._default
+    assert [first._draw(settings) for _ in range(20)] == [second._draw(settings) for _ in range(20)]
@@ -0,0 +1,69 @@
+import re
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from core.metrics import Counter, Gauge, Histogram
+from core.timings import StageTimings
+from tests.conftest import SAMPLE_JD
+
+
+def test_counter_and_gauge_exposition():
+    requests = Counter("demo_requests_total", "Demo requests", ["route"])
+    requests.inc(route="/a")
+    requests.inc(2, route='/b"x')
+    assert requests.render() == [
+        "# HELP demo_requests_total Demo requests",
+        "# TYPE demo_requests_total counter",
+        'demo_requests_total{route="/a"} 1',
+        'demo_requests_total{route="/b\\"x"} 2',
+    ]
+    depth = Gauge("demo_depth", "Demo depth")
+    depth.inc(3)
+    depth.dec()
+    assert depth.render()[-1] == "demo_depth 2"
+
+
+def test_histogram_buckets_are_cumulative():
+    latency = Histogram("demo_seconds", "Demo latency", ["stage"], buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.observe(value, stage="parse")
+    assert latency.render()[2:] == [
+        'demo_seconds_bucket{stage="parse",le="0.1"} 2',
+        'demo_seconds_bucket{stage="parse",le="1"} 3',
+        'demo_seconds_bucket{stage="parse",le="+Inf"} 4',
+        'demo_seconds_sum{stage="parse"} 3.65',
+        'demo_seconds_count{stage="parse"} 4',
+    ]
+    assert latency.count(stage="parse") == 4 and latency.total(stage="parse") == pytest.approx(3.65)
+
+
+def test_stage_timings_render_server_timing():
+    timings = StageTimings()
+    with timings.stage("parse"):
+        time.sleep(0.01)
+    header = timings.server_timing()
+    assert re.fullmatch(r"parse;dur=\d+\.\d, total;dur=\d+\.\d", header)
+    assert float(header.split("dur=")[1].split(",")[0]) >= 10
+
+
+def test_metrics_endpoint_and_server_timing_header(fake_llm, make_pdf):
+    client = TestClient(main.app)
+    response = client.post("/screen-resume", files={"resume_file": ("r.pdf", make_pdf(["Ada Example", "Python"]),
+                                                                    "application/pdf")},
+                           data={"jd_text": SAMPLE_JD})
+    assert response.status_code == 200
+    stages = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    assert stages[0] == "validate" and stages[-1] == "total"
+    assert {"parse", "extract", "prescore"} <= set(stages)
+
+    metrics = client.get("/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE pipeline_stage_seconds histogram" in metrics.text
+    assert re.search(r'^pipeline_stage_seconds_count\{stage="parse"\} [1-9]', metrics.text, re.MULTILINE)
+    assert re.search(r'^http_request_seconds_count\{method="POST",route="/screen-resume",status="200"\} [1-9]',
+                     metrics.text, re.MULTILINE)
+    assert "server-timing" in metrics.headers
+
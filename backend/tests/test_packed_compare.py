@@ -0,0 +1,84 @@
+import asyncio
+import re
+
+from core.cache import match_cache_key, match_result_cache
+from core.llm_client import BATCH_FALLBACKS, compare_resumes_to_jd_batched
+from core.llm_extractor import compact_resume_record, compare_resumes_to_jd_batch, plan_comparison_batches
+from tests.conftest import SAMPLE_JD, SAMPLE_RESUME
+
+
+def _records(count):
+    return [{**SAMPLE_RESUME, "key_achievements": [f"Achievement {i}"]} for i in range(count)]
+
+
+def _batch_reply(skip=()):
+    def reply(prompt):
+        ids = re.findall(r'"candidate_id":"(\d+)"', prompt)
+        return [{"candidate_id": i, "match_score": 50 + int(i), "match_summary": f"Candidate {i}"}
+                for i in ids if int(i) not in skip]
+    return reply
+
+
+def test_compact_record_drops_contact_details():
+    record = compact_resume_record(SAMPLE_RESUME)
+    assert "contact_info" not in record
+    assert record["skills"] == SAMPLE_RESUME["skills"]
+
+
+def test_plan_respects_size_and_token_budget():
+    records = _records(7)
+    assert plan_comparison_batches(records, SAMPLE_JD, token_budget=10 ** 6, max_batch_size=3) == [
+        [0, 1, 2], [3, 4, 5], [6]
+    ]
+    # A budget below one record still makes progress, one candidate per batch
+    assert plan_comparison_batches(records, SAMPLE_JD, token_budget=1, max_batch_size=10) == [[i] for i in range(7)]
+
+
+def test_batch_reply_is_mapped_back_by_candidate_id(fake_llm):
+    fake_llm.replies["compare_batch"] = lambda prompt: list(reversed(_batch_reply(skip={1})(prompt)))
+    results = compare_resumes_to_jd_batch(_records(3), SAMPLE_JD)
+    assert [r and r["match_score"] for r in results] == [50, None, 52]
+    assert "ada@example.com" not in fake_llm.prompts[0]
+
+
+def test_batched_comparison_falls_back_for_missing_candidates(fake_llm):
+    fake_llm.replies["compare_batch"] = _batch_reply(skip={2})
+    records = _records(3)
+    before = BATCH_FALLBACKS.value(reason="missing")
+    results = asyncio.run(compare_resumes_to_jd_batched(records, SAMPLE_JD))
+    assert [r["match_score"] for r in results] == [50, 51, 72]
+    assert BATCH_FALLBACKS.value(reason="missing") == before + 1
+    assert fake_llm.calls == ["compare_batch", "compare"]
+    assert match_result_cache.get(match_cache_key(records[0], SAMPLE_JD))["match_score"] == 50
+
+
+def test_truncated_batch_element_falls_back_to_a_single_comparison(fake_llm):
+    fake_llm.replies["compare_batch"] = (
+        '[{"candidate_id":"0","match_score":50,"match_summary":"Candidate 0"},'
+        '{"candidate_id":"1","match_summary":"Strong Py'
+    )
+    records = _records(2)
+    assert compare_resumes_to_jd_batch(records, SAMPLE_JD)[1] is None
+    results = asyncio.run(compare_resumes_to_jd_batched(records, SAMPLE_JD))
+    assert [r["match_score"] for r in results] == [50, 72]
+    assert match_result_cache.get(match_cache_key(records[1], SAMPLE_JD))["match_score"] == 72
+
+
+def test_batched_comparison_reuses_cached_pairs(fake_llm):
+    records = _records(2)
+    match_result_cache.set(match_cache_key(records[0], SAMPLE_JD), {"match_score": 99, "match_summary": "cached"})
+    fake_llm.replies["compare_batch"] = _batch_reply()
+    results = asyncio.run(compare_resumes_to_jd_batched(records, SAMPLE_JD))
+    assert [r["match_score"] for r in results] == [99, 50]
+    assert re.findall(r'"candidate_id":"(\d+)"', fake_llm.prompts[0]) == ["0"]
+
+
+def test_failed_batch_falls_back_to_single_calls(fake_llm, caplog):
+    fake_llm.replies["compare_batch"] = "not json at all"
+    fake_llm.replies["repair"] = "still not json"
+    before = BATCH_FALLBACKS.value(reason="error")
+    results = asyncio.run(compare_resumes_to_jd_batched(_records(2), SAMPLE_JD))
+    assert [r["match_score"] for r in results] == [72, 72]
+    assert fake_llm.calls.count("compare") == 2
+    assert BATCH_FALLBACKS.value(reason="error") == before + 2
+    assert "Packed comparison of 2 candidates failed" in caplog.text
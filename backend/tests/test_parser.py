@@ -0,0 +1,45 @@
+import pypdf
+import pytest
+
+from core.parser import parse_pdf, parse_pdf_to_text, pdf_result_to_text, validate_pdf_file
+
+
+def test_parse_pdf_reads_pages_and_metadata(make_pdf):
+    result = parse_pdf(make_pdf(["Ada Example", "Python"], ["Experience", "Backend Engineer"]))
+    assert result.is_valid and result.page_count == 2
+    assert "Ada Example" in result.page_texts[0] and "Backend Engineer" in result.page_texts[1]
+    assert len(result.page_seconds) == 2 and result.page_errors == {}
+    assert isinstance(result.metadata, dict)
+
+
+def test_parse_pdf_builds_one_reader(make_pdf, monkeypatch):
+    readers = []
+    real_reader = pypdf.PdfReader
+
+    def counting_reader(*args, **kwargs):
+        readers.append(1)
+        return real_reader(*args, **kwargs)
+
+    monkeypatch.setattr(pypdf, "PdfReader", counting_reader)
+    result = parse_pdf(make_pdf(["Ada Example"]))
+    pdf_result_to_text(result)
+    assert len(readers) == 1
+
+
+def test_invalid_pdf_is_reported_not_raised():
+    result = parse_pdf(b"%PDF-1.4 truncated")
+    assert not result.is_valid and result.error
+    assert not validate_pdf_file(b"%PDF-1.4 truncated")
+    with pytest.raises(ValueError):
+        pdf_result_to_text(result)
+
+
+def test_pdf_without_text_is_rejected(make_pdf):
+    with pytest.raises(ValueError, match="No text"):
+        parse_pdf_to_text(make_pdf([""]))
+
+
+def test_parse_pdf_to_text_matches_parse_result(make_pdf):
+    pdf = make_pdf(["Ada Example", "Python"])
+    assert validate_pdf_file(pdf)
+    assert parse_pdf_to_text(pdf) == pdf_result_to_text(parse_pdf(pdf))
@@ -0,0 +1,104 @@
+import asyncio
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from core import pdf_engine
+from core.pdf_engine import PDFWorkerCrashError, extract_pdf
+
+
+class BrokenPool:
+    """Pool whose workers have died: every submission fails."""
+
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+class FakeProcess:
+    def __init__(self):
+        self.terminated = False
+
+    def terminate(self):
+        self.terminated = True
+
+
+class DrainingPool:
+    def __init__(self):
+        self.process = FakeProcess()
+        self._processes = {1: self.process}
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+@pytest.fixture
+def fresh_engine():
+    pdf_engine.shutdown_pool()
+    yield
+    pdf_engine.shutdown_pool()
+
+
+def test_extract_pdf_uses_the_pool(fresh_engine, make_pdf):
+    pages = [[f"Page {i} line"] for i in range(7)]
+    result = asyncio.run(extract_pdf(make_pdf(*pages)))
+    assert result.is_valid and result.page_count == 7
+    assert [text.strip() for text in result.page_texts] == [f"Page {i} line" for i in range(7)]
+
+
+def test_broken_pool_is_replaced_and_the_document_retried(fresh_engine, make_pdf):
+    broken = BrokenPool()
+    pdf_engine._pool = broken
+    crashes = pdf_engine.get_stats()["worker_crashes"]
+    result = asyncio.run(extract_pdf(make_pdf(["Ada Example"])))
+    assert result.is_valid
+    assert broken.shut_down
+    assert pdf_engine._pool is not broken
+    assert pdf_engine.get_stats()["worker_crashes"] == crashes + 1
+
+
+def test_document_crashing_twice_fails_alone(fresh_engine, monkeypatch):
+    monkeypatch.setattr(pdf_engine, "get_pool", BrokenPool)
+    with pytest.raises(PDFWorkerCrashError):
+        asyncio.run(extract_pdf(b"%PDF-1.4"))
+
+
+def test_retired_pool_waits_for_other_documents(fresh_engine):
+    pool = DrainingPool()
+    pdf_engine._pool = pool
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        hung, other = loop.create_future(), loop.create_future()
+        pdf_engine._pool_tasks[pool] = {hung, other}
+        pdf_engine._retire_pool(pool, [hung])
+        # New documents get a new pool while the old one drains
+        assert pdf_engine._pool is None
+        await asyncio.sleep(0.05)
+        assert not pool.process.terminated
+        other.set_result({})
+        await asyncio.sleep(0.05)
+        return pool.process.terminated
+
+    assert asyncio.run(main())
+    assert pool not in pdf_engine._pool_tasks
+
+
+def test_crash_maps_to_a_parse_error(monkeypatch):
+    from core.screening import ScreeningError, parse_resume_pdf
+
+    async def crash(file_bytes):
+        raise PDFWorkerCrashError("worker crashed")
+
+    monkeypatch.setattr("core.screening.extract_pdf", crash)
+    with pytest.raises(ScreeningError) as excinfo:
+        asyncio.run(parse_resume_pdf(b"%PDF-1.4"))
+    assert (excinfo.value.stage, excinfo.value.status_code) == ("parse", 422)
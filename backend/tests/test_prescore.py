@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from core import prescore
+from core.screening import compare_extracted, screen_resume_bytes, stream_screening
+from tests.conftest import SAMPLE_JD, SAMPLE_RESUME
+from tests.test_packed_compare import _batch_reply, _records
+
+
+def _compared() -> int:
+    return prescore.get_stats()["compared_with_llm"]
+
+
+@pytest.mark.parametrize("jd, years", [
+    ("Backend Engineer\n- 5+ years of experience with Python", 5),
+    ("Backend Engineer\n- 3-5 years' relevant professional experience", 3),
+    ("Backend Engineer\n- Experience: at least 4 years", 4),
+    ("Backend Engineer\n- 2 years experience\n- 6+ years of experience leading teams", 2),
+    ("Backend Engineer\nThis is a 1 year contract with a company founded 10 years ago\n- 4+ years of experience", 4),
+    ("Backend Engineer\nA 2 year contract; we have been in business 20 years", None),
+])
+def test_min_years_only_counts_experience_phrasing(jd, years):
+    assert prescore.build_jd_index(jd).min_years == years
+
+
+def test_experience_score_uses_required_years():
+    jd = "Backend Engineer\n- Python\n- 10 years of experience\nWe offer a 1 year contract"
+    result = prescore.prescore({**SAMPLE_RESUME, "experience_years": 5}, jd)
+    assert result.experience == 0.5
+
+
+def test_agreement_is_recorded_once_per_llm_call(fake_llm, make_pdf):
+    pdf = make_pdf(["Ada Example", "Python"])
+    before = _compared()
+    asyncio.run(screen_resume_bytes(pdf, SAMPLE_JD))
+    assert _compared() == before + 1
+    # The cached comparison is not a new data point
+    asyncio.run(screen_resume_bytes(pdf, SAMPLE_JD))
+    assert _compared() == before + 1
+    assert fake_llm.calls.count("compare") == 1
+
+
+def test_stream_records_agreement_for_fresh_comparisons_only(fake_llm, make_pdf):
+    async def collect(stream):
+        return [event async for event in stream]
+
+    pdf = make_pdf(["Ada Example", "Python"])
+    before = _compared()
+    asyncio.run(collect(stream_screening(pdf, SAMPLE_JD)))
+    asyncio.run(collect(stream_screening(pdf, SAMPLE_JD)))
+    assert _compared() == before + 1
+
+
+def test_batched_comparisons_record_agreement_for_fresh_pairs(fake_llm):
+    fake_llm.replies["compare_batch"] = _batch_reply(skip={2})
+    records = _records(3)
+    before = _compared()
+    asyncio.run(compare_extracted([(f"r{i}", record) for i, record in enumerate(records)], SAMPLE_JD))
+    # Two from the packed prompt and one from the individual fallback
+    assert _compared() == before + 3
+    asyncio.run(compare_extracted([("r0", records[0]), ("r3", _records(4)[3])], SAMPLE_JD))
+    assert _compared() == before + 4
@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from core.cache import SingleFlight, match_result_cache, match_single_flight
+from core.llm_client import compare_resume_to_jd_cached
+from tests.conftest import SAMPLE_JD, SAMPLE_MATCH, SAMPLE_RESUME
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 1}
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert results == [{"value": 1}] * 5
+    assert len(runs) == 1
+    assert flight.shared == 4
+    assert flight.in_flight() == 0
+
+
+def test_single_flight_waiters_get_independent_copies():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        return {"skills": []}
+
+    async def main():
+        return await asyncio.gather(flight.do("k", work), flight.do("k", work))
+
+    first, second = asyncio.run(main())
+    first["skills"].append("Python")
+    assert second == {"skills": []}
+
+
+def test_single_flight_propagates_errors_and_forgets_key():
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(flight.do("k", failing), flight.do("k", failing), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.in_flight() == 0
+
+
+def test_concurrent_comparisons_share_one_llm_call(fake_llm):
+    def slow_reply(prompt):
+        time.sleep(0.1)
+        return SAMPLE_MATCH
+
+    fake_llm.replies["compare"] = slow_reply
+
+    async def main():
+        return await asyncio.gather(*(compare_resume_to_jd_cached(SAMPLE_RESUME, SAMPLE_JD) for _ in range(4)))
+
+    results = asyncio.run(main())
+    assert [result["match_score"] for result in results] == [72] * 4
+    assert fake_llm.calls == ["compare"]
+    assert match_single_flight.in_flight() == 0
+
+
+def test_cached_comparison_skips_the_llm(fake_llm):
+    asyncio.run(compare_resume_to_jd_cached(SAMPLE_RESUME, SAMPLE_JD))
+    # Whitespace and case changes in the JD map to the same entry
+    asyncio.run(compare_resume_to_jd_cached(SAMPLE_RESUME, SAMPLE_JD.upper().replace("\n", "\n\n")))
+    assert fake_llm.calls == ["compare"]
+
+
+def test_failed_comparison_is_not_cached(fake_llm):
+    fake_llm.replies["compare"] = RuntimeError("quota exceeded")
+    with pytest.raises(Exception):
+        asyncio.run(compare_resume_to_jd_cached(SAMPLE_RESUME, SAMPLE_JD))
+    fake_llm.replies["compare"] = SAMPLE_MATCH
+    assert asyncio.run(compare_resume_to_jd_cached(SAMPLE_RESUME, SAMPLE_JD))["match_score"] == 72
+    assert fake_llm.calls == ["compare", "compare"]
+
+
+def test_cache_invalidate_endpoint(fake_llm):
+    from main import app
+
+    asyncio.run(compare_resume_to_jd_cached(SAMPLE_RESUME, SAMPLE_JD))
+    client = TestClient(app)
+    assert client.post("/cache/invalidate", params={"target": "match"}).json() == {"invalidated": "match"}
+    assert len(match_result_cache.memory) == 0
+    assert client.post("/cache/invalidate", params={"target": "bogus"}).status_code == 400
@@ -0,0 +1,54 @@
+import pytest
+
+from core.skills import annotate_skills, get_taxonomy, is_exact_only, normalize_key
+
+
+def test_spellings_share_a_key():
+    assert normalize_key("React.js") == normalize_key("react js") == normalize_key("ReactJS") == "reactjs"
+    assert normalize_key(".NET") == ".net"
+
+
+@pytest.mark.parametrize("skill, skill_id", [("Go", "go"), ("R", "r"), ("C", "c"), ("TS", "typescript")])
+def test_short_spellings_match_exactly(skill, skill_id):
+    assert get_taxonomy().normalize([skill]) == ([skill_id], [])
+
+
+@pytest.mark.parametrize("text", [
+    "Go-to-market strategy",
+    "R&D management",
+    "Vitamin C research",
+    "Objective-C",
+    "TS/SCI clearance",
+    "Ready to go",
+])
+def test_short_spellings_are_not_scanned(text):
+    assert get_taxonomy().scan(text) == []
+
+
+def test_compound_words_do_not_mention_skills():
+    taxonomy = get_taxonomy()
+    assert taxonomy.normalize(["C-level stakeholder communication"]) == (["communication"], [])
+    # Joined to a word that is not a skill, the mention is part of that word
+    assert "react" not in taxonomy.scan("React-ish templating")
+
+
+@pytest.mark.parametrize("text, skill_ids", [
+    ("Python/Django", ["python", "django"]),
+    ("AWS/GCP", ["aws", "gcp"]),
+    ("React-Redux", ["react", "redux"]),
+    ("CI/CD pipelines", ["ci_cd"]),
+    ("C# and .NET", ["csharp", "dotnet"]),
+    ("Golang, Kubernetes and React Native", ["go", "kubernetes", "react_native"]),
+])
+def test_scan_finds_skills_in_longer_strings(text, skill_ids):
+    assert get_taxonomy().scan(text) == skill_ids
+
+
+def test_exact_only_spellings():
+    assert all(is_exact_only(key) for key in ("go", "r", "c", "ts", "js", "py", "ml"))
+    assert not any(is_exact_only(key) for key in ("c#", "s3", "sql", "golang"))
+
+
+def test_annotate_skills_attaches_ids():
+    annotated = annotate_skills({"skills": ["ReactJS", "Go", "Go-to-market strategy"]})
+    assert annotated["skill_ids"] == ["react", "go"]
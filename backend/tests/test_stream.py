@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+from core import screening
+from core.screening import stream_screening
+from tests.conftest import SAMPLE_JD
+
+
+def _collect(stream):
+    async def main():
+        return [event async for event in stream]
+    return asyncio.run(main())
+
+
+def test_stream_reports_stages_deltas_and_result(fake_llm, make_pdf):
+    events = _collect(stream_screening(make_pdf(["Ada Example", "Python"]), SAMPLE_JD))
+    names = [name for name, _ in events]
+    assert names[:3] == ["stage", "stage", "resume_data"]
+    assert "match_delta" in names
+    assert names[-2:] == ["stage", "result"]
+    deltas = "".join(data["text"] for name, data in events if name == "match_delta")
+    assert '"match_score": 72' in deltas
+    assert events[-1][1]["match_score"] == 72
+
+
+def test_second_stream_uses_the_caches(fake_llm, make_pdf):
+    pdf = make_pdf(["Ada Example", "Python"])
+    _collect(stream_screening(pdf, SAMPLE_JD))
+    events = _collect(stream_screening(pdf, SAMPLE_JD))
+    assert [name for name, _ in events] == ["stage", "resume_data", "stage", "stage", "result"]
+    assert all(data["cached"] for name, data in events if name == "stage" and data["stage"] != "prescore")
+    assert fake_llm.calls == ["extract", "compare_stream"]
+
+
+def test_concurrent_streams_share_one_comparison(fake_llm, make_pdf):
+    original = fake_llm.stream
+
+    def slow_stream(*args, **kwargs):
+        for chunk in original(*args, **kwargs):
+            time.sleep(0.02)
+            yield chunk
+
+    fake_llm.stream = slow_stream
+    pdf = make_pdf(["Ada Example", "Python"])
+    _collect(stream_screening(pdf, "Unrelated JD to fill the resume cache"))
+
+    async def collect(stream):
+        return [event async for event in stream]
+
+    async def main():
+        return await asyncio.gather(*(collect(stream_screening(pdf, SAMPLE_JD)) for _ in range(3)))
+
+    results = asyncio.run(main())
+    assert all(events[-1][1]["match_score"] == 72 for events in results)
+    # The first JD and the three concurrent streams make one comparison each
+    assert fake_llm.calls.count("compare_stream") == 2
+    assert sum(1 for events in results if any(name == "match_delta" for name, _ in events)) == 1
+
+
+def test_comparison_failure_is_an_error_event(fake_llm, make_pdf):
+    fake_llm.replies["compare_stream"] = RuntimeError("quota exceeded")
+    events = _collect(stream_screening(make_pdf(["Ada Example"]), SAMPLE_JD))
+    assert events[-1][0] == "error"
+    assert events[-1][1]["stage"] == "compare" and events[-1][1]["status_code"] == 500
+
+
+def test_unexpected_failure_is_an_error_event(fake_llm, make_pdf, monkeypatch):
+    def broken_prescreen(resume_data, jd_text):
+        raise KeyError("skills")
+
+    monkeypatch.setattr(screening, "prescreen", broken_prescreen)
+    events = _collect(stream_screening(make_pdf(["Ada Example"]), SAMPLE_JD))
+    assert events[-1] == ("error", {"stage": "unknown", "error": "Internal server error: 'skills'", "status_code": 500})
+
+
+def test_invalid_pdf_is_an_error_event():
+    events = _collect(stream_screening(b"%PDF-1.4 truncated", SAMPLE_JD))
+    assert events[-1][0] == "error" and events[-1][1]["status_code"] == 400
+
+
+def test_stream_endpoint_sends_server_sent_events(fake_llm, make_pdf):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    response = TestClient(app).post(
+        "/screen-resume/stream", data={"jd_text": SAMPLE_JD}, files={"resume_file": ("cv.pdf", make_pdf(["Ada Example"]), "application/pdf")}
+    )
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: result" in response.text
@@ -0,0 +1,47 @@
+from core.text_normalizer import normalize_page_texts
+
+
+def test_split_words_are_rejoined():
+    text = normalize_page_texts(["Led the devel-\nopment of a billing platform"]).text
+    assert text == "Led the development of a billing platform"
+
+
+def test_compound_words_keep_their_hyphen():
+    text = normalize_page_texts(["A self-\nmotivated engineer with full-\nstack and cloud-\nnative work"]).text
+    assert text == "A self-motivated engineer with full-stack and cloud-native work"
+
+
+def test_continuation_found_in_the_document_keeps_the_hyphen():
+    text = normalize_page_texts(["Built a rules-\nengine\nMaintained the engine for years"]).text
+    assert "rules-engine" in text
+
+
+def test_joined_word_found_in_the_document_wins():
+    text = normalize_page_texts(["Ran data-\nbase migrations\nTuned the database"]).text
+    assert "database migrations" in text
+
+
+def test_hyphen_before_a_paragraph_break_is_kept():
+    text = normalize_page_texts(["Skills: Python, Go -\n\nexperience below"]).text
+    assert text == "Skills: Python, Go -\n\nexperience below"
+
+
+def test_blank_line_runs_collapse_to_one():
+    text = normalize_page_texts(["Summary\n\n\n\nBackend engineer\n \n\t\nSkills\nPython"]).text
+    assert text == "Summary\n\nBackend engineer\n\nSkills\nPython"
+
+
+def test_repeated_headers_and_page_numbers_are_removed():
+    bodies = ["Experience\nAcme Corp\nBackend Engineer", "Education\nBSc Computer Science\nState University",
+              "Projects\nBilling platform\nSearch service"]
+    pages = [f"\nAda Example - Resume\n\n{body}\n\nPage {i}\n" for i, body in enumerate(bodies, start=1)]
+    result = normalize_page_texts(pages)
+    assert result.text.count("Ada Example - Resume") == 1
+    assert result.text.count("Page") == 1
+    assert result.repeated_lines_removed == 4
+    assert "Projects\nBilling platform\nSearch service" in result.text
+    assert result.chars_after < result.chars_before
+
+
+def test_whitespace_runs_collapse():
+    assert normalize_page_texts(["Python     Go\t\tRust  "]).text == "Python Go Rust"
@@ -0,0 +1,67 @@
+from core.tokens import (
+    estimate_tokens,
+    fit_jd_text,
+    fit_resume_text,
+    section_priority,
+    split_sections,
+    RESUME_SECTION_PRIORITY,
+)
+
+
+def _resume(filler_lines):
+    filler = "\n".join(f"Hobby line {i} about hiking and chess" for i in range(filler_lines))
+    return (
+        "Ada Example\nada@example.com\n"
+        "SKILLS\nPython, Go, PostgreSQL\n"
+        "EXPERIENCE\nBackend Engineer at Acme, 2018-2024\n"
+        f"INTERESTS\n{filler}"
+    )
+
+
+def test_estimate_tokens_rounds_up():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_split_sections_at_headings():
+    sections = split_sections(_resume(1))
+    assert [heading for heading, _ in sections] == ["", "SKILLS", "EXPERIENCE", "INTERESTS"]
+    assert split_sections("Requirements:\n- Python")[0][0] == "Requirements"
+    # Long or lowercase lines are not headings
+    assert len(split_sections("skills\nthis line is a sentence and not a heading at all")) == 1
+
+
+def test_section_priority_by_keyword():
+    assert section_priority("TECHNICAL SKILLS", RESUME_SECTION_PRIORITY) == 10
+    assert section_priority("Hobbies", RESUME_SECTION_PRIORITY) == 1
+    assert section_priority("Misc", RESUME_SECTION_PRIORITY) == 5
+
+
+def test_text_within_budget_is_untouched():
+    result = fit_resume_text(_resume(2), budget=10000)
+    assert not result.truncated and result.text == _resume(2)
+    assert result.tokens_before == result.tokens_after
+
+
+def test_least_relevant_sections_are_dropped_first():
+    text = _resume(200)
+    result = fit_resume_text(text, budget=60)
+    assert result.truncated
+    assert result.sections_dropped == ["INTERESTS"]
+    assert "SKILLS\nPython" in result.text and "Ada Example" in result.text
+    assert result.tokens_after <= 60
+
+
+def test_oversized_opening_section_is_cut():
+    result = fit_jd_text("Backend Engineer\n" + "word " * 2000, budget=50)
+    assert result.truncated and result.tokens_after <= 50
+    assert result.text.startswith("Backend Engineer")
+
+
+def test_jd_boilerplate_goes_before_requirements():
+    jd = ("Backend Engineer\nREQUIREMENTS\n- Python\n- 3+ years of experience\n"
+          "BENEFITS\n" + "\n".join(f"- Perk number {i}" for i in range(100)))
+    result = fit_jd_text(jd, budget=40)
+    assert result.sections_dropped == ["BENEFITS"]
+    assert "- Python" in result.text
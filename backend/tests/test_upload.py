@@ -0,0 +1,72 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from starlette.datastructures import UploadFile
+
+from core.upload import BodySizeLimitMiddleware, UploadError, read_pdf_upload, read_upload, read_zip_upload
+
+PDF = b"%PDF-1.4\n" + b"x" * (200 * 1024)
+
+
+def _upload(data, size=True):
+    return UploadFile(io.BytesIO(data), size=len(data) if size else None, filename="file")
+
+
+@pytest.mark.parametrize("size", [True, False])
+def test_read_upload_returns_the_whole_file(size):
+    data = asyncio.run(read_pdf_upload(_upload(PDF, size)))
+    assert data == PDF and isinstance(data, bytearray)
+
+
+def test_read_upload_trims_an_overstated_size():
+    upload = UploadFile(io.BytesIO(PDF), size=len(PDF) + 100, filename="file")
+    assert asyncio.run(read_upload(upload, 10 * len(PDF))) == PDF
+
+
+def test_read_upload_enforces_the_limit_while_streaming():
+    with pytest.raises(UploadError) as excinfo:
+        asyncio.run(read_upload(_upload(PDF, size=False), 100 * 1024))
+    assert excinfo.value.status_code == 413
+    with pytest.raises(UploadError):
+        asyncio.run(read_upload(_upload(PDF), 100 * 1024))
+
+
+def test_read_upload_checks_the_signature():
+    with pytest.raises(UploadError, match="Invalid PDF"):
+        asyncio.run(read_pdf_upload(_upload(b"GIF89a" + b"x" * 10)))
+    # The PDF header may follow some leading junk
+    assert asyncio.run(read_pdf_upload(_upload(b"\n" * 10 + PDF)))
+    with pytest.raises(UploadError, match="does not match"):
+        asyncio.run(read_zip_upload(_upload(PDF)))
+    with pytest.raises(UploadError, match="empty"):
+        asyncio.run(read_upload(_upload(b""), 100, b"%PDF-"))
+
+
+def _limited_app():
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+
+    app.add_middleware(BodySizeLimitMiddleware, default_limit=1024, path_limits={"/big": 4096})
+    return app
+
+
+def test_body_size_middleware_rejects_by_content_length():
+    client = TestClient(_limited_app())
+    assert client.post("/echo", content=b"x" * 100).json() == {"size": 100}
+    response = client.post("/echo", content=b"x" * 2048)
+    assert response.status_code == 413
+
+
+def test_body_size_middleware_rejects_streamed_bodies():
+    def chunks():
+        for _ in range(4):
+            yield b"x" * 512
+
+    response = TestClient(_limited_app()).post("/echo", content=chunks())
+    assert response.status_code == 413
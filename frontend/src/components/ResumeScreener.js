@@ -7,6 +7,7 @@ const ResumeScreener = () => {
   const [isLoading, setIsLoading] = useState(false);
   const [results, setResults] = useState(null);
   const [error, setError] = useState(null);
+  const [progress, setProgress] = useState(null);
   const [backendStatus, setBackendStatus] = useState("checking");
 
   // Check backend health on component mount
@@ -46,14 +47,36 @@ const ResumeScreener = () => {
     setIsLoading(true);
     setError(null);
     setResults(null);
+    setProgress("PARSING PDF...");
+
+    // Show each stage as it finishes and the analysis while it is written
+    const handleEvent = (event, data) => {
+      if (event === "stage" && data.stage === "parse") {
+        setProgress("EXTRACTING RESUME DATA...");
+      } else if (event === "resume_data") {
+        setProgress("ANALYZING MATCH...");
+      } else if (event === "match_delta" && data.partial) {
+        setResults({
+          match_score: data.partial.match_score,
+          match_summary: data.partial.match_summary,
+          detailed_analysis: data.partial,
+        });
+      }
+    };
 
     try {
-      const data = await ApiService.screenResume(resumeFile, jobDescription);
+      const data = await ApiService.screenResumeStream(
+        resumeFile,
+        jobDescription,
+        handleEvent
+      );
       setResults(data);
     } catch (err) {
+      setResults(null);
       setError(err.message.toUpperCase());
     } finally {
       setIsLoading(false);
+      setProgress(null);
     }
   };
 
@@ -128,7 +151,7 @@ const ResumeScreener = () => {
               disabled={isLoading}
               className="w-full py-4 px-6 brutalist-button text-lg font-bold"
             >
-              {isLoading ? "SCREENING..." : "SCREEN RESUME"}
+              {isLoading ? progress || "SCREENING..." : "SCREEN RESUME"}
             </button>
           </form>
 
@@ -151,7 +174,7 @@ const ResumeScreener = () => {
               MATCH SCORE:
             </h2>
             <div className="text-center">
-              {results ? (
+              {results && results.match_score !== undefined ? (
                 <div className="text-6xl font-mono font-bold border-4 border-black p-8 bg-light-gray">
                   {results.match_score}/100
                 </div>
@@ -41,6 +41,91 @@ class ApiService {
     }
   }
 
+  /**
+   * Screen a resume with progress streamed as Server-Sent Events
+   * @param {File} resumeFile - PDF file
+   * @param {string} jobDescription - Job description text
+   * @param {Function} onEvent - Called with (event, data) for each event
+   * @returns {Promise<Object>} - Match results from the final "result" event
+   */
+  static async screenResumeStream(resumeFile, jobDescription, onEvent) {
+    try {
+      const formData = new FormData();
+      formData.append("resume_file", resumeFile);
+      formData.append("jd_text", jobDescription);
+
+      const response = await fetch(`${API_BASE_URL}/screen-resume/stream`, {
+        method: "POST",
+        body: formData,
+      });
+
+      if (!response.ok) {
+        const errorData = await response.json();
+        throw new Error(
+          errorData.detail || `HTTP ${response.status}: ${response.statusText}`
+        );
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let result = null;
+
+      // Events are separated by a blank line: "event: name\ndata: {json}\n\n"
+      const handleFrame = (frame) => {
+        let event = "message";
+        let data = "";
+        for (const line of frame.split("\n")) {
+          if (line.startsWith("event:")) {
+            event = line.slice(6).trim();
+          } else if (line.startsWith("data:")) {
+            data += line.slice(5).trim();
+          }
+        }
+        if (!data) {
+          return;
+        }
+        const payload = JSON.parse(data);
+        if (event === "error") {
+          throw new Error(payload.error);
+        }
+        if (event === "result") {
+          result = payload;
+        }
+        onEvent(event, payload);
+      };
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) {
+          break;
+        }
+        buffer += decoder.decode(value, { stream: true });
+        let boundary = buffer.indexOf("\n\n");
+        while (boundary !== -1) {
+          handleFrame(buffer.slice(0, boundary));
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf("\n\n");
+        }
+      }
+      if (buffer.trim()) {
+        handleFrame(buffer);
+      }
+
+      if (!result) {
+        throw new Error("SCREENING ENDED WITHOUT A RESULT");
+      }
+      return result;
+    } catch (error) {
+      if (error.name === "TypeError" && error.message.includes("fetch")) {
+        throw new Error(
+          "UNABLE TO CONNECT TO SERVER. PLEASE ENSURE BACKEND IS RUNNING."
+        );
+      }
+      throw error;
+    }
+  }
+
   /**
    * Extract resume data only (for testing)
    * @param {File} resumeFile - PDF file